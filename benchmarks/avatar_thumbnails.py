@@ -0,0 +1,65 @@
+"""
+Cost of new vs duplicate avatar uploads, and of serving thumbnails.
+
+    python -m benchmarks.avatar_thumbnails
+"""
+import asyncio
+import io
+import tempfile
+import time
+from unittest.mock import patch
+
+from benchmarks import harness
+from benchmarks.common import print_table, run_concurrently, summarize
+
+IMAGES = 10
+REQUESTS = 500
+
+
+def photos(count: int):
+    from PIL import Image
+
+    for _ in range(count):
+        output = io.BytesIO()
+        Image.effect_noise((2400, 1600), 64).convert("RGB").save(output, format="JPEG")
+        yield output.getvalue()
+
+
+async def main():
+    from src.web13hm.services import avatars
+
+    images = list(photos(IMAGES))
+    storage = avatars.LocalStorage(
+        tempfile.mkdtemp(prefix="web13hm-bench-"), avatars.settings.avatar_sizes, avatars.upload_workers
+    )
+    uploads, serving = [], []
+    async with harness.app_client() as client:
+        token = await harness.seed_user()
+        headers = {"Authorization": f"Bearer {token}"}
+        with patch.object(avatars, "avatar_storage", storage):
+            for label in ("new image", "duplicate image"):
+                samples = []
+                for image in images:
+                    started = time.perf_counter()
+                    response = await client.patch(
+                        "/api/users/avatar", files={"file": ("me.jpg", image, "image/jpeg")}, headers=headers
+                    )
+                    samples.append(time.perf_counter() - started)
+                    assert response.status_code == 200, response.text
+                uploads.append({"upload": label, **summarize(samples, sum(samples))})
+
+            url = response.json()["avatar"]
+            etag = (await client.get(url)).headers["etag"]
+            for label, request_headers in (("GET 200", {}), ("GET 304", {"If-None-Match": etag})):
+                serving.append(
+                    {
+                        "request": label,
+                        **await run_concurrently(lambda: client.get(url, headers=request_headers), 10, REQUESTS),
+                    }
+                )
+    print_table("PATCH /api/users/avatar", uploads)
+    print_table("GET /api/users/avatar/{digest}/{size}", serving)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
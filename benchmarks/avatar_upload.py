@@ -0,0 +1,91 @@
+"""
+Latency of GET /api/users/me/ while avatar uploads are in flight.
+
+The Cloudinary upload is replaced by a 200 ms sleep standing in for the
+network round-trip. "inline" reproduces the previous handler, which resized
+and uploaded on the event loop; "pool" is the current pipeline.
+
+    python -m benchmarks.avatar_upload
+"""
+import asyncio
+import io
+import time
+from unittest.mock import patch
+
+from benchmarks import harness
+from benchmarks.common import print_table, run_concurrently
+
+UPLOAD_DELAY = 0.2
+UPLOADERS = (0, 2, 8)
+PROBES = 40
+
+
+def fake_upload(data, **options):
+    time.sleep(UPLOAD_DELAY)
+    return {"version": 1}
+
+
+def photo() -> bytes:
+    from PIL import Image
+
+    output = io.BytesIO()
+    Image.effect_noise((2400, 1600), 64).convert("RGB").save(output, format="JPEG")
+    return output.getvalue()
+
+
+async def measure(client, token: str, uploaders: int, image: bytes) -> dict:
+    stop = asyncio.Event()
+    headers = {"Authorization": f"Bearer {token}"}
+    uploaded = 0
+
+    async def upload_loop():
+        nonlocal uploaded
+        while not stop.is_set():
+            response = await client.patch(
+                "/api/users/avatar", files={"file": ("me.jpg", image, "image/jpeg")}, headers=headers
+            )
+            assert response.status_code == 200, response.text
+            uploaded += 1
+
+    background = [asyncio.create_task(upload_loop()) for _ in range(uploaders)]
+    await asyncio.sleep(0.05)
+    try:
+        result = await run_concurrently(lambda: client.get("/api/users/me/", headers=headers), 1, PROBES)
+    finally:
+        stop.set()
+        await asyncio.gather(*background)
+    return {**result, "uploads": uploaded}
+
+
+async def main():
+    from src.web13hm.services import avatars
+
+    image = photo()
+
+    storage = avatars.CloudinaryStorage("NotesApp", avatars.upload_workers)
+
+    async def inline_process_avatar(email, data, db):
+        thumbnails = avatars.make_thumbnails(data, avatars.settings.avatar_sizes)
+        url = storage._upload(f"NotesApp/{email}", thumbnails[avatars.settings.avatar_size])
+        return await avatars.repository_users.update_avatar(email, url, db)
+
+    rows = []
+    async with harness.app_client() as client:
+        token = await harness.seed_user()
+        with patch("cloudinary.uploader.upload", fake_upload), patch.object(avatars, "avatar_storage", storage):
+            # /users/me/ needs an avatar, which the seeded user does not have yet.
+            await client.patch(
+                "/api/users/avatar",
+                files={"file": ("me.jpg", image, "image/jpeg")},
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            for mode in ("inline", "pool"):
+                replacement = inline_process_avatar if mode == "inline" else avatars.process_avatar
+                with patch.object(avatars, "process_avatar", replacement):
+                    for uploaders in UPLOADERS:
+                        rows.append({"mode": mode, "uploaders": uploaders, **await measure(client, token, uploaders, image)})
+    print_table("GET /api/users/me/ during avatar uploads", rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,91 @@
+"""
+Helpers shared by the benchmark scripts.
+
+Benchmarks are plain scripts, run from the repository root, e.g.::
+
+    python -m benchmarks.db_concurrency
+"""
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, Iterable, List
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """
+    Returns the ``pct`` percentile of ``samples`` using the nearest-rank method.
+
+    :param samples: The measured values.
+    :type samples: List[float]
+    :param pct: The percentile to compute, between 0 and 100.
+    :type pct: float
+    :return: The percentile value, or 0.0 for an empty sample.
+    :rtype: float
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(samples: List[float], elapsed: float) -> dict:
+    """
+    Summarizes latency samples (in seconds) measured over ``elapsed`` seconds.
+
+    :return: Count, throughput and p50/p95/p99 latency in milliseconds.
+    :rtype: dict
+    """
+    return {
+        "count": len(samples),
+        "rps": len(samples) / elapsed if elapsed else 0.0,
+        "mean_ms": statistics.fmean(samples) * 1000 if samples else 0.0,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+    }
+
+
+async def run_concurrently(
+    call: Callable[[], Awaitable[object]], concurrency: int, total: int
+) -> dict:
+    """
+    Runs ``total`` calls with at most ``concurrency`` of them in flight.
+
+    :param call: A coroutine factory performing one request.
+    :param concurrency: The number of concurrent workers.
+    :param total: The total number of calls to make.
+    :return: The latency summary, see :func:`summarize`.
+    :rtype: dict
+    """
+    samples: List[float] = []
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            started = time.perf_counter()
+            await call()
+            samples.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(samples, time.perf_counter() - started)
+
+
+def print_table(title: str, rows: Iterable[dict]) -> None:
+    """
+    Prints benchmark results as an aligned table.
+    """
+    rows = list(rows)
+    print(f"\n{title}")
+    if not rows:
+        return
+    columns = list(rows[0])
+    widths = {c: max(len(c), *(len(_fmt(r[c])) for r in rows)) for c in columns}
+    print("  ".join(c.rjust(widths[c]) for c in columns))
+    for row in rows:
+        print("  ".join(_fmt(row[c]).rjust(widths[c]) for c in columns))
+
+
+def _fmt(value) -> str:
+    return f"{value:.2f}" if isinstance(value, float) else str(value)
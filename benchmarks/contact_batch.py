@@ -0,0 +1,75 @@
+"""
+Rows per second changing contacts one request per ID vs ``PATCH``/``DELETE /api/contacts/batch``.
+
+    python -m benchmarks.contact_batch
+"""
+import asyncio
+import time
+
+from benchmarks import harness
+from benchmarks.common import print_table
+
+SINGLE = 200
+BATCH = 1000
+
+
+async def main():
+    from sqlalchemy import select
+
+    from src.web13hm.database.db import SessionLocal
+    from src.web13hm.database.models import Contacts
+
+    async with harness.app_client() as client:
+        token = await harness.seed_user()
+        await harness.seed_contacts("bench@example.com", SINGLE + BATCH)
+        headers = {"Authorization": f"Bearer {token}"}
+        async with SessionLocal() as db:
+            ids = (await db.scalars(select(Contacts.id).order_by(Contacts.id))).all()
+        single_ids, batch_ids = ids[:SINGLE], ids[SINGLE:]
+        body = {
+            "name": "Renamed",
+            "last_name": "Contact",
+            "email": "renamed@example.com",
+            "number": "1",
+            "birthday": "1990-01-01",
+        }
+
+        async def timed(name, count, call):
+            started = time.perf_counter()
+            await call()
+            elapsed = time.perf_counter() - started
+            return {"operation": name, "rows": count, "seconds": elapsed, "rows_per_s": count / elapsed}
+
+        async def update_each():
+            for contact_id in single_ids:
+                response = await client.put(f"/api/contacts/Update/{contact_id}", json=body, headers=headers)
+                assert response.status_code == 200, response.text
+
+        async def update_batch():
+            response = await client.patch(
+                "/api/contacts/batch", json={"ids": batch_ids, "changes": body}, headers=headers
+            )
+            assert response.json()["count"] == BATCH, response.text
+
+        async def delete_each():
+            for contact_id in single_ids:
+                response = await client.delete(f"/api/contacts/delete/{contact_id}", headers=headers)
+                assert response.status_code == 200, response.text
+
+        async def delete_batch():
+            response = await client.request(
+                "DELETE", "/api/contacts/batch", json={"ids": batch_ids}, headers=headers
+            )
+            assert response.json()["count"] == BATCH, response.text
+
+        rows = [
+            await timed("PUT /Update/{id}", SINGLE, update_each),
+            await timed("PATCH /batch", BATCH, update_batch),
+            await timed("DELETE /delete/{id}", SINGLE, delete_each),
+            await timed("DELETE /batch", BATCH, delete_batch),
+        ]
+        print_table("Changing contacts", rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
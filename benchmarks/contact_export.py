@@ -0,0 +1,102 @@
+"""
+Time, size and peak Python memory of GET /api/contacts/export as the address book grows.
+
+Peak memory should stay roughly flat across sizes because rows are streamed
+from a server-side cursor in ``export_batch_size`` batches. The request is
+sent straight to the ASGI app and the body is discarded as it arrives, since
+``httpx.ASGITransport`` would buffer the whole response and dominate the peak.
+
+    python -m benchmarks.contact_export
+"""
+import asyncio
+import time
+import tracemalloc
+
+from benchmarks import harness
+from benchmarks.common import print_table
+
+SIZES = (10_000, 100_000, 300_000)
+VARIANTS = (
+    ("csv", "identity"),
+    ("ndjson", "identity"),
+    ("csv", "gzip"),
+)
+
+
+async def export(app, token: str, fmt: str, encoding: str) -> int:
+    """
+    Calls the export endpoint and returns the number of body bytes sent.
+    """
+    sent = 0
+    status = None
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/contacts/export",
+        "raw_path": b"/api/contacts/export",
+        "root_path": "",
+        "query_string": f"format={fmt}".encode(),
+        "headers": [
+            (b"host", b"bench"),
+            (b"authorization", f"Bearer {token}".encode()),
+            (b"accept-encoding", encoding.encode()),
+        ],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+
+    requested = asyncio.Event()
+
+    async def receive():
+        if requested.is_set():
+            await asyncio.Event().wait()
+        requested.set()
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal sent, status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            sent += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    assert status == 200, status
+    return sent
+
+
+async def main():
+    from main import app
+
+    results = []
+    async with harness.app_client():
+        for size in SIZES:
+            await harness.reset_database()
+            token = await harness.seed_user()
+            await harness.seed_contacts("bench@example.com", size)
+            for fmt, encoding in VARIANTS:
+                tracemalloc.start()
+                started = time.perf_counter()
+                received = await export(app, token, fmt, encoding)
+                elapsed = time.perf_counter() - started
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                results.append(
+                    {
+                        "contacts": size,
+                        "format": fmt,
+                        "encoding": encoding,
+                        "seconds": elapsed,
+                        "rows_per_s": size / elapsed,
+                        "MB_sent": received / 2**20,
+                        "peak_MB": peak / 2**20,
+                    }
+                )
+    print_table("Contact export", results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+"""
+Throughput of POST /api/contacts/import compared with creating contacts one by one.
+
+    python -m benchmarks.contact_import [rows]
+"""
+import asyncio
+import json
+import sys
+import time
+
+from benchmarks import harness
+from benchmarks.common import print_table
+
+ONE_BY_ONE_ROWS = 500
+
+
+def contact(i: int) -> dict:
+    return {
+        "name": f"name{i}",
+        "last_name": f"last{i}",
+        "email": f"contact{i}@example.com",
+        "number": f"+380{i:09d}",
+        "birthday": f"19{70 + i % 30}-{1 + i % 12:02d}-{1 + i % 28:02d}",
+    }
+
+
+async def csv_body(rows: int, lines_per_chunk: int = 1000):
+    yield b"name,last_name,email,number,birthday\n"
+    for start in range(0, rows, lines_per_chunk):
+        yield "".join(
+            ",".join(contact(i).values()) + "\n"
+            for i in range(start, min(start + lines_per_chunk, rows))
+        ).encode()
+
+
+async def ndjson_body(rows: int, lines_per_chunk: int = 1000):
+    for start in range(0, rows, lines_per_chunk):
+        yield "".join(
+            json.dumps(contact(i)) + "\n" for i in range(start, min(start + lines_per_chunk, rows))
+        ).encode()
+
+
+async def main(rows: int):
+    from src.web13hm.database.db import SessionLocal
+    from src.web13hm.database.models import User
+    from src.web13hm.repository import contacts as repository
+    from src.web13hm.shemas import ContactModel
+
+    results = []
+    async with harness.app_client() as client:
+        token = await harness.seed_user()
+        headers = {"Authorization": f"Bearer {token}"}
+        for fmt, body in (("csv", csv_body), ("ndjson", ndjson_body)):
+            started = time.perf_counter()
+            response = await client.post(
+                "/api/contacts/import",
+                params={"format": fmt},
+                content=body(rows),
+                headers=headers,
+                timeout=None,
+            )
+            elapsed = time.perf_counter() - started
+            assert response.status_code == 200, response.text
+            assert response.json()["imported"] == rows, response.json()
+            results.append({"method": f"import {fmt}", "rows": rows, "seconds": elapsed, "rows_per_s": rows / elapsed})
+
+        async with SessionLocal() as db:
+            user = User(id=1)
+            started = time.perf_counter()
+            for i in range(ONE_BY_ONE_ROWS):
+                await repository.create_contact(ContactModel(**contact(i)), db, user)
+            elapsed = time.perf_counter() - started
+        results.append(
+            {
+                "method": "create_contact loop",
+                "rows": ONE_BY_ONE_ROWS,
+                "seconds": elapsed,
+                "rows_per_s": ONE_BY_ONE_ROWS / elapsed,
+            }
+        )
+    print_table("Contact import throughput", results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000))
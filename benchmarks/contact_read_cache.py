@@ -0,0 +1,52 @@
+"""
+Contact read latency with the per-user response cache: uncached, cached and revalidated with ``If-None-Match``.
+
+    python -m benchmarks.contact_read_cache
+"""
+import asyncio
+
+from benchmarks import harness
+from benchmarks.common import print_table, run_concurrently
+
+CONTACTS = 5_000
+REQUESTS = 500
+CONCURRENCY = 8
+URLS = (
+    "/api/contacts/contacts?limit=100",
+    "/api/contacts/contacts/name42",
+    "/api/contacts/birthday?days=30&limit=100",
+)
+
+
+async def main():
+    from src.web13hm.services.response_cache import response_cache
+
+    async with harness.app_client() as client:
+        token = await harness.seed_user()
+        await harness.seed_contacts("bench@example.com", CONTACTS)
+        headers = {"Authorization": f"Bearer {token}"}
+        for url in URLS:
+            etag = (await client.get(url, headers=headers)).headers["etag"]
+
+            async def get(extra=None, clear=False, expected=200):
+                if clear:
+                    response_cache.clear()
+                response = await client.get(url, headers={**headers, **(extra or {})})
+                assert response.status_code == expected, response.text
+
+            rows = [
+                {"mode": "uncached", **await run_concurrently(lambda: get(clear=True), CONCURRENCY, REQUESTS)},
+                {"mode": "cached", **await run_concurrently(get, CONCURRENCY, REQUESTS)},
+                {
+                    "mode": "304",
+                    **await run_concurrently(
+                        lambda: get({"If-None-Match": etag}, expected=304), CONCURRENCY, REQUESTS
+                    ),
+                },
+            ]
+            print_table(f"GET {url}", rows)
+        print("\nresponse cache:", response_cache.entries.stats())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
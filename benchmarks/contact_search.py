@@ -0,0 +1,77 @@
+"""
+Latency of prefix search over a large address book, compared with a
+``LIKE '%q%'`` scan over the same fields.
+
+    python -m benchmarks.contact_search [contacts]
+"""
+import asyncio
+import sys
+import time
+
+from benchmarks import harness
+from benchmarks.common import print_table, summarize
+
+REPEAT = 50
+QUERIES = ("name123", "name12345", "last9 name9", "contact4242@", "nomatch")
+
+
+async def timed(call) -> dict:
+    samples = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        result = await call()
+        samples.append(time.perf_counter() - started)
+    return {"hits": len(result), **summarize(samples, sum(samples))}
+
+
+async def main(count: int):
+    from sqlalchemy import or_, select
+
+    from src.web13hm.database.db import SessionLocal, engine
+    from src.web13hm.database.models import Contacts, User
+    from src.web13hm.repository import contacts as repository
+
+    await harness.reset_database()
+    await harness.seed_user()
+    user = User(id=await harness.seed_contacts("bench@example.com", count, batch=20_000))
+
+    async def like_scan(db, q):
+        pattern = f"%{q}%"
+        rows = await db.scalars(
+            select(Contacts)
+            .where(
+                Contacts.user_id == user.id,
+                or_(
+                    Contacts.name.ilike(pattern),
+                    Contacts.last_name.ilike(pattern),
+                    Contacts.email.ilike(pattern),
+                ),
+            )
+            .order_by(Contacts.id)
+            .limit(10)
+        )
+        return rows.all()
+
+    rows = []
+    async with SessionLocal() as db:
+        for q in QUERIES:
+            indexed = await timed(
+                lambda: repository.search_contacts(query=q, skip=0, limit=10, user=user, db=db)
+            )
+            scan = await timed(lambda: like_scan(db, q.split()[0]))
+            rows.append(
+                {
+                    "query": q,
+                    "hits": indexed["hits"],
+                    "index_p50_ms": indexed["p50_ms"],
+                    "index_p99_ms": indexed["p99_ms"],
+                    "like_p50_ms": scan["p50_ms"],
+                    "like_p99_ms": scan["p99_ms"],
+                }
+            )
+    print_table(f"search_contacts, {count} contacts, limit 10", rows)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000))
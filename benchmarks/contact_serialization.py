@@ -0,0 +1,70 @@
+"""
+Rows per second serializing 100-contact pages: ``jsonable_encoder`` over ORM objects,
+``ResponseContactModel`` validation, and orjson over selected column tuples.
+
+Also measures uncached ``GET /api/contacts/contacts?limit=100`` end to end.
+
+    python -m benchmarks.contact_serialization
+"""
+import asyncio
+import time
+
+from benchmarks import harness
+from benchmarks.common import print_table, run_concurrently
+
+PAGE = 100
+ROUNDS = 300
+
+
+def rate(serialize, page) -> float:
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        serialize(page)
+    return ROUNDS * len(page) / (time.perf_counter() - started)
+
+
+async def main():
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from sqlalchemy import select
+
+    from src.web13hm.database.db import SessionLocal
+    from src.web13hm.database.models import Contacts
+    from src.web13hm.services.response_cache import response_cache
+    from src.web13hm.services.serialization import contact_columns, dump_rows
+    from src.web13hm.shemas import ResponseContactModel
+
+    async with harness.app_client() as client:
+        token = await harness.seed_user()
+        await harness.seed_contacts("bench@example.com", 5_000)
+        async with SessionLocal() as db:
+            objects = (await db.scalars(select(Contacts).limit(PAGE))).all()
+            rows = (await db.execute(select(*contact_columns()).limit(PAGE))).all()
+
+        encoders = {
+            "jsonable_encoder(ORM)": lambda page: JSONResponse(jsonable_encoder(page)).body,
+            "ResponseContactModel": lambda page: JSONResponse(
+                jsonable_encoder([ResponseContactModel.model_validate(c) for c in page])
+            ).body,
+        }
+        results = [{"serializer": name, "rows_per_s": rate(fn, objects)} for name, fn in encoders.items()]
+        results.append({"serializer": "orjson(rows)", "rows_per_s": rate(dump_rows, rows)})
+        for result in results:
+            result["speedup"] = result["rows_per_s"] / results[0]["rows_per_s"]
+        print_table(f"Serializing {PAGE}-contact pages", results)
+
+        headers = {"Authorization": f"Bearer {token}"}
+
+        async def uncached():
+            response_cache.clear()
+            response = await client.get(f"/api/contacts/contacts?limit={PAGE}", headers=headers)
+            assert response.status_code == 200, response.text
+
+        print_table(
+            f"GET /api/contacts/contacts?limit={PAGE}, uncached",
+            [await run_concurrently(uncached, 1, 200)],
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,77 @@
+"""
+SQL statements and latency per contact write: create, full ``PUT`` update and partial ``PATCH``.
+
+    python -m benchmarks.contact_writes
+"""
+import asyncio
+import time
+from collections import Counter
+
+from sqlalchemy import event
+
+from benchmarks import harness
+from benchmarks.common import print_table, summarize
+
+WRITES = 200
+
+
+async def main():
+    from src.web13hm.database.db import engine
+
+    statements = Counter()
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements[statement.split()[0].upper()] += 1
+
+    async with harness.app_client() as client:
+        token = await harness.seed_user()
+        headers = {"Authorization": f"Bearer {token}"}
+        body = {
+            "name": "Ann",
+            "last_name": "Lee",
+            "email": "ann@example.com",
+            "number": "1",
+            "birthday": "1990-01-01",
+        }
+        # Warm the user cache so authentication adds no statements.
+        await client.get("/api/contacts/contacts", headers=headers)
+        ids = []
+
+        async def create(i):
+            response = await client.post("/api/contacts/Create", json=body, headers=headers)
+            ids.append(response.json()["id"])
+
+        async def put(i):
+            await client.put(f"/api/contacts/Update/{ids[i]}", json={**body, "number": str(i)}, headers=headers)
+
+        async def patch(i):
+            await client.patch(f"/api/contacts/Update/{ids[i]}", json={"number": str(i)}, headers=headers)
+
+        rows = []
+        for name, call in (("POST /Create", create), ("PUT /Update/{id}", put), ("PATCH /Update/{id}", patch)):
+            samples = []
+            statements.clear()
+            event.listen(engine.sync_engine, "before_cursor_execute", count)
+            started = time.perf_counter()
+            try:
+                for i in range(WRITES):
+                    call_started = time.perf_counter()
+                    await call(i)
+                    samples.append(time.perf_counter() - call_started)
+            finally:
+                event.remove(engine.sync_engine, "before_cursor_execute", count)
+            result = summarize(samples, time.perf_counter() - started)
+            rows.append(
+                {
+                    "operation": name,
+                    "statements_per_write": sum(statements.values()) / WRITES,
+                    "selects_per_write": statements["SELECT"] / WRITES,
+                    "p50_ms": result["p50_ms"],
+                    "p99_ms": result["p99_ms"],
+                }
+            )
+        print_table("Contact writes", rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
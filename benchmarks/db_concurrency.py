@@ -0,0 +1,93 @@
+"""
+Latency of DB-bound requests as concurrency grows: blocking vs async sessions.
+
+Each request runs a query that takes ``QUERY_MS`` on the database (simulated
+with a SQLite ``sleep`` function). With the blocking session every in-flight
+request waits for the previous ones, so p99 grows linearly with concurrency;
+the async session only queues once the pool is exhausted.
+
+    python -m benchmarks.db_concurrency
+"""
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from benchmarks.common import print_table, run_concurrently
+
+QUERY_MS = 20
+POOL_SIZE = 5
+MAX_OVERFLOW = 10
+CONCURRENCY = (1, 5, 10, 20, 40)
+
+
+def _register_sleep(dbapi_connection, connection_record):
+    dbapi_connection.create_function("sleep", 1, lambda ms: time.sleep(ms / 1000) or 0)
+
+
+def build_app(path: str) -> FastAPI:
+    # Without NullPool the blocking variant deadlocks once the pool is exhausted:
+    # the loop blocks on checkout while the sessions that would return a
+    # connection wait for the loop to run their teardown.
+    sync_engine = create_engine(f"sqlite:///{path}", poolclass=NullPool)
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{path}", pool_size=POOL_SIZE, max_overflow=MAX_OVERFLOW
+    )
+    event.listen(sync_engine, "connect", _register_sleep)
+    event.listen(async_engine.sync_engine, "connect", _register_sleep)
+    SyncSession = sessionmaker(bind=sync_engine)
+    AsyncSession = async_sessionmaker(bind=async_engine)
+
+    def get_sync_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with AsyncSession() as db:
+            yield db
+
+    app = FastAPI()
+    app.state.engines = (sync_engine, async_engine)
+    query = text(f"SELECT sleep({QUERY_MS})")
+
+    @app.get("/blocking")
+    async def blocking(db=Depends(get_sync_db)):
+        return {"value": db.execute(query).scalar()}
+
+    @app.get("/async")
+    async def non_blocking(db=Depends(get_async_db)):
+        return {"value": (await db.execute(query)).scalar()}
+
+    return app
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, "bench.db"))
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for path in ("/blocking", "/async"):
+                rows = []
+                for concurrency in CONCURRENCY:
+                    result = await run_concurrently(
+                        lambda: client.get(path), concurrency, concurrency * 5
+                    )
+                    rows.append({"concurrency": concurrency, **result})
+                print_table(f"GET {path} ({QUERY_MS} ms query)", rows)
+        sync_engine, async_engine = app.state.engines
+        sync_engine.dispose()
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
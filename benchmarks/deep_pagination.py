@@ -0,0 +1,76 @@
+"""
+Page-N latency of the contacts listing with offset and cursor pagination.
+
+    python -m benchmarks.deep_pagination
+"""
+import asyncio
+import time
+
+from benchmarks import harness
+from benchmarks.common import print_table, summarize
+
+CONTACTS = 100_000
+LIMIT = 100
+PAGES = (1, 10, 100, 500, 999)
+REPEAT = 20
+
+
+async def timed(call, repeat: int = REPEAT) -> dict:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await call()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples, sum(samples))
+
+
+async def main():
+    from sqlalchemy import select
+
+    from src.web13hm.database.db import SessionLocal, engine
+    from src.web13hm.database.models import Contacts, User
+    from src.web13hm.repository import contacts as repository
+    from src.web13hm.services.pagination import encode_cursor
+
+    await harness.reset_database()
+    await harness.seed_user()
+    user_id = await harness.seed_contacts("bench@example.com", CONTACTS)
+    user = User(id=user_id)
+
+    rows = []
+    async with SessionLocal() as db:
+        for page in PAGES:
+            skip = (page - 1) * LIMIT
+            cursor = None
+            if skip:
+                last_id = await db.scalar(
+                    select(Contacts.id)
+                    .where(Contacts.user_id == user_id)
+                    .order_by(Contacts.id)
+                    .offset(skip - 1)
+                    .limit(1)
+                )
+                cursor = encode_cursor(last_id)
+            offset = await timed(
+                lambda: repository.get_Contacts(skip=skip, limit=LIMIT, user=user, db=db)
+            )
+            keyset = await timed(
+                lambda: repository.get_Contacts(
+                    skip=0, limit=LIMIT, user=user, db=db, cursor=cursor
+                )
+            )
+            rows.append(
+                {
+                    "page": page,
+                    "offset_p50_ms": offset["p50_ms"],
+                    "offset_p99_ms": offset["p99_ms"],
+                    "cursor_p50_ms": keyset["p50_ms"],
+                    "cursor_p99_ms": keyset["p99_ms"],
+                }
+            )
+    print_table(f"get_Contacts, {CONTACTS} contacts, {LIMIT} per page", rows)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,173 @@
+"""
+Email throughput and its impact on /api/auth/signup latency.
+
+Compares the previous delivery (a new ``FastMail`` connection per message)
+with the pooled background :class:`Mailer`, against a local aiosmtpd server
+running in a separate process. ``fastapi-mail`` is no longer a dependency;
+the ``FastMail`` baseline only runs when it is installed separately.
+The local server has no TLS, so the per-connection cost measured here is a
+lower bound of what a STARTTLS handshake costs in production.
+
+Password hashing is stubbed out during the signup run so the numbers show
+the cost of email delivery alone.
+
+    python -m benchmarks.email_delivery
+"""
+import asyncio
+import itertools
+import multiprocessing
+import os
+import socket
+import time
+from unittest.mock import patch
+
+from aiosmtpd.controller import Controller
+
+with socket.socket() as probe:
+    probe.bind(("127.0.0.1", 0))
+    SMTP_PORT = probe.getsockname()[1]
+os.environ["MAIL_SERVER"] = "127.0.0.1"
+os.environ["MAIL_PORT"] = str(SMTP_PORT)
+os.environ["MAIL_STARTTLS"] = "false"
+
+from benchmarks import harness  # noqa: E402
+from benchmarks.common import print_table, run_concurrently  # noqa: E402
+
+MESSAGES = 500
+SEND_CONCURRENCY = 20
+SIGNUPS = 100
+CONCURRENCY = 10
+
+
+class CountingHandler:
+    def __init__(self, received):
+        self.received = received
+
+    async def handle_DATA(self, server, session, envelope):
+        with self.received.get_lock():
+            self.received.value += 1
+        return "250 OK"
+
+
+def serve(received, ready, stop):
+    controller = Controller(CountingHandler(received), hostname="127.0.0.1", port=SMTP_PORT)
+    controller.start()
+    ready.set()
+    stop.wait()
+    controller.stop()
+
+
+def legacy_sender():
+    try:
+        from fastapi_mail import ConnectionConfig, FastMail, MessageSchema, MessageType
+    except ImportError:
+        return None
+
+    from src.web13hm.conf.config import settings
+    from src.web13hm.services.auth import auth_service
+    from src.web13hm.services.email import MAIL_FROM_NAME, TEMPLATE_FOLDER
+
+    legacy_conf = ConnectionConfig(
+        MAIL_USERNAME=settings.mail_username,
+        MAIL_PASSWORD=settings.mail_password,
+        MAIL_FROM=settings.mail_from,
+        MAIL_PORT=settings.mail_port,
+        MAIL_SERVER=settings.mail_server,
+        MAIL_FROM_NAME=MAIL_FROM_NAME,
+        MAIL_STARTTLS=False,
+        MAIL_SSL_TLS=False,
+        USE_CREDENTIALS=False,
+        VALIDATE_CERTS=False,
+        TEMPLATE_FOLDER=TEMPLATE_FOLDER,
+    )
+
+    async def send_email(email, host):
+        token = await auth_service.create_email_token({"sub": email})
+        message = MessageSchema(
+            subject="Confirm your email ",
+            recipients=[email],
+            template_body={"host": host, "email": email, "token": token},
+            subtype=MessageType.html,
+        )
+        await FastMail(legacy_conf).send_message(message, template_name="email_template.html")
+
+    return send_email
+
+
+async def throughput(name: str, send, received, wait=None, connections=None) -> dict:
+    before = received.value
+    slots = asyncio.Semaphore(SEND_CONCURRENCY)
+
+    async def limited(i):
+        async with slots:
+            await send(f"user{i}@example.com", "http://bench/")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(limited(i) for i in range(MESSAGES)))
+    if wait is not None:
+        await wait()
+    elapsed = time.perf_counter() - started
+    assert received.value - before == MESSAGES
+    return {
+        "sender": name,
+        "messages": MESSAGES,
+        "connections": connections() if connections else MESSAGES,
+        "seconds": elapsed,
+        "msg_per_s": MESSAGES / elapsed,
+    }
+
+
+async def main():
+    from src.web13hm.services import email
+    from src.web13hm.services.mailer import Mailer, mailer
+
+    received = multiprocessing.Value("i", 0)
+    ready, stop = multiprocessing.Event(), multiprocessing.Event()
+    server = multiprocessing.Process(target=serve, args=(received, ready, stop))
+    server.start()
+    ready.wait()
+    mailer.username = mailer.password = None
+    legacy = legacy_sender()
+    senders = [("FastMail per message", legacy)] if legacy else []
+    try:
+        results = [await throughput(name, send, received) for name, send in senders]
+        for connections in (1, 2, 4):
+            pooled = Mailer(
+                hostname="127.0.0.1", port=SMTP_PORT, sender="bench@example.com", connections=connections
+            )
+            with patch.object(email, "mailer", pooled):
+                results.append(
+                    await throughput(
+                        f"Mailer x{connections}",
+                        email.send_email,
+                        received,
+                        wait=pooled.join,
+                        connections=lambda: pooled.connects,
+                    )
+                )
+            await pooled.stop()
+        print_table("Email delivery throughput", results)
+
+        latency = []
+        async with harness.app_client() as client:
+            for name, send in senders + [("Mailer", email.send_email)]:
+                counter = itertools.count()
+
+                def signup():
+                    body = {"username": f"new{next(counter)}@example.com", "password": "benchmark"}
+                    return client.post("/api/auth/signup", json=body)
+
+                with patch("src.web13hm.routes.auth.send_email", send), patch(
+                    "src.web13hm.services.auth.Auth.get_password_hash_async", return_value="hash"
+                ):
+                    await harness.reset_database()
+                    latency.append({"sender": name, **await run_concurrently(signup, CONCURRENCY, SIGNUPS)})
+            await mailer.stop()
+        print_table("POST /api/auth/signup latency", latency)
+    finally:
+        stop.set()
+        server.join()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,46 @@
+"""
+Render time per confirmation email.
+
+Compares the previous rendering (a new Jinja environment and template
+compilation per message, as ``fastapi_mail`` does), rendering a template
+compiled once, and splicing values into the cached static segments.
+
+    python -m benchmarks.email_render
+"""
+import time
+
+from benchmarks import harness  # noqa: F401
+from benchmarks.common import print_table
+
+RENDERS = 5_000
+
+
+def main():
+    from jinja2 import Environment, FileSystemLoader
+
+    from src.web13hm.services.email import TEMPLATE_FOLDER, confirmation_message, confirmation_template, templates
+
+    values = {"host": "http://bench/", "email": "user@example.com", "token": "eyJhbGciOi.eyJzdWIiOi.c2lnbmF0dXJl"}
+    compiled = templates.get_template("email_template.html")
+
+    def per_message_environment():
+        Environment(loader=FileSystemLoader(TEMPLATE_FOLDER)).get_template("email_template.html").render(**values)
+
+    variants = (
+        ("environment per message", per_message_environment),
+        ("compiled once", lambda: compiled.render(**values)),
+        ("cached segments", lambda: confirmation_template.render(**values)),
+        ("full message", lambda: confirmation_message(values["email"], values["host"], values["token"])),
+    )
+    results = []
+    for name, render in variants:
+        started = time.perf_counter()
+        for _ in range(RENDERS):
+            render()
+        elapsed = time.perf_counter() - started
+        results.append({"render": name, "count": RENDERS, "us_per_message": elapsed / RENDERS * 1e6})
+    print_table("Confirmation email render time", results)
+
+
+if __name__ == "__main__":
+    main()
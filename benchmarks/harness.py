@@ -0,0 +1,130 @@
+"""
+In-process harness for benchmarking the real application.
+
+Importing this module points the application at a throwaway SQLite database
+(or at ``BENCH_DATABASE_URL`` if set) and fills in placeholder values for the
+remaining required settings, so benchmarks run without a ``.env`` file.
+Import it before anything from ``src``.
+"""
+import os
+import tempfile
+from contextlib import asynccontextmanager
+
+import httpx
+
+BENCH_DIR = tempfile.mkdtemp(prefix="web13hm-bench-")
+
+os.environ["SQLALCHEMY_DATABASE_URL"] = os.environ.get(
+    "BENCH_DATABASE_URL", f"sqlite+aiosqlite:///{BENCH_DIR}/bench.db?timeout=30"
+)
+for key, value in {
+    "SECRET_KEY": "benchmark-secret",
+    "ALGORITHM": "HS256",
+    "MAIL_USERNAME": "bench",
+    "MAIL_PASSWORD": "bench",
+    "MAIL_FROM": "bench@example.com",
+    "MAIL_PORT": "1025",
+    "MAIL_SERVER": "localhost",
+    "CLOUDINARY_NAME": "bench",
+    "CLOUDINARY_API_KEY": "bench",
+    "CLOUDINARY_API_SECRET": "bench",
+}.items():
+    os.environ.setdefault(key, value)
+
+
+async def reset_database() -> None:
+    """
+    Drops and recreates the schema of the benchmark database.
+    """
+    from src.web13hm.database.db import engine
+    from src.web13hm.database.models import Base
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+
+@asynccontextmanager
+async def app_client():
+    """
+    Yields an ``httpx.AsyncClient`` talking to the application in-process.
+
+    The schema is recreated from scratch and rate limiting is disabled.
+    """
+    from main import app
+    from src.web13hm.core.config import limiter
+    from src.web13hm.database.db import engine
+    from src.web13hm.services.workers import password_hasher
+
+    limiter.enabled = False
+    await reset_database()
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            yield client
+    finally:
+        password_hasher.shutdown()
+        await engine.dispose()
+
+
+async def seed_user(email: str = "bench@example.com", password: str = "benchmark") -> str:
+    """
+    Creates a confirmed user and returns an access token for it.
+    """
+    from src.web13hm.database.db import SessionLocal
+    from src.web13hm.database.models import User
+    from src.web13hm.services.auth import auth_service
+
+    async with SessionLocal() as db:
+        db.add(
+            User(
+                email=email,
+                password=auth_service.get_password_hash(password),
+                confirmed=True,
+            )
+        )
+        await db.commit()
+    return await auth_service.create_access_token(data={"sub": email})
+
+
+async def seed_contacts(email: str, count: int, batch: int = 5000) -> int:
+    """
+    Bulk-inserts ``count`` generated contacts for the user with ``email``.
+
+    :return: The ID of the owner.
+    """
+    from datetime import date, timedelta
+
+    from sqlalchemy import insert, select
+
+    from src.web13hm.database.db import SessionLocal
+    from src.web13hm.database.models import ContactSearchTerm, Contacts, User, month_day
+    from src.web13hm.services.search import search_term_rows
+
+    async with SessionLocal() as db:
+        user_id = await db.scalar(select(User.id).where(User.email == email))
+        first_birthday = date(1970, 1, 1)
+        for start in range(0, count, batch):
+            rows = []
+            for i in range(start, min(start + batch, count)):
+                birthday = first_birthday + timedelta(days=i % 18000)
+                rows.append(
+                    {
+                        "name": f"name{i}",
+                        "last_name": f"last{i}",
+                        "email": f"contact{i}@example.com",
+                        "number": f"+380{i:09d}",
+                        "birthday": birthday,
+                        "birthday_month_day": month_day(birthday),
+                        "user_id": user_id,
+                    }
+                )
+            created = await db.execute(
+                insert(Contacts).returning(
+                    Contacts.id, Contacts.user_id, Contacts.name, Contacts.last_name, Contacts.email
+                ),
+                rows,
+            )
+            await db.execute(insert(ContactSearchTerm), search_term_rows(created.all()))
+        await db.commit()
+    return user_id
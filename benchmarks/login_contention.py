@@ -0,0 +1,64 @@
+"""
+Contacts-endpoint latency while logins are running concurrently.
+
+Compares bcrypt verification inline on the event loop with verification on
+the password hashing pool (``Auth.verify_password_async``).
+
+    python -m benchmarks.login_contention
+"""
+import asyncio
+from unittest.mock import patch
+
+from benchmarks import harness
+from benchmarks.common import print_table, run_concurrently
+
+LOGIN_CONCURRENCY = (0, 2, 4, 8)
+PROBES = 30
+
+
+async def measure(client, token: str, logins: int) -> dict:
+    stop = asyncio.Event()
+    login_form = {"username": "bench@example.com", "password": "benchmark"}
+
+    async def login_loop():
+        while not stop.is_set():
+            response = await client.post("/api/auth/login", data=login_form)
+            assert response.status_code == 200, response.text
+
+    headers = {"Authorization": f"Bearer {token}"}
+    background = [asyncio.create_task(login_loop()) for _ in range(logins)]
+    await asyncio.sleep(0.05)
+    try:
+        result = await run_concurrently(
+            lambda: client.get("/api/contacts/contacts", headers=headers), 1, PROBES
+        )
+    finally:
+        stop.set()
+        await asyncio.gather(*background)
+    return result
+
+
+async def main():
+    from src.web13hm.services.auth import Auth
+    from src.web13hm.services.workers import password_hasher
+
+    async def inline_verify(self, plain_password, hashed_password):
+        return self.verify_password(plain_password, hashed_password)
+
+    async with harness.app_client() as client:
+        token = await harness.seed_user()
+        for mode in ("inline", "pool"):
+            rows = []
+            for logins in LOGIN_CONCURRENCY:
+                if mode == "inline":
+                    with patch.object(Auth, "verify_password_async", inline_verify):
+                        result = await measure(client, token, logins)
+                else:
+                    result = await measure(client, token, logins)
+                rows.append({"logins": logins, **result})
+            print_table(f"GET /api/contacts/contacts, bcrypt {mode}", rows)
+        print("\npassword hashing pool:", password_hasher.stats())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,100 @@
+"""
+Request latency with and without the metrics middleware and SQL statement hooks.
+
+The application is imported with metrics disabled, then the same requests
+are replayed against the bare app and against the app wrapped in
+:class:`MetricsMiddleware` with the engine instrumented. A cached read is the
+worst case, since there is little else the request spends time on.
+
+    python -m benchmarks.metrics_overhead
+"""
+import asyncio
+import os
+import time
+
+from benchmarks import harness
+
+os.environ["METRICS_ENABLED"] = "false"
+
+import httpx  # noqa: E402
+
+from benchmarks.common import print_table, run_concurrently  # noqa: E402
+
+CONTACTS = 2_000
+REQUESTS = 2_000
+CONCURRENCY = 16
+URLS = {
+    "cached read": "/api/contacts/contacts?limit=10",
+    "uncached read": "/api/contacts/contacts/name42",
+}
+
+
+async def middleware_cost(iterations: int = 100_000) -> float:
+    """
+    Returns the time the middleware itself adds to a request, in microseconds, measured around a no-op app.
+    """
+    from src.web13hm.core.metrics import MetricsMiddleware
+
+    async def noop(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "GET", "path": "/"}
+    timings = []
+    for app in (noop, MetricsMiddleware(noop)):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            await app(scope, None, send)
+        timings.append(time.perf_counter() - started)
+    return (timings[1] - timings[0]) / iterations * 1e6
+
+
+async def measure(client: httpx.AsyncClient, headers: dict, clear) -> dict:
+    results = {}
+    for name, url in URLS.items():
+
+        async def get():
+            if name == "uncached read":
+                clear()
+            response = await client.get(url, headers=headers)
+            assert response.status_code == 200, response.text
+
+        await run_concurrently(get, CONCURRENCY, REQUESTS // 10)
+        results[name] = await run_concurrently(get, CONCURRENCY, REQUESTS)
+    return results
+
+
+async def main():
+    from main import app
+    from src.web13hm.core.metrics import MetricsMiddleware, instrument_engine, render_metrics
+    from src.web13hm.database.db import engine
+    from src.web13hm.services.response_cache import response_cache
+
+    async with harness.app_client() as bare:
+        token = await harness.seed_user()
+        await harness.seed_contacts("bench@example.com", CONTACTS)
+        headers = {"Authorization": f"Bearer {token}"}
+        baseline = await measure(bare, headers, response_cache.clear)
+
+        instrument_engine(engine.sync_engine)
+        transport = httpx.ASGITransport(app=MetricsMiddleware(app))
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as instrumented:
+            current = await measure(instrumented, headers, response_cache.clear)
+
+    rows = []
+    for name in URLS:
+        for mode, summary in (("off", baseline[name]), ("on", current[name])):
+            rows.append({"request": name, "metrics": mode, **summary})
+    print_table(f"Metrics overhead, {CONCURRENCY} concurrent", rows)
+    for name in URLS:
+        print(f"{name}: throughput {(current[name]['rps'] / baseline[name]['rps'] - 1) * 100:+.1f}%")
+    print(f"middleware cost: {await middleware_cost():.1f} us per request")
+    body, _ = render_metrics()
+    print(f"\n/metrics payload: {len(body)} bytes")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
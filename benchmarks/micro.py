@@ -0,0 +1,98 @@
+"""
+Microbenchmarks of the repository functions, the auth service and serialization, called directly.
+
+Each case runs sequentially against a seeded database, after a few untimed
+warm-up calls, and reports calls per second and p50/p95/p99 latency.
+
+    python -m benchmarks.micro
+"""
+import asyncio
+from datetime import date
+from typing import Dict
+
+from benchmarks import harness
+from benchmarks.common import print_table, run_concurrently
+
+CONTACTS = 5_000
+
+
+async def run(iterations: int = 500) -> Dict[str, dict]:
+    """
+    Runs every microbenchmark ``iterations`` times.
+
+    :return: The latency summary of each case, by name.
+    """
+    from fastapi.security import HTTPAuthorizationCredentials
+
+    from src.web13hm.database.db import SessionLocal, engine
+    from src.web13hm.repository import contacts as repository_contacts
+    from src.web13hm.repository import users as repository_users
+    from src.web13hm.services.auth import auth_service
+    from src.web13hm.services.cache import token_cache, user_cache
+    from src.web13hm.services.serialization import contact_columns, dump_rows
+    from src.web13hm.shemas import ContactModel
+
+    await harness.reset_database()
+    email = "bench@example.com"
+    token = await harness.seed_user(email)
+    await harness.seed_contacts(email, CONTACTS)
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    body = ContactModel(
+        name="Ann", last_name="Lee", email="ann@example.com", number="1", birthday=date(1990, 1, 1)
+    )
+    results = {}
+    try:
+        async with SessionLocal() as db:
+            user = await repository_users.get_user_by_email(email, db)
+            page = await repository_contacts.get_Contacts(0, 100, user, db, columns=contact_columns())
+            created = await repository_contacts.create_contact(body, db, user)
+
+            async def cold_current_user():
+                token_cache.clear()
+                user_cache.clear()
+                await auth_service.get_current_user(credentials, db)
+
+            async def cold_decode():
+                token_cache.clear()
+                await auth_service.decode_access_token(token)
+
+            cases = {
+                "repo.get_user_by_email": lambda: repository_users.get_user_by_email(email, db),
+                "repo.get_Contacts[100]": lambda: repository_contacts.get_Contacts(0, 100, user, db),
+                "repo.get_Contacts[100,columns]": lambda: repository_contacts.get_Contacts(
+                    0, 100, user, db, columns=contact_columns()
+                ),
+                "repo.search_contacts": lambda: repository_contacts.search_contacts("name12", 0, 10, user, db),
+                "repo.birthday_by_7_day": lambda: repository_contacts.birthday_by_7_day(
+                    0, 100, db, user, days=30, today=date(2025, 6, 1)
+                ),
+                "repo.create_contact": lambda: repository_contacts.create_contact(body, db, user),
+                "repo.patch_contact": lambda: repository_contacts.patch_contact(
+                    created.id, {"number": "2"}, db, user
+                ),
+                "auth.create_access_token": lambda: auth_service.create_access_token({"sub": email}),
+                "auth.decode_access_token[cold]": cold_decode,
+                "auth.decode_access_token[cached]": lambda: auth_service.decode_access_token(token),
+                "auth.get_current_user[cold]": cold_current_user,
+                "auth.get_current_user[cached]": lambda: auth_service.get_current_user(credentials, db),
+            }
+            for name, call in cases.items():
+                await run_concurrently(call, 1, max(1, iterations // 10))
+                results[name] = await run_concurrently(call, 1, iterations)
+
+        async def serialize():
+            dump_rows(page)
+
+        results["serialize.dump_rows[100]"] = await run_concurrently(serialize, 1, iterations)
+    finally:
+        await engine.dispose()
+    return results
+
+
+async def main():
+    results = await run()
+    print_table("Microbenchmarks", [{"case": name, **summary} for name, summary in results.items()])
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+"""
+Connection pool checkout wait as concurrency grows, for a few pool sizes.
+
+Each call checks out a connection and runs a query that takes ``QUERY_MS``
+on the database (simulated with a SQLite ``sleep`` function). Once calls in
+flight outnumber ``pool_size + max_overflow``, the excess queue for a
+connection; the wait reported by :class:`PoolMonitor` grows with the queue,
+and calls fail once it exceeds ``pool_timeout``.
+
+    python -m benchmarks.pool_wait
+"""
+import asyncio
+import os
+import tempfile
+import time
+
+from sqlalchemy import event, exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from benchmarks.common import print_table, run_concurrently
+from src.web13hm.database.pool import MonitoredQueuePool, PoolMonitor
+
+QUERY_MS = 10
+POOL_TIMEOUT = 1.0
+POOLS = ((5, 0), (5, 10), (20, 10))
+CONCURRENCY = (1, 5, 15, 30, 60, 120)
+
+
+def _register_sleep(dbapi_connection, connection_record):
+    dbapi_connection.create_function("sleep", 1, lambda ms: time.sleep(ms / 1000) or 0)
+
+
+async def measure(path: str, pool_size: int, max_overflow: int) -> list:
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{path}",
+        poolclass=MonitoredQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=POOL_TIMEOUT,
+        pool_pre_ping=True,
+    )
+    event.listen(engine.sync_engine, "connect", _register_sleep)
+    monitor = PoolMonitor()
+    monitor.instrument(engine.sync_engine)
+    query = text(f"SELECT sleep({QUERY_MS})")
+
+    async def call():
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(query)
+        except exc.TimeoutError:
+            pass
+
+    rows = []
+    try:
+        for concurrency in CONCURRENCY:
+            monitor.reset()
+            result = await run_concurrently(call, concurrency, concurrency * 10)
+            stats = monitor.stats(engine.sync_engine)
+            rows.append(
+                {
+                    "concurrency": concurrency,
+                    "rps": result["rps"],
+                    "p50_ms": result["p50_ms"],
+                    "p99_ms": result["p99_ms"],
+                    "mean_wait_ms": stats["mean_wait_ms"],
+                    "max_wait_ms": stats["max_wait_ms"],
+                    "timeouts": stats["timeouts"],
+                    "connections": stats["connections"],
+                }
+            )
+    finally:
+        await engine.dispose()
+    return rows
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        for pool_size, max_overflow in POOLS:
+            rows = await measure(path, pool_size, max_overflow)
+            print_table(
+                f"pool_size={pool_size} max_overflow={max_overflow} ({QUERY_MS} ms query, {POOL_TIMEOUT} s timeout)",
+                rows,
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
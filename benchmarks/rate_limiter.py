@@ -0,0 +1,62 @@
+"""
+Per-request overhead of the rate limiter, in microseconds, for each storage backend.
+
+Each request costs one ``hit`` on the sliding window counter, which is what
+slowapi does for every decorated route. Redis is measured against an
+in-process fake unless ``BENCH_REDIS_URL`` points at a real server.
+
+    python -m benchmarks.rate_limiter
+"""
+import os
+import tempfile
+import time
+
+from limits import parse, storage, strategies
+
+from benchmarks.common import percentile, print_table
+from src.web13hm.core import limiter_storage  # noqa: F401
+
+REQUESTS = 20_000
+CLIENTS = 1_000
+
+
+def backends():
+    yield "memory", storage.storage_from_string("memory://")
+    path = os.path.join(tempfile.mkdtemp(prefix="web13hm-bench-"), "limits.db")
+    yield "sqlite", storage.storage_from_string(f"sqlite:///{path}")
+    if os.environ.get("BENCH_REDIS_URL"):
+        yield "redis", storage.storage_from_string(os.environ["BENCH_REDIS_URL"])
+    else:
+        import fakeredis
+        import redis
+
+        pool = redis.ConnectionPool(
+            connection_class=fakeredis.FakeRedisConnection, server=fakeredis.FakeServer()
+        )
+        yield "redis (fake)", storage.storage_from_string("redis://localhost", connection_pool=pool)
+
+
+def main():
+    item = parse("1000000/minute")
+    results = []
+    for name, backend in backends():
+        limiter = strategies.SlidingWindowCounterRateLimiter(backend)
+        samples = []
+        for i in range(REQUESTS):
+            started = time.perf_counter()
+            limiter.hit(item, f"client-{i % CLIENTS}")
+            samples.append(time.perf_counter() - started)
+        results.append(
+            {
+                "storage": name,
+                "hits": REQUESTS,
+                "mean_us": sum(samples) / len(samples) * 1e6,
+                "p50_us": percentile(samples, 50) * 1e6,
+                "p99_us": percentile(samples, 99) * 1e6,
+            }
+        )
+    print_table("Rate limiter overhead per request", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Refresh-token rotation throughput and the writes it causes per table.
+
+Every client holds its own login session of the same user and keeps
+refreshing it, as mobile apps do. Refreshes only touch ``refresh_sessions``;
+the ``users`` row is never written.
+
+    python -m benchmarks.refresh_sessions
+"""
+import asyncio
+import re
+from collections import Counter
+
+from sqlalchemy import event
+
+from benchmarks import harness
+from benchmarks.common import print_table, run_concurrently
+
+CLIENTS = (1, 8, 32)
+REFRESHES = 400
+
+WRITE = re.compile(r"^\s*(INSERT INTO|UPDATE|DELETE FROM)\s+(\w+)", re.IGNORECASE)
+
+
+async def main():
+    from src.web13hm.database.db import engine
+
+    writes = Counter()
+
+    def count_writes(conn, cursor, statement, parameters, context, executemany):
+        match = WRITE.match(statement)
+        if match:
+            writes[match.group(2)] += 1
+
+    async with harness.app_client() as client:
+        await harness.seed_user()
+        login_form = {"username": "bench@example.com", "password": "benchmark"}
+        rows = []
+        for clients in CLIENTS:
+            tokens = []
+            for _ in range(clients):
+                response = await client.post("/api/auth/login", data=login_form)
+                tokens.append(response.json()["refresh_token"])
+            free = asyncio.Queue()
+            for token in tokens:
+                free.put_nowait(token)
+
+            async def refresh():
+                token = await free.get()
+                response = await client.get(
+                    "/api/auth/refresh_token", headers={"Authorization": f"Bearer {token}"}
+                )
+                assert response.status_code == 200, response.text
+                free.put_nowait(response.json()["refresh_token"])
+
+            writes.clear()
+            event.listen(engine.sync_engine, "before_cursor_execute", count_writes)
+            try:
+                result = await run_concurrently(refresh, clients, REFRESHES)
+            finally:
+                event.remove(engine.sync_engine, "before_cursor_execute", count_writes)
+            rows.append(
+                {
+                    "clients": clients,
+                    **result,
+                    "users_writes": writes["users"],
+                    "session_writes": writes["refresh_sessions"],
+                }
+            )
+        print_table(f"GET /api/auth/refresh_token x{REFRESHES}", rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
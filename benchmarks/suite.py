@@ -0,0 +1,121 @@
+"""
+Runs the microbenchmarks and the load mixes, and compares the results with a stored baseline.
+
+    python -m benchmarks.suite --save benchmarks/baseline.json     # record a baseline
+    python -m benchmarks.suite --compare benchmarks/baseline.json  # exit 1 on regressions
+
+A case regresses when its throughput drops or its p50 latency grows by more
+than ``--threshold`` (20% by default); p99 latency, being noisier, is allowed
+twice that. Latency changes below ``--min-ms`` are ignored as noise.
+Baselines are only comparable on the same machine and database backend.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from benchmarks import harness  # noqa: F401
+from benchmarks import load, micro
+from benchmarks.common import print_table
+
+# For each compared metric: whether a higher value is better, and the multiple of the threshold tolerated.
+METRICS = {"rps": (True, 1), "p50_ms": (False, 1), "p99_ms": (False, 2)}
+
+
+def compare(
+    baseline: Dict[str, dict], current: Dict[str, dict], threshold: float, min_ms: float = 0.1
+) -> List[dict]:
+    """
+    Compares the cases present in both runs.
+
+    :param baseline: The stored results, by case name.
+    :param current: The new results, by case name.
+    :param threshold: The relative change tolerated before a metric regresses.
+    :param min_ms: The smallest latency change, in milliseconds, that can count as a regression.
+    :return: One row per case and metric, with the change and whether it regressed.
+    """
+    rows = []
+    for case in sorted(baseline.keys() & current.keys()):
+        for metric, (higher_is_better, tolerance) in METRICS.items():
+            before, after = baseline[case].get(metric), current[case].get(metric)
+            if not before or after is None:
+                continue
+            change = after / before - 1
+            worse = -change if higher_is_better else change
+            if metric.endswith("_ms") and after - before < min_ms:
+                worse = min(worse, 0)
+            rows.append(
+                {
+                    "case": case,
+                    "metric": metric,
+                    "baseline": before,
+                    "current": after,
+                    "change_pct": change * 100,
+                    "regressed": "YES" if worse > threshold * tolerance else "",
+                }
+            )
+    return rows
+
+
+async def run(quick: bool) -> Dict[str, dict]:
+    results = {}
+    micro_results = await micro.run(iterations=100 if quick else 500)
+    results.update({f"micro/{name}": summary for name, summary in micro_results.items()})
+    for mix in load.MIXES:
+        load_results = await load.run(
+            mix,
+            users=2 if quick else 4,
+            contacts_per_user=500 if quick else 2_000,
+            requests=300 if quick else 2_000,
+        )
+        results.update({f"load/{mix}/{name}": summary for name, summary in load_results.items()})
+    return results
+
+
+def backend() -> str:
+    return os.environ["SQLALCHEMY_DATABASE_URL"].split(":", 1)[0]
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--quick", action="store_true", help="fewer iterations, for a smoke run")
+    parser.add_argument("--save", metavar="PATH", help="write the results as the new baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare with a stored baseline")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--min-ms", type=float, default=0.1)
+    args = parser.parse_args()
+
+    results = await run(args.quick)
+    print_table("Benchmark suite", [{"case": name, **summary} for name, summary in results.items()])
+
+    if args.save:
+        document = {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "machine": platform.node(),
+            "python": platform.python_version(),
+            "database": backend(),
+            "results": results,
+        }
+        with open(args.save, "w") as file:
+            json.dump(document, file, indent=2, sort_keys=True)
+        print(f"\nbaseline written to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        if baseline.get("database") != backend():
+            print(f"\nwarning: baseline ran on {baseline.get('database')}, this run on {backend()}")
+        rows = compare(baseline["results"], results, args.threshold, args.min_ms)
+        print_table(f"Compared with {args.compare} ({baseline.get('created')})", rows)
+        regressions = [row for row in rows if row["regressed"]]
+        print(f"\n{len(regressions)} regressions beyond {args.threshold:.0%}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
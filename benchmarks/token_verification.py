@@ -0,0 +1,65 @@
+"""
+Access-token verifications per second: full JWT decode per algorithm vs the verified-token cache.
+
+    python -m benchmarks.token_verification
+"""
+import asyncio
+import time
+from unittest.mock import patch
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+from benchmarks import harness  # noqa: F401
+from benchmarks.common import print_table
+
+VERIFICATIONS = 5_000
+
+
+def private_pem(key) -> str:
+    return key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+
+
+async def rate(call) -> float:
+    started = time.perf_counter()
+    for _ in range(VERIFICATIONS):
+        await call()
+    return VERIFICATIONS / (time.perf_counter() - started)
+
+
+async def main():
+    from src.web13hm.services import auth
+    from src.web13hm.services.cache import token_cache
+    from src.web13hm.services.jwks import SigningKeys
+
+    algorithms = {
+        "HS256": SigningKeys("HS256", "benchmark-secret"),
+        "RS256": SigningKeys("RS256", "", private_key=private_pem(rsa.generate_private_key(65537, 2048))),
+        "ES256": SigningKeys("ES256", "", private_key=private_pem(ec.generate_private_key(ec.SECP256R1()))),
+    }
+    results = []
+    for name, keys in algorithms.items():
+        with patch.object(auth, "signing_keys", keys):
+            token = await auth.auth_service.create_access_token({"sub": "bench@example.com"})
+
+            async def uncached():
+                token_cache.clear()
+                await auth.auth_service.decode_access_token(token)
+
+            full = await rate(uncached)
+            cached = await rate(lambda: auth.auth_service.decode_access_token(token))
+        results.append(
+            {
+                "algorithm": name,
+                "decode_per_s": full,
+                "cached_per_s": cached,
+                "speedup": cached / full,
+            }
+        )
+    print_table("Access-token verification", results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,55 @@
+"""
+Latency of the upcoming-birthdays query for a user with a very large address book.
+
+    python -m benchmarks.upcoming_birthdays [contacts]
+"""
+import asyncio
+import sys
+import time
+from datetime import date
+
+from benchmarks import harness
+from benchmarks.common import print_table, summarize
+
+REPEAT = 200
+WINDOWS = (
+    ("mid-year, 7 days", date(2025, 6, 1), 7),
+    ("new year wrap, 7 days", date(2025, 12, 29), 7),
+    ("mid-year, 30 days", date(2025, 6, 1), 30),
+)
+
+
+async def main(count: int):
+    from src.web13hm.database.db import SessionLocal, engine
+    from src.web13hm.database.models import User
+    from src.web13hm.repository import contacts as repository
+
+    await harness.reset_database()
+    await harness.seed_user()
+    user = User(id=await harness.seed_contacts("bench@example.com", count, batch=20_000))
+
+    rows = []
+    async with SessionLocal() as db:
+        for label, today, days in WINDOWS:
+            samples = []
+            for _ in range(REPEAT):
+                started = time.perf_counter()
+                page = await repository.birthday_by_7_day(
+                    skip=0, limit=10, db=db, current_user=user, days=days, today=today
+                )
+                samples.append(time.perf_counter() - started)
+            result = summarize(samples, sum(samples))
+            rows.append(
+                {
+                    "window": label,
+                    "rows": len(page),
+                    "p50_ms": result["p50_ms"],
+                    "p99_ms": result["p99_ms"],
+                }
+            )
+    print_table(f"birthday_by_7_day, {count} contacts, limit 10", rows)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000))
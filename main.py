@@ -1,19 +1,51 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 from slowapi import _rate_limit_exceeded_handler
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.requests import Request
+from src.web13hm.conf.config import settings
+from src.web13hm.core.config import limiter
+from src.web13hm.core.metrics import (
+    MetricsMiddleware,
+    instrument_engine,
+    render_metrics,
+    track_cache,
+    track_executor,
+)
+from src.web13hm.core.sql_audit import SQLAuditMiddleware, sql_auditor
 from src.web13hm.routes import auth, contacts, users
+from src.web13hm.database.db import engine, pool_monitor, replica_set
+from src.web13hm.services import avatars
+from src.web13hm.services.cache import token_cache, user_cache
+from src.web13hm.services.mailer import mailer
+from src.web13hm.services.response_cache import response_cache
+from src.web13hm.services.sessions import cleanup_sessions
+from src.web13hm.services.workers import password_hasher
 
 
-limiter = Limiter(key_func=get_remote_address)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    avatars.avatar_storage.configure()
+    session_cleanup = asyncio.create_task(
+        cleanup_sessions(settings.session_cleanup_interval, settings.session_cleanup_batch_size)
+    )
+    yield
+    session_cleanup.cancel()
+    await mailer.stop()
+    password_hasher.shutdown()
+    avatars.image_workers.shutdown()
+    avatars.upload_workers.shutdown()
+    await replica_set.dispose()
+    await engine.dispose()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 app.add_middleware(SlowAPIMiddleware)
@@ -26,6 +58,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.sql_audit_enabled:
+    app.add_middleware(SQLAuditMiddleware, auditor=sql_auditor)
+    for audited in (engine, *replica_set.engines):
+        sql_auditor.instrument(audited.sync_engine)
+
+if settings.metrics_enabled:
+    # Outermost, so the latency includes every other middleware.
+    app.add_middleware(MetricsMiddleware)
+    for instrumented in (engine, *replica_set.engines):
+        instrument_engine(instrumented.sync_engine)
+    track_cache("user", user_cache)
+    track_cache("token", token_cache)
+    track_cache("response", response_cache.entries)
+    for executor in (password_hasher, avatars.image_workers, avatars.upload_workers):
+        track_executor(executor)
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        body, content_type = render_metrics()
+        return Response(body, media_type=content_type)
+
+    @app.get("/metrics/pool", include_in_schema=False)
+    async def pool_stats():
+        """
+        Returns the state of the database connection pool: checked-out connections, overflow, checkout wait times and connection ages.
+        """
+        return {
+            **pool_monitor.stats(engine.sync_engine),
+            "recycle_s": settings.db_pool_recycle,
+            "pre_ping": settings.db_pool_pre_ping,
+            "replicas": replica_set.stats(),
+        }
+
 
 app.include_router(auth.router, prefix="/api")
 app.include_router(contacts.router, prefix="/api")
@@ -0,0 +1,58 @@
+"""Initial schema, as previously created by Base.metadata.create_all
+
+Databases created before migrations were introduced already have these
+tables; mark them as migrated with ``alembic stamp 0001`` and then run
+``alembic upgrade head``.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("email", sa.String(length=150), nullable=False),
+        sa.Column("password", sa.String(length=255), nullable=False),
+        sa.Column("avatar", sa.String(length=255), nullable=True),
+        sa.Column("refresh_token", sa.String(length=255), nullable=True),
+        sa.Column("confirmed", sa.Boolean(), nullable=True),
+        sa.Column("crated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("email"),
+    )
+    op.create_table(
+        "contacts",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=50), nullable=True),
+        sa.Column("last_name", sa.String(length=50), nullable=True),
+        sa.Column("email", sa.String(length=50), nullable=True),
+        sa.Column("number", sa.String(length=50), nullable=True),
+        sa.Column("birthday", sa.Date(), nullable=True),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("extra_data", sa.String(length=150), nullable=True),
+        sa.Column("crated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_contacts_id", "contacts", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_contacts_id", table_name="contacts")
+    op.drop_table("contacts")
+    op.drop_table("users")
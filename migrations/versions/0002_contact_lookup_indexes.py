@@ -0,0 +1,43 @@
+"""Composite indexes for the contact lookups and an index on users.email
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CONTACT_INDEXES = {
+    "ix_contacts_user_id_id": ["user_id", "id"],
+    "ix_contacts_user_id_name": ["user_id", "name"],
+    "ix_contacts_user_id_last_name": ["user_id", "last_name"],
+    "ix_contacts_user_id_email": ["user_id", "email"],
+    "ix_contacts_user_id_birthday": ["user_id", "birthday"],
+}
+
+
+def upgrade() -> None:
+    for name, columns in CONTACT_INDEXES.items():
+        op.create_index(name, "contacts", columns)
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    if op.get_bind().dialect.name == "postgresql":
+        # Superseded by the unique index above.
+        op.execute("ALTER TABLE users DROP CONSTRAINT IF EXISTS users_email_key")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.create_unique_constraint("users_email_key", "users", ["email"])
+    op.drop_index("ix_users_email", table_name="users")
+    for name in reversed(list(CONTACT_INDEXES)):
+        op.drop_index(name, table_name="contacts")
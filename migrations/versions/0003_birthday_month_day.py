@@ -0,0 +1,69 @@
+"""Year-independent birthday column for the upcoming-birthdays query
+
+Adds contacts.birthday_month_day (month * 100 + day), backfills it and
+replaces the (user_id, birthday) index, which no query uses any more, with
+(user_id, birthday_month_day).
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL = {
+    "postgresql": "EXTRACT(MONTH FROM birthday) * 100 + EXTRACT(DAY FROM birthday)",
+    "sqlite": "CAST(strftime('%m%d', birthday) AS INTEGER)",
+}
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("contacts") as batch_op:
+        batch_op.add_column(sa.Column("birthday_month_day", sa.SmallInteger(), nullable=True))
+
+    bind = op.get_bind()
+    expression = BACKFILL.get(bind.dialect.name)
+    if expression is not None:
+        op.execute(
+            f"UPDATE contacts SET birthday_month_day = {expression} WHERE birthday IS NOT NULL"
+        )
+    else:
+        contacts = sa.table(
+            "contacts",
+            sa.column("id", sa.Integer),
+            sa.column("birthday", sa.Date),
+            sa.column("birthday_month_day", sa.SmallInteger),
+        )
+        rows = bind.execute(
+            sa.select(contacts.c.id, contacts.c.birthday).where(contacts.c.birthday.isnot(None))
+        ).all()
+        for contact_id, birthday in rows:
+            bind.execute(
+                contacts.update()
+                .where(contacts.c.id == contact_id)
+                .values(birthday_month_day=birthday.month * 100 + birthday.day)
+            )
+
+    op.create_index(
+        "ix_contacts_user_id_birthday_month_day",
+        "contacts",
+        ["user_id", "birthday_month_day"],
+    )
+    op.drop_index("ix_contacts_user_id_birthday", table_name="contacts")
+
+
+def downgrade() -> None:
+    op.create_index("ix_contacts_user_id_birthday", "contacts", ["user_id", "birthday"])
+    op.drop_index("ix_contacts_user_id_birthday_month_day", table_name="contacts")
+    with op.batch_alter_table("contacts") as batch_op:
+        batch_op.drop_column("birthday_month_day")
@@ -0,0 +1,94 @@
+"""Inverted index of contact names and emails for prefix search
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH = 5000
+
+# A frozen copy of the tokenizer as of this revision, so later changes to the
+# application's search_terms do not change what this migration backfills.
+TERM_LENGTH = 64
+_SEPARATORS = re.compile(r"[^\w]+")
+
+
+def search_terms(*values):
+    terms = set()
+    for value in values:
+        if not value:
+            continue
+        value = value.lower().strip()
+        terms.add(value[:TERM_LENGTH])
+        terms.update(word[:TERM_LENGTH] for word in _SEPARATORS.split(value) if word)
+    terms.discard("")
+    return terms
+
+
+def search_term_rows(contacts):
+    return [
+        {"contact_id": contact.id, "user_id": contact.user_id, "term": term}
+        for contact in contacts
+        for term in search_terms(contact.name, contact.last_name, contact.email)
+    ]
+
+
+def upgrade() -> None:
+    search_terms = op.create_table(
+        "contact_search_terms",
+        sa.Column("contact_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "term",
+            sa.String(length=64).with_variant(sa.String(length=64, collation="C"), "postgresql"),
+            nullable=False,
+        ),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["contact_id"], ["contacts.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("contact_id", "term"),
+    )
+
+    contacts = sa.table(
+        "contacts",
+        sa.column("id", sa.Integer),
+        sa.column("user_id", sa.Integer),
+        sa.column("name", sa.String),
+        sa.column("last_name", sa.String),
+        sa.column("email", sa.String),
+    )
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        batch = bind.execute(
+            sa.select(contacts)
+            .where(contacts.c.id > last_id)
+            .order_by(contacts.c.id)
+            .limit(BACKFILL_BATCH)
+        ).all()
+        if not batch:
+            break
+        rows = search_term_rows(batch)
+        if rows:
+            bind.execute(search_terms.insert(), rows)
+        last_id = batch[-1].id
+
+    op.create_index(
+        "ix_contact_search_terms_user_id_term", "contact_search_terms", ["user_id", "term"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_contact_search_terms_user_id_term", table_name="contact_search_terms")
+    op.drop_table("contact_search_terms")
@@ -0,0 +1,48 @@
+"""Refresh-token sessions in their own table
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "refresh_sessions",
+        sa.Column("id", sa.String(length=32), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("token_hash", sa.String(length=64), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_refresh_sessions_token_hash", "refresh_sessions", ["token_hash"], unique=True
+    )
+    op.create_index("ix_refresh_sessions_expires_at", "refresh_sessions", ["expires_at"])
+    op.create_index("ix_refresh_sessions_user_id", "refresh_sessions", ["user_id"])
+    # Existing refresh tokens are not carried over: their holders log in again.
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("refresh_token")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.add_column(sa.Column("refresh_token", sa.String(length=255), nullable=True))
+    op.drop_index("ix_refresh_sessions_user_id", table_name="refresh_sessions")
+    op.drop_index("ix_refresh_sessions_expires_at", table_name="refresh_sessions")
+    op.drop_index("ix_refresh_sessions_token_hash", table_name="refresh_sessions")
+    op.drop_table("refresh_sessions")
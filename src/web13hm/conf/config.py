@@ -1,17 +1,78 @@
+from typing import List, Optional
+
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
 
     sqlalchemy_database_url: str
+    sqlalchemy_replica_urls: List[str] = []
+    replica_retry_interval: float = 30
+    read_your_writes_window: float = 5
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 30 * 60
+    db_pool_pre_ping: bool = True
+
     secret_key: str
     algorithm: str
+    jwt_private_key: Optional[str] = None
+    jwt_public_key: Optional[str] = None
+    jwt_key_id: Optional[str] = "web13hm-1"
+    token_cache_maxsize: int = 10000
+    token_cache_ttl: float = 900
+    access_token_ttl: int = 15 * 60
+    refresh_token_ttl: int = 7 * 24 * 60 * 60
+    session_cleanup_interval: float = 60 * 60
+    session_cleanup_batch_size: int = 1000
+
+    user_cache_maxsize: int = 1024
+    user_cache_ttl: float = 300
+    response_cache_maxsize: int = 10000
+    response_cache_ttl: float = 300
+
+    password_hash_executor: str = "thread"
+    password_hash_workers: int = 2
+    password_hash_concurrency: int = 4
+
+    import_chunk_size: int = 1000
+    import_max_errors: int = 1000
+    import_max_record_lines: int = 100
+    export_batch_size: int = 1000
+
+    rate_limit_storage_uri: str = "memory://"
+    rate_limit_strategy: str = "sliding-window-counter"
+
+    metrics_enabled: bool = True
+    sql_audit_enabled: bool = False
+    sql_audit_strict: bool = False
+    sql_slow_query_seconds: float = 0.1
+    sql_repeated_query_threshold: int = 5
+    sql_explain_slow_queries: bool = False
 
     mail_username: str
     mail_password: str
     mail_from: str
     mail_port: int
     mail_server: str
+    mail_starttls: bool = True
+    mail_ssl_tls: bool = False
+    mail_validate_certs: bool = True
+    mail_connections: int = 2
+    mail_queue_size: int = 1000
+    mail_batch_size: int = 50
+    mail_max_retries: int = 3
+    mail_retry_backoff: float = 1.0
+
+    avatar_storage: str = "local"
+    avatar_local_dir: str = "media/avatars"
+    avatar_size: int = 250
+    avatar_sizes: List[int] = [32, 64, 128, 250]
+    avatar_max_bytes: int = 5 * 1024 * 1024
+    avatar_executor: str = "process"
+    avatar_workers: int = 2
+    avatar_upload_workers: int = 4
 
     cloudinary_name: str
     cloudinary_api_key: str
@@ -1,4 +1,14 @@
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-limiter = Limiter(key_func=get_remote_address)
+from src.web13hm.conf.config import settings
+from src.web13hm.core import limiter_storage  # noqa: F401  registers the sqlite:// scheme
+
+limiter = Limiter(
+    key_func=get_remote_address,
+    strategy=settings.rate_limit_strategy,
+    storage_uri=settings.rate_limit_storage_uri,
+    storage_options={"wrap_exceptions": True},
+    # A storage that is down or locked lets the request through rather than stalling or failing it.
+    swallow_errors=True,
+)
@@ -0,0 +1,238 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from typing import Tuple
+
+from limits.aio.storage import Storage as AsyncStorage
+from limits.storage import SlidingWindowCounterSupport, Storage
+
+
+class SQLiteStorage(Storage, SlidingWindowCounterSupport):
+    """
+    A rate limit storage kept in a SQLite file, shared by every worker process on the host.
+
+    Registered with ``limits`` under the ``sqlite`` scheme, with URIs following
+    the SQLAlchemy convention: ``sqlite:///relative.db`` or ``sqlite:////absolute.db``.
+    A sliding window counter takes a single row per key, holding the counts of
+    the current and previous windows, so memory per key is constant. Updates
+    run in ``BEGIN IMMEDIATE`` transactions and are therefore atomic across processes.
+
+    The limiter calls the storage synchronously, inside the event loop, so a
+    worker waits at most ``timeout`` for another one holding the write lock;
+    past that the call fails with ``sqlite3.OperationalError``, or
+    ``limits.errors.StorageError`` with ``wrap_exceptions``.
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(
+        self,
+        uri: str,
+        wrap_exceptions: bool = False,
+        timeout: float = 0.05,
+        purge_interval: int = 1000,
+        **_: str,
+    ):
+        """
+        :param uri: The storage URI.
+        :type uri: str
+        :param wrap_exceptions: Whether to wrap storage errors in ``limits.errors.StorageError``.
+        :type wrap_exceptions: bool
+        :param timeout: How long to wait for another process holding the write lock, in seconds.
+        :type timeout: float
+        :param purge_interval: Expired rows are deleted once every this many writes.
+        :type purge_interval: int
+        """
+        super().__init__(uri, wrap_exceptions=wrap_exceptions)
+        self.path = uri.partition(":///")[2] or ":memory:"
+        self.purge_interval = int(purge_interval)
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            self.path, timeout=float(timeout), isolation_level=None, check_same_thread=False
+        )
+        with self._lock:
+            if self.path != ":memory:":
+                self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_counters ("
+                "key TEXT PRIMARY KEY, value INTEGER NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_windows ("
+                "key TEXT PRIMARY KEY, window INTEGER NOT NULL, previous INTEGER NOT NULL, "
+                "current INTEGER NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    @property
+    def base_exceptions(self) -> type:
+        return sqlite3.Error
+
+    def _purge(self, now: float) -> None:
+        self._writes += 1
+        if self._writes % self.purge_interval:
+            return
+        self._connection.execute("DELETE FROM rate_limit_counters WHERE expires_at <= ?", (now,))
+        self._connection.execute("DELETE FROM rate_limit_windows WHERE expires_at <= ?", (now,))
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = time.time()
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                (value,) = self._connection.execute(
+                    "INSERT INTO rate_limit_counters (key, value, expires_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET "
+                    "value = CASE WHEN expires_at <= ? THEN excluded.value ELSE value + excluded.value END, "
+                    "expires_at = CASE WHEN expires_at <= ? THEN excluded.expires_at ELSE expires_at END "
+                    "RETURNING value",
+                    (key, amount, now + expiry, now, now),
+                ).fetchone()
+                self._purge(now)
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+        return value
+
+    def get(self, key: str) -> int:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM rate_limit_counters WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key: str) -> float:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT expires_at FROM rate_limit_counters WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else time.time()
+
+    def check(self) -> bool:
+        try:
+            with self._lock:
+                self._connection.execute("SELECT 1").fetchone()
+        except sqlite3.Error:
+            return False
+        return True
+
+    def reset(self) -> int:
+        with self._lock:
+            counters = self._connection.execute("DELETE FROM rate_limit_counters").rowcount
+            windows = self._connection.execute("DELETE FROM rate_limit_windows").rowcount
+        return counters + windows
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM rate_limit_counters WHERE key = ?", (key,))
+
+    @staticmethod
+    def _shift(row, window: int) -> Tuple[int, int]:
+        """
+        Returns the (previous, current) counts of ``window`` from a stored row.
+        """
+        if row is None:
+            return 0, 0
+        stored_window, previous, current = row
+        if stored_window == window:
+            return previous, current
+        if stored_window == window - 1:
+            return current, 0
+        return 0, 0
+
+    @staticmethod
+    def _ttls(previous: int, expiry: int, now: float) -> Tuple[float, float]:
+        elapsed = now % expiry
+        return (expiry - elapsed if previous else 0.0), 2 * expiry - elapsed
+
+    def _select_window(self, key: str):
+        return self._connection.execute(
+            "SELECT window, previous, current FROM rate_limit_windows WHERE key = ?", (key,)
+        ).fetchone()
+
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        now = time.time()
+        window = int(now // expiry)
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                previous, current = self._shift(self._select_window(key), window)
+                previous_ttl, _ = self._ttls(previous, expiry, now)
+                if int(previous * previous_ttl / expiry + current) + amount > limit:
+                    self._connection.execute("COMMIT")
+                    return False
+                self._connection.execute(
+                    "INSERT INTO rate_limit_windows (key, window, previous, current, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+                    "window = excluded.window, previous = excluded.previous, "
+                    "current = excluded.current, expires_at = excluded.expires_at",
+                    (key, window, previous, current + amount, (window + 2) * expiry),
+                )
+                self._purge(now)
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+        return True
+
+    def get_sliding_window(self, key: str, expiry: int) -> Tuple[int, float, int, float]:
+        now = time.time()
+        with self._lock:
+            row = self._select_window(key)
+        previous, current = self._shift(row, int(now // expiry))
+        previous_ttl, current_ttl = self._ttls(previous, expiry, now)
+        return previous, previous_ttl, current, current_ttl
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM rate_limit_windows WHERE key = ?", (key,))
+
+
+class AsyncSQLiteStorage(AsyncStorage):
+    """
+    :class:`SQLiteStorage` for ``limits.aio``, registered under the ``async+sqlite`` scheme.
+
+    Every call runs on a worker thread, so a worker waiting for another
+    process's write lock does not stall the event loop.
+    """
+
+    STORAGE_SCHEME = ["async+sqlite"]
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, **options):
+        """
+        :param uri: The storage URI, e.g. ``async+sqlite:////var/run/web13hm/limits.db``.
+        :type uri: str
+        :param wrap_exceptions: Whether to wrap storage errors in ``limits.errors.StorageError``.
+        :type wrap_exceptions: bool
+        :param options: Passed on to :class:`SQLiteStorage`.
+        """
+        super().__init__(uri, wrap_exceptions=wrap_exceptions)
+        self.sync = SQLiteStorage(uri.removeprefix("async+"), **options)
+
+    @property
+    def base_exceptions(self) -> type:
+        return sqlite3.Error
+
+    async def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        return await asyncio.to_thread(self.sync.incr, key, expiry, amount)
+
+    async def get(self, key: str) -> int:
+        return await asyncio.to_thread(self.sync.get, key)
+
+    async def get_expiry(self, key: str) -> float:
+        return await asyncio.to_thread(self.sync.get_expiry, key)
+
+    async def check(self) -> bool:
+        return await asyncio.to_thread(self.sync.check)
+
+    async def reset(self) -> int:
+        return await asyncio.to_thread(self.sync.reset)
+
+    async def clear(self, key: str) -> None:
+        await asyncio.to_thread(self.sync.clear, key)
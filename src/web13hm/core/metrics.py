@@ -0,0 +1,295 @@
+import functools
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    ProcessCollector,
+    generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+registry = CollectorRegistry()
+ProcessCollector(registry=registry)
+
+# Latency buckets from 1 ms to 10 s.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route template and status.", ["method", "route", "status"],
+    registry=registry,
+)
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ["method", "route"],
+    buckets=LATENCY_BUCKETS, registry=registry,
+)
+IN_PROGRESS = Gauge("http_requests_in_progress", "HTTP requests being served.", registry=registry)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements executed per request.", ["route"],
+    buckets=QUERY_COUNT_BUCKETS, registry=registry,
+)
+REQUEST_QUERY_SECONDS = Histogram(
+    "http_request_db_seconds", "Time spent executing SQL per request.", ["route"],
+    buckets=LATENCY_BUCKETS, registry=registry,
+)
+QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds", "SQL statement latency by statement type.", ["operation"],
+    buckets=LATENCY_BUCKETS, registry=registry,
+)
+AUTH_SECONDS = Histogram(
+    "auth_operation_duration_seconds", "Latency of authentication operations.", ["operation"],
+    buckets=LATENCY_BUCKETS, registry=registry,
+)
+EMAIL_SECONDS = Histogram(
+    "email_send_duration_seconds", "Latency of delivering one email over SMTP.",
+    buckets=LATENCY_BUCKETS, registry=registry,
+)
+EMAILS = Counter("emails_total", "Email delivery attempts by result.", ["result"], registry=registry)
+EMAILS_SENT = EMAILS.labels("sent")
+EMAILS_RETRIED = EMAILS.labels("retried")
+EMAILS_FAILED = EMAILS.labels("failed")
+
+# Requests that matched no route share one label, so scanners cannot blow up cardinality.
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class RequestStats:
+    """
+    The SQL statements executed on behalf of one request.
+    """
+    __slots__ = ("queries", "query_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """
+    Returns the SQL statistics of the request being served, if any.
+
+    :rtype: Optional[RequestStats]
+    """
+    return _request_stats.get()
+
+
+F = TypeVar("F", bound=Callable[..., Awaitable])
+
+
+def timed(operation: str) -> Callable[[F], F]:
+    """
+    Records the latency of a coroutine function in ``auth_operation_duration_seconds``, failures included.
+
+    :param operation: The ``operation`` label.
+    :type operation: str
+    """
+    child = AUTH_SECONDS.labels(operation)
+
+    def decorator(function: F) -> F:
+        @functools.wraps(function)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await function(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - started)
+
+        return wrapper
+
+    return decorator
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Returns the path template of the route that served a request, e.g. ``/api/contacts/contacts/{data}``.
+
+    :param scope: The ASGI scope after routing.
+    :type scope: Scope
+    :rtype: str
+    """
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    Records the latency, status and SQL statement count of each HTTP request, labelled by route template.
+
+    A plain ASGI middleware: it adds two clock reads and a few counter
+    updates per request, and does not buffer the response.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        IN_PROGRESS.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            IN_PROGRESS.dec()
+            _request_stats.reset(token)
+            route = route_template(scope)
+            method = scope["method"]
+            REQUESTS.labels(method, route, str(status_code)).inc()
+            REQUEST_SECONDS.labels(method, route).observe(elapsed)
+            REQUEST_QUERIES.labels(route).observe(stats.queries)
+            REQUEST_QUERY_SECONDS.labels(route).observe(stats.query_seconds)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the per-statement context so a failed statement, which never reaches
+    # ``after_cursor_execute``, leaves nothing behind on the connection.
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_metrics_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    operation = statement.lstrip()[:6].upper()
+    QUERY_SECONDS.labels(operation).observe(elapsed)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.query_seconds += elapsed
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Times every SQL statement run on ``engine`` and adds it to the statistics of the current request.
+
+    :param engine: The engine; for an ``AsyncEngine`` pass its ``sync_engine``.
+    :type engine: Engine
+    """
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class CacheCollector:
+    """
+    Exports the size and hit/miss counters of in-process caches, read from their ``stats()`` at scrape time.
+    """
+
+    def __init__(self):
+        self.caches: Dict[str, Any] = {}
+
+    def collect(self):
+        size = GaugeMetricFamily("cache_entries", "Entries held by an in-process cache.", labels=["cache"])
+        hits = CounterMetricFamily("cache_hits", "Lookups answered by an in-process cache.", labels=["cache"])
+        misses = CounterMetricFamily(
+            "cache_misses", "Lookups an in-process cache could not answer.", labels=["cache"]
+        )
+        for name, cache in self.caches.items():
+            stats = cache.stats()
+            size.add_metric([name], stats["size"])
+            hits.add_metric([name], stats["hits"])
+            misses.add_metric([name], stats["misses"])
+        yield size
+        yield hits
+        yield misses
+
+
+cache_collector = CacheCollector()
+registry.register(cache_collector)
+
+
+def track_cache(name: str, cache: Any) -> None:
+    """
+    Exports the statistics of ``cache`` as ``cache_entries``, ``cache_hits_total`` and ``cache_misses_total``.
+
+    :param name: The ``cache`` label.
+    :type name: str
+    :param cache: Anything with the ``stats()`` of :class:`~src.web13hm.services.cache.TTLCache`.
+    :type cache: Any
+    """
+    cache_collector.caches[name] = cache
+
+
+class ExecutorCollector:
+    """
+    Exports the queueing and timing counters of worker pools, read from :class:`BoundedExecutor` attributes at scrape time.
+    """
+
+    def __init__(self):
+        self.executors: Dict[str, Any] = {}
+
+    def collect(self):
+        labels = ["executor"]
+        families = {
+            "submitted": CounterMetricFamily(
+                "executor_tasks_submitted", "Calls submitted to a worker pool.", labels=labels
+            ),
+            "completed": CounterMetricFamily(
+                "executor_tasks_completed", "Calls a worker pool finished.", labels=labels
+            ),
+            "failed": CounterMetricFamily("executor_tasks_failed", "Calls that raised on a worker pool.", labels=labels),
+            "queued": GaugeMetricFamily("executor_tasks_queued", "Calls waiting for a worker pool slot.", labels=labels),
+            "running": GaugeMetricFamily("executor_tasks_running", "Calls running on a worker pool.", labels=labels),
+            "wait_time": CounterMetricFamily(
+                "executor_wait_seconds", "Time calls spent waiting for a worker pool slot.", labels=labels
+            ),
+            "max_wait_time": GaugeMetricFamily(
+                "executor_max_wait_seconds", "The longest wait for a worker pool slot.", labels=labels
+            ),
+            "run_time": CounterMetricFamily(
+                "executor_run_seconds", "Time calls spent running on a worker pool.", labels=labels
+            ),
+        }
+        for name, executor in self.executors.items():
+            for attribute, family in families.items():
+                family.add_metric([name], getattr(executor, attribute))
+        yield from families.values()
+
+
+executor_collector = ExecutorCollector()
+registry.register(executor_collector)
+
+
+def track_executor(executor: Any) -> None:
+    """
+    Exports the counters of ``executor`` as ``executor_*`` metrics labelled by its name.
+
+    :param executor: A :class:`~src.web13hm.services.workers.BoundedExecutor`.
+    :type executor: Any
+    """
+    executor_collector.executors[executor.name] = executor
+
+
+def render_metrics() -> tuple:
+    """
+    Returns the current metrics in the Prometheus text format, with their content type.
+
+    :rtype: tuple
+    """
+    return generate_latest(registry), CONTENT_TYPE_LATEST
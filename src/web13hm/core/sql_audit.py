@@ -0,0 +1,231 @@
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Callable, List, NamedTuple, Optional, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.web13hm.conf.config import settings
+from src.web13hm.core.metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable)
+
+EXPLAIN_PREFIXES = {"sqlite": "EXPLAIN QUERY PLAN "}
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    Raised in strict mode when a request executes more SQL statements than its route allows.
+    """
+
+
+class StatementRecord(NamedTuple):
+    statement: str
+    seconds: float
+    plan: Optional[List[str]]
+
+
+class RequestAudit:
+    """
+    The SQL statements executed on behalf of one request.
+    """
+
+    def __init__(self):
+        self.route: Optional[str] = None
+        self.budget: Optional[int] = None
+        self.statements: List[StatementRecord] = []
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+    def repeated(self, threshold: int) -> List[tuple]:
+        """
+        Returns the statements executed at least ``threshold`` times, the signature of an N+1 pattern.
+
+        Statements are compared by their SQL text, which is parameterized, so
+        the same lookup with different ids counts as a repeat.
+
+        :param threshold: The number of executions from which a statement is reported.
+        :type threshold: int
+        :return: Pairs of statement and execution count, most repeated first.
+        :rtype: List[tuple]
+        """
+        counts = Counter(record.statement for record in self.statements)
+        return [(statement, count) for statement, count in counts.most_common() if count >= threshold]
+
+    def slow(self, threshold: float) -> List[StatementRecord]:
+        """
+        Returns the statements that took at least ``threshold`` seconds.
+
+        :param threshold: The duration from which a statement is slow, in seconds.
+        :type threshold: float
+        :rtype: List[StatementRecord]
+        """
+        return [record for record in self.statements if record.seconds >= threshold]
+
+
+_request_audit: ContextVar[Optional[RequestAudit]] = ContextVar("request_audit", default=None)
+
+
+def query_budget(max_queries: int) -> Callable[[F], F]:
+    """
+    Declares how many SQL statements a route may execute per request; apply it below the router decorator.
+
+    :param max_queries: The maximum number of statements.
+    :type max_queries: int
+    """
+
+    def decorator(endpoint: F) -> F:
+        endpoint.query_budget = max_queries
+        return endpoint
+
+    return decorator
+
+
+class SQLAuditor:
+    """
+    Records every SQL statement per request and reports N+1 patterns, slow statements and exceeded query budgets.
+
+    Meant for development and CI: it keeps each statement's text for the
+    duration of the request and, with ``explain``, runs an extra ``EXPLAIN``
+    for every slow ``SELECT``. Reports are logged as warnings; in ``strict``
+    mode a request over its budget raises :class:`QueryBudgetExceeded`, which
+    fails the test that made it.
+    """
+
+    def __init__(
+        self,
+        slow_threshold: float = 0.1,
+        repeated_threshold: int = 5,
+        explain: bool = False,
+        strict: bool = False,
+    ):
+        """
+        :param slow_threshold: The duration from which a statement is slow, in seconds.
+        :type slow_threshold: float
+        :param repeated_threshold: How many executions of one statement in a request are reported as N+1.
+        :type repeated_threshold: int
+        :param explain: Whether to capture the plan of slow ``SELECT`` statements.
+        :type explain: bool
+        :param strict: Whether exceeding a query budget raises instead of logging.
+        :type strict: bool
+        """
+        self.slow_threshold = slow_threshold
+        self.repeated_threshold = repeated_threshold
+        self.explain = explain
+        self.strict = strict
+        self.last_audit: Optional[RequestAudit] = None
+
+    def instrument(self, engine: Engine) -> None:
+        """
+        Records the statements run on ``engine`` into the audit of the current request.
+
+        :param engine: The engine; for an ``AsyncEngine`` pass its ``sync_engine``.
+        :type engine: Engine
+        """
+        if not event.contains(engine, "before_cursor_execute", self._before_cursor_execute):
+            event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        # Kept on the per-statement context: a failed statement never reaches
+        # ``after_cursor_execute``, so nothing may be left behind on the connection.
+        if context is not None and _request_audit.get() is not None:
+            context._audit_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        audit = _request_audit.get()
+        started = getattr(context, "_audit_started", None)
+        if audit is None or started is None:
+            return
+        seconds = time.perf_counter() - started
+        plan = None
+        if (
+            self.explain
+            and seconds >= self.slow_threshold
+            and not executemany
+            and statement.lstrip()[:6].upper() == "SELECT"
+        ):
+            plan = self._explain(conn, statement, parameters)
+        audit.statements.append(StatementRecord(statement, seconds, plan))
+
+    @staticmethod
+    def _explain(conn: Connection, statement: str, parameters) -> Optional[List[str]]:
+        prefix = EXPLAIN_PREFIXES.get(conn.dialect.name, "EXPLAIN ")
+        # A separate DBAPI cursor, so the rows of the audited statement stay unread.
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute(prefix + statement, parameters)
+            return [str(row[-1]) for row in cursor.fetchall()]
+        except Exception:
+            logger.debug("Failed to explain %s", statement, exc_info=True)
+            return None
+        finally:
+            cursor.close()
+
+    def report(self, audit: RequestAudit) -> None:
+        """
+        Logs the problems found in the audit of a finished request.
+
+        :param audit: The audit.
+        :type audit: RequestAudit
+        :raises QueryBudgetExceeded: In strict mode, if the request exceeded its route's budget.
+        """
+        self.last_audit = audit
+        for statement, count in audit.repeated(self.repeated_threshold):
+            logger.warning("Possible N+1 in %s: executed %d times: %s", audit.route, count, statement)
+        for record in audit.slow(self.slow_threshold):
+            logger.warning(
+                "Slow statement in %s (%.1f ms): %s%s",
+                audit.route,
+                record.seconds * 1000,
+                record.statement,
+                "".join(f"\n    {step}" for step in record.plan or ()),
+            )
+        if audit.budget is not None and len(audit) > audit.budget:
+            message = "%s executed %d SQL statements, over its budget of %d:\n%s" % (
+                audit.route,
+                len(audit),
+                audit.budget,
+                "\n".join(record.statement for record in audit.statements),
+            )
+            if self.strict:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+
+class SQLAuditMiddleware:
+    """
+    Audits the SQL statements of each HTTP request with an :class:`SQLAuditor`.
+    """
+
+    def __init__(self, app: ASGIApp, auditor: SQLAuditor):
+        self.app = app
+        self.auditor = auditor
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        audit = RequestAudit()
+        token = _request_audit.set(audit)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_audit.reset(token)
+        audit.route = f"{scope['method']} {route_template(scope)}"
+        audit.budget = getattr(getattr(scope.get("route"), "endpoint", None), "query_budget", None)
+        self.auditor.report(audit)
+
+
+sql_auditor = SQLAuditor(
+    slow_threshold=settings.sql_slow_query_seconds,
+    repeated_threshold=settings.sql_repeated_query_threshold,
+    explain=settings.sql_explain_slow_queries,
+    strict=settings.sql_audit_strict,
+)
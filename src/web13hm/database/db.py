@@ -1,16 +1,122 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from src.web13hm.conf.config import settings
+from src.web13hm.database.pool import MonitoredQueuePool, PoolMonitor
+from src.web13hm.database.replicas import ReplicaSet
+from src.web13hm.services.cache import recent_writers
+
+logger = logging.getLogger(__name__)
+
+# Blocking drivers that have an asyncio counterpart we can switch to transparently.
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """
+    Converts a database URL to one that uses an asyncio driver.
+
+    :param url: The configured database URL.
+    :type url: str
+    :return: The same URL with a blocking driver replaced by its async counterpart.
+    :rtype: str
+    """
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+def engine_options(url: str) -> dict:
+    """
+    Builds the keyword arguments for the engine from the application settings.
+
+    :param url: The database URL the engine will connect to.
+    :type url: str
+    :return: Keyword arguments for ``create_async_engine``.
+    :rtype: dict
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # In-memory SQLite uses a static pool which has no size to configure.
+        return {}
+    return {
+        "poolclass": MonitoredQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        # Replace connections before the server or a proxy drops them as idle.
+        "pool_recycle": settings.db_pool_recycle,
+        # Test connections on checkout, so a database restart costs one failed ping, not failed requests.
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
 
-SQLALCHEMY_DATABASE_URL = (settings.sqlalchemy_database_url)
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+SQLALCHEMY_DATABASE_URL = async_database_url(settings.sqlalchemy_database_url)
+engine = create_async_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL))
+pool_monitor = PoolMonitor()
+pool_monitor.instrument(engine.sync_engine)
+SessionLocal = async_sessionmaker(
+    bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+
+replica_set = ReplicaSet(
+    [
+        create_async_engine(url, **engine_options(url))
+        for url in map(async_database_url, settings.sqlalchemy_replica_urls)
+    ],
+    retry_interval=settings.replica_retry_interval,
+)
 
 
 # Dependency
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+async def _connect_replica() -> Optional[AsyncSession]:
+    engine = replica_set.choose()
+    while engine is not None:
+        session = SessionLocal(bind=engine)
+        try:
+            # Connect now, so a replica that is down is skipped before the caller runs any query.
+            await session.connection()
+            return session
+        except (DBAPIError, OSError):
+            await session.close()
+            logger.warning("Replica %s is unreachable", engine.url.render_as_string(hide_password=True), exc_info=True)
+            replica_set.mark_down(engine)
+            engine = replica_set.choose()
+    return None
+
+
+@asynccontextmanager
+async def replica_session(writer: str) -> AsyncIterator[Optional[AsyncSession]]:
+    """
+    Opens a read-only session on a healthy replica, for reads made on behalf of ``writer``.
+
+    Yields ``None`` when the reads must go to the primary instead: no replica
+    is configured or reachable, or ``writer`` is in :data:`recent_writers`,
+    so a replica may not show its latest changes yet.
+
+    :param writer: The key under which the caller's writes are recorded, i.e. the user's email.
+    :type writer: str
+    """
+    session = None
+    if replica_set and not await recent_writers.contains(writer):
+        session = await _connect_replica()
+    if session is None:
+        yield None
+        return
+    async with session:
+        yield session
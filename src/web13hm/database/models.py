@@ -1,21 +1,37 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, Boolean, func
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import Column, Integer, SmallInteger, String, Date, ForeignKey, Boolean, Index, func
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql.sqltypes import DateTime
-from src.web13hm.database.db import engine
 
 Base = declarative_base()
 
 
+def month_day(value: Optional[date]) -> Optional[int]:
+    """
+    Returns the year-independent position of a date as ``month * 100 + day``.
+
+    :param value: The date, e.g. a birthday.
+    :type value: Optional[date]
+    :return: ``1231`` for 31 December, or None if ``value`` is None.
+    :rtype: Optional[int]
+    """
+    if value is None:
+        return None
+    return value.month * 100 + value.day
+
+
 class User(Base):
     __tablename__ = "users"
     id = Column(Integer, primary_key=True)
-    email = Column(String(150), nullable=False, unique=True)
+    email = Column(String(150), nullable=False, unique=True, index=True)
     password = Column(String(255), nullable=False)
     avatar = Column(String(255), nullable=True)
-    refresh_token = Column(String(255), nullable=True)
     confirmed = Column(Boolean, default=False)
-    contacts = relationship("Contacts", back_populates="owner")
+    # Never loaded implicitly: query contacts by user_id instead of issuing one query per user.
+    contacts = relationship("Contacts", back_populates="owner", lazy="raise_on_sql")
     created_at = Column("crated_at", DateTime, default=func.now())
 
 
@@ -27,11 +43,71 @@ class Contacts(Base):
     email = Column(String(50))
     number = Column(String(50))
     birthday = Column(Date(), nullable=True)
+    # month_day(birthday); lets upcoming birthdays be found with an index range scan.
+    birthday_month_day = Column(SmallInteger, nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     extra_data = Column(String(150), nullable=True, default=None)
     created_at = Column("crated_at", DateTime, default=func.now())
 
-    owner = relationship("User", back_populates="contacts")
+    owner = relationship("User", back_populates="contacts", lazy="raise_on_sql")
+
+    # Fetch created_at in the INSERT's RETURNING clause instead of a later SELECT.
+    __mapper_args__ = {"eager_defaults": True}
+
+    @validates("birthday")
+    def _sync_birthday_month_day(self, key, value):
+        self.birthday_month_day = month_day(value)
+        return value
+
+    # Every contact query is scoped to its owner, so each index leads with user_id.
+    # Keep in sync with the migrations in /migrations.
+    __table_args__ = (
+        Index("ix_contacts_user_id_id", "user_id", "id"),
+        Index("ix_contacts_user_id_name", "user_id", "name"),
+        Index("ix_contacts_user_id_last_name", "user_id", "last_name"),
+        Index("ix_contacts_user_id_email", "user_id", "email"),
+        Index("ix_contacts_user_id_birthday_month_day", "user_id", "birthday_month_day"),
+    )
+
+
+# Prefix search compares terms as ranges; the "C" collation makes Postgres
+# order them byte-wise like SQLite does, so the range can use the index.
+SEARCH_TERM_TYPE = String(64).with_variant(String(64, collation="C"), "postgresql")
+
+
+class ContactSearchTerm(Base):
+    """
+    Inverted index of the searchable contact fields, maintained by the contacts repository.
+    """
+    __tablename__ = "contact_search_terms"
+    contact_id = Column(Integer, ForeignKey("contacts.id", ondelete="CASCADE"), primary_key=True)
+    term = Column(SEARCH_TERM_TYPE, primary_key=True)
+    # Copied from the contact so a search never has to touch the contacts table.
+    user_id = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_contact_search_terms_user_id_term", "user_id", "term"),
+    )
+
+
+class RefreshSession(Base):
+    """
+    A login session of a user, identified by the hash of its current refresh token.
 
+    Kept apart from ``users`` so that refreshing tokens never writes to the
+    users table, and so that a user can be logged in from several devices.
+    """
+    __tablename__ = "refresh_sessions"
+    # The ``sid`` claim of the session's tokens.
+    id = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # Hex SHA-256 of the refresh token; replaced on every rotation.
+    token_hash = Column(String(64), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=func.now())
 
-Base.metadata.create_all(bind=engine)
+    __table_args__ = (
+        Index("ix_refresh_sessions_token_hash", "token_hash", unique=True),
+        Index("ix_refresh_sessions_expires_at", "expires_at"),
+        Index("ix_refresh_sessions_user_id", "user_id"),
+    )
@@ -0,0 +1,116 @@
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, PoolProxiedConnection, QueuePool
+
+
+class PoolMonitor:
+    """
+    Checkout wait times and connection ages of an engine's pool.
+
+    The wait time of a checkout runs from asking the pool for a connection to
+    getting one; it includes opening a new connection and the pre-ping, if
+    enabled. Only a :class:`MonitoredQueuePool` reports waits; connection ages
+    are tracked for any pool.
+    """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+        self._records: Dict[int, ConnectionPoolEntry] = {}
+
+    def instrument(self, engine: Engine) -> None:
+        """
+        Starts monitoring the pool of ``engine``, including the pools that replace it on ``dispose()``.
+
+        :param engine: The engine; for an ``AsyncEngine`` pass its ``sync_engine``.
+        :type engine: Engine
+        """
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "close", self._on_close)
+        if isinstance(engine.pool, MonitoredQueuePool):
+            engine.pool.monitor = self
+
+    def _on_connect(self, dbapi_connection, connection_record: ConnectionPoolEntry) -> None:
+        self._records[id(connection_record)] = connection_record
+
+    def _on_close(self, dbapi_connection, connection_record: ConnectionPoolEntry) -> None:
+        self._records.pop(id(connection_record), None)
+
+    def observe_wait(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.wait_seconds += seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def stats(self, engine: Engine) -> dict:
+        """
+        Returns the current state of the pool and the totals since the monitor started.
+
+        :param engine: The monitored engine.
+        :type engine: Engine
+        :rtype: dict
+        """
+        pool = engine.pool
+        now = time.time()
+        ages = [
+            now - record.last_connect_time
+            for record in self._records.values()
+            if record.dbapi_connection is not None
+        ]
+        stats = {
+            "pool": type(pool).__name__,
+            "connections": len(ages),
+            "oldest_connection_s": max(ages, default=0.0),
+            "mean_connection_age_s": sum(ages) / len(ages) if ages else 0.0,
+            "checkouts": self.checkouts,
+            "mean_wait_ms": self.wait_seconds / self.checkouts * 1000 if self.checkouts else 0.0,
+            "max_wait_ms": self.max_wait_seconds * 1000,
+            "timeouts": self.timeouts,
+        }
+        if isinstance(pool, QueuePool):
+            stats.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                overflow=max(pool.overflow(), 0),
+                timeout_s=pool.timeout(),
+            )
+        return stats
+
+    def reset(self) -> None:
+        """
+        Zeroes the checkout totals.
+        """
+        self.checkouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+
+
+class MonitoredQueuePool(AsyncAdaptedQueuePool):
+    """
+    An asyncio queue pool that reports how long each checkout waits to its :class:`PoolMonitor`.
+    """
+
+    monitor: Optional[PoolMonitor] = None
+
+    def connect(self) -> PoolProxiedConnection:
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            if self.monitor is not None:
+                self.monitor.timeouts += 1
+            raise
+        if self.monitor is not None:
+            self.monitor.observe_wait(time.perf_counter() - started)
+        return connection
+
+    def recreate(self) -> "MonitoredQueuePool":
+        pool = super().recreate()
+        pool.monitor = self.monitor
+        return pool
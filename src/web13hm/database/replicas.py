@@ -0,0 +1,90 @@
+import itertools
+import time
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class ReplicaSet:
+    """
+    Read replicas picked in turn, skipping any that failed recently.
+
+    A replica whose connection fails is marked down and left out of the
+    rotation for ``retry_interval`` seconds, after which it is tried again.
+    When every replica is down :meth:`choose` returns ``None`` and reads go to
+    the primary. Like the caches, the state is local to the process.
+    """
+
+    def __init__(
+        self,
+        engines: List[AsyncEngine],
+        retry_interval: float = 30,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        """
+        :param engines: One engine per replica.
+        :type engines: List[AsyncEngine]
+        :param retry_interval: How long a failed replica is skipped, in seconds.
+        :type retry_interval: float
+        :param timer: The clock used to bring replicas back.
+        :type timer: Callable[[], float]
+        """
+        self.engines = engines
+        self.retry_interval = retry_interval
+        self.timer = timer
+        self._turn = itertools.count()
+        self._down_until: Dict[int, float] = {}
+        self._reads: Dict[int, int] = {}
+        self._failures: Dict[int, int] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def is_healthy(self, engine: AsyncEngine) -> bool:
+        return self._down_until.get(id(engine), 0) <= self.timer()
+
+    def choose(self) -> Optional[AsyncEngine]:
+        """
+        Returns the next healthy replica in turn.
+
+        :return: The replica's engine, or ``None`` if no replica is healthy.
+        :rtype: Optional[AsyncEngine]
+        """
+        for _ in range(len(self.engines)):
+            engine = self.engines[next(self._turn) % len(self.engines)]
+            if self.is_healthy(engine):
+                self._reads[id(engine)] = self._reads.get(id(engine), 0) + 1
+                return engine
+        return None
+
+    def mark_down(self, engine: AsyncEngine) -> None:
+        """
+        Takes a replica out of the rotation for ``retry_interval`` seconds.
+
+        :param engine: The replica that failed.
+        :type engine: AsyncEngine
+        """
+        self._down_until[id(engine)] = self.timer() + self.retry_interval
+        self._failures[id(engine)] = self._failures.get(id(engine), 0) + 1
+
+    def stats(self) -> List[dict]:
+        """
+        Returns the health and usage of each replica.
+
+        :rtype: List[dict]
+        """
+        return [
+            {
+                "healthy": self.is_healthy(engine),
+                "reads": self._reads.get(id(engine), 0),
+                "failures": self._failures.get(id(engine), 0),
+            }
+            for engine in self.engines
+        ]
+
+    async def dispose(self) -> None:
+        """
+        Closes the connections of every replica.
+        """
+        for engine in self.engines:
+            await engine.dispose()
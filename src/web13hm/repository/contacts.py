@@ -1,22 +1,57 @@
-from typing import List
+from typing import AsyncIterator, List, Optional, Sequence
 
 from fastapi import HTTPException, status
 
-from sqlalchemy import or_
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, delete, func, insert, or_, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from datetime import date, timedelta
 
-from src.web13hm.database.models import Contacts, User
+from src.web13hm.database.models import ContactSearchTerm, Contacts, User, month_day
+from src.web13hm.services.cache import recent_writers
+from src.web13hm.services.pagination import decode_cursor, encode_cursor
+from src.web13hm.services.response_cache import response_cache
+from src.web13hm.services.search import SEARCHABLE_FIELDS, prefix_upper_bound, query_tokens, search_term_rows
 from src.web13hm.shemas import ContactModel, ResponseContactModel
 
 
+def _select_contacts(columns: Optional[Sequence]):
+    return select(*columns) if columns else select(Contacts)
+
+
+async def _fetch_contacts(db: AsyncSession, query, columns: Optional[Sequence]) -> list:
+    if columns:
+        return (await db.execute(query)).all()
+    return (await db.scalars(query)).all()
+
+
+def _prefix_range(term, token: str):
+    upper = prefix_upper_bound(token)
+    if upper is None:
+        return term >= token
+    return and_(term >= token, term < upper)
+
+
+async def _contacts_changed(user: User) -> None:
+    # Drop the user's cached reads and keep their next reads on the primary.
+    await response_cache.bump(user.id)
+    await recent_writers.add(user.email)
+
+
 async def get_Contacts(
-    skip: int, limit: int, user: User, db: Session
+    skip: int,
+    limit: int,
+    user: User,
+    db: AsyncSession,
+    cursor: Optional[str] = None,
+    columns: Optional[Sequence] = None,
 ) -> List[ResponseContactModel]:
     """
     Retrieves a list of contacts for a specific user with specified pagination parameters.
 
+    Contacts are ordered by ID. When a cursor is given, the page starts right
+    after the contact it points to, and ``skip`` is applied from there.
+
     :param skip: The number of contacts to skip.
     :type skip: int
     :param limit: The maximum number of contacts to return.
@@ -24,22 +59,41 @@ async def get_Contacts(
     :param user: The user to retrieve contacts for.
     :type user: User
     :param db: The database session.
-    :type db: Session
+    :type db: AsyncSession
+    :param cursor: The cursor returned with the previous page.
+    :type cursor: Optional[str]
+    :param columns: Select only these columns and return rows instead of contacts; must include ``Contacts.id``.
+    :type columns: Optional[Sequence]
     :return: A list of contacts.
     :rtype: List[ResponseContactModel]
     """
-    contacts = (
-        db.query(Contacts)
-        .filter(Contacts.user_id == user.id)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    query = _select_contacts(columns).where(Contacts.user_id == user.id)
+    if cursor:
+        (last_id,) = decode_cursor(cursor, 1)
+        query = query.where(Contacts.id > last_id)
+    return await _fetch_contacts(
+        db, query.order_by(Contacts.id).offset(skip).limit(limit), columns
     )
-    return contacts
+
+
+def contacts_next_cursor(contacts: List[Contacts], limit: int) -> Optional[str]:
+    """
+    Returns the cursor of the page following ``contacts`` as returned by :func:`get_Contacts`.
+
+    :param contacts: The current page.
+    :type contacts: List[Contacts]
+    :param limit: The page size that was requested.
+    :type limit: int
+    :return: The cursor, or None if this was the last page.
+    :rtype: Optional[str]
+    """
+    if len(contacts) < limit:
+        return None
+    return encode_cursor(contacts[-1].id)
 
 
 async def get_Contacts_by(
-    Contacts_data: int | str, user: User, db: Session
+    Contacts_data: int | str, user: User, db: AsyncSession, columns: Optional[Sequence] = None
 ) -> List[ResponseContactModel]:
     """
     Retrieves a contacts with the specified ID, NAME, EMAIL for a specific user.
@@ -49,7 +103,9 @@ async def get_Contacts_by(
     :param user: The user to retrieve the contacts for.
     :type user: User
     :param db: The database session.
-    :type db: Session
+    :type db: AsyncSession
+    :param columns: Select only these columns and return rows instead of contacts.
+    :type columns: Optional[Sequence]
     :raises HTTPException:  if contact does not exist.
     :return: The contacts with the specified ID, NAME, EMAIL.
     :rtype: List[ResponseContactModel]
@@ -63,8 +119,8 @@ async def get_Contacts_by(
     if Contacts_data.isdigit():
         conditions.append(Contacts.id == int(Contacts_data))
 
-    contacts = (
-        db.query(Contacts).filter(or_(*conditions), Contacts.user_id == user.id).all()
+    contacts = await _fetch_contacts(
+        db, _select_contacts(columns).where(or_(*conditions), Contacts.user_id == user.id), columns
     )
 
     if not contacts:
@@ -72,15 +128,99 @@ async def get_Contacts_by(
     return contacts
 
 
+async def search_contacts(
+    query: str, skip: int, limit: int, user: User, db: AsyncSession
+) -> List[ResponseContactModel]:
+    """
+    Searches a user's contacts by prefixes of their name, last name and email.
+
+    Every word of the query must be a prefix of some term of the contact.
+    Exact term matches rank above prefix matches; ties are ordered by ID.
+
+    :param query: The search text, e.g. ``"jo"`` or ``"john sm"``.
+    :type query: str
+    :param skip: The number of contacts to skip.
+    :type skip: int
+    :param limit: The maximum number of contacts to return.
+    :type limit: int
+    :param user: The user whose contacts are searched.
+    :type user: User
+    :param db: The database session.
+    :type db: AsyncSession
+    :return: The matching contacts, best matches first.
+    :rtype: List[ResponseContactModel]
+    """
+    tokens = query_tokens(query)
+    if not tokens:
+        return []
+    term = ContactSearchTerm.term
+    ranges = [_prefix_range(term, token) for token in tokens]
+    scores = [
+        func.max(case((term == token, 2), (in_range, 1), else_=0))
+        for token, in_range in zip(tokens, ranges)
+    ]
+    ranked = (
+        select(ContactSearchTerm.contact_id, sum(scores).label("score"))
+        .where(ContactSearchTerm.user_id == user.id, or_(*ranges))
+        .group_by(ContactSearchTerm.contact_id)
+        .having(and_(*(score > 0 for score in scores)))
+        .subquery()
+    )
+    contacts = await db.scalars(
+        select(Contacts)
+        .join(ranked, Contacts.id == ranked.c.contact_id)
+        .order_by(ranked.c.score.desc(), Contacts.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return contacts.all()
+
+
+async def _reindex_contacts(db: AsyncSession, contacts: List[Contacts]) -> None:
+    """
+    Replaces the search terms of ``contacts``; the caller commits.
+    """
+    ids = [contact.id for contact in contacts]
+    await db.execute(delete(ContactSearchTerm).where(ContactSearchTerm.contact_id.in_(ids)))
+    rows = search_term_rows(contacts)
+    if rows:
+        await db.execute(insert(ContactSearchTerm), rows)
+
+
+def _birthday_segments(today: date, days: int) -> list:
+    """
+    Splits the window ``[today, today + days]`` into ranges of ``birthday_month_day``.
+
+    A window that crosses New Year becomes two ranges, the December part first,
+    so that each range can be read in index order.
+    """
+    start = month_day(today)
+    end = month_day(today + timedelta(days=days))
+    column = Contacts.birthday_month_day
+    if days >= 365:
+        return [column >= start, column < start]
+    if start <= end:
+        return [column.between(start, end)]
+    return [column >= start, column <= end]
+
+
 async def birthday_by_7_day(
     skip: int,
     limit: int,
-    db: Session,
+    db: AsyncSession,
     current_user: User,
+    cursor: Optional[str] = None,
+    days: int = 7,
+    today: Optional[date] = None,
+    columns: Optional[Sequence] = None,
 ) -> List[ResponseContactModel]:
     """
     Retrieves a list of contacts with birthday by 7 day for a specific user with specified pagination parameters.
 
+    Birthdays are matched on month and day only, so the window wraps around
+    the end of the year. Contacts are ordered by upcoming birthday and ID. When
+    a cursor is given, the page starts right after the contact it points to.
+
     :param skip: The number of contacts to skip.
     :type skip: int
     :param limit: The maximum number of contacts to return.
@@ -88,32 +228,115 @@ async def birthday_by_7_day(
     :param current_user: The user to retrieve contacts for.
     :type user: User
     :param db: The database session.
-    :type db: Session
+    :type db: AsyncSession
+    :param cursor: The cursor returned with the previous page.
+    :type cursor: Optional[str]
+    :param days: The size of the window in days, starting today.
+    :type days: int
+    :param today: The first day of the window; defaults to the current date.
+    :type today: Optional[date]
+    :param columns: Select only these columns and return rows instead of contacts; must include ``Contacts.id`` and ``Contacts.birthday_month_day``.
+    :type columns: Optional[Sequence]
     :return: A list of contacts.
     :rtype: List[ResponseContactModel]
     """
-    date_by_7_day = date.today() + timedelta(days=7)
-    print("today-{date.today()}, 7 {date_by_7_day}")
-    contacts = (
-        db.query(Contacts)
-        .filter(Contacts.birthday <= date_by_7_day, Contacts.user_id == current_user.id)
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
+    today = today or date.today()
+    segments = _birthday_segments(today, days)
+    cursor_segment, after = 0, None
+    if cursor:
+        last_month_day, last_id = decode_cursor(cursor, 2)
+        if len(segments) == 2 and last_month_day < month_day(today):
+            cursor_segment = 1
+        after = tuple_(Contacts.birthday_month_day, Contacts.id) > tuple_(
+            last_month_day, last_id
+        )
+
+    contacts = []
+    for index in range(cursor_segment, len(segments)):
+        query = _select_contacts(columns).where(
+            Contacts.user_id == current_user.id, segments[index]
+        )
+        if after is not None and index == cursor_segment:
+            query = query.where(after)
+        page = await _fetch_contacts(
+            db,
+            query.order_by(Contacts.birthday_month_day, Contacts.id)
+            .offset(skip)
+            .limit(limit - len(contacts)),
+            columns,
+        )
+        contacts.extend(page)
+        if len(contacts) >= limit or index == len(segments) - 1:
+            break
+        if skip and not page:
+            # The whole segment was skipped; carry the rest of the offset over.
+            skipped = await db.scalar(select(func.count()).select_from(query.subquery()))
+            skip = max(0, skip - skipped)
+        else:
+            skip = 0
     return contacts
 
 
-async def create_contact(body: ContactModel, db: Session, current_user: User):
+def birthday_next_cursor(contacts: List[Contacts], limit: int) -> Optional[str]:
+    """
+    Returns the cursor of the page following ``contacts`` as returned by :func:`birthday_by_7_day`.
+
+    :param contacts: The current page.
+    :type contacts: List[Contacts]
+    :param limit: The page size that was requested.
+    :type limit: int
+    :return: The cursor, or None if this was the last page.
+    :rtype: Optional[str]
+    """
+    if len(contacts) < limit:
+        return None
+    last = contacts[-1]
+    return encode_cursor(last.birthday_month_day, last.id)
+
+
+async def stream_contacts(
+    columns: Sequence, user: User, db: AsyncSession, batch_size: int
+) -> AsyncIterator[list]:
+    """
+    Streams all contacts of a user in batches from a server-side cursor.
+
+    Only ``batch_size`` rows are held in memory at a time, however large the
+    address book is.
+
+    :param columns: The ``Contacts`` columns to select.
+    :type columns: Sequence
+    :param user: The user whose contacts are streamed.
+    :type user: User
+    :param db: The database session.
+    :type db: AsyncSession
+    :param batch_size: The number of rows fetched per round-trip.
+    :type batch_size: int
+    :return: Batches of rows ordered by ID.
+    :rtype: AsyncIterator[list]
+    """
+    result = await db.stream(
+        select(*columns)
+        .where(Contacts.user_id == user.id)
+        .order_by(Contacts.id)
+        .execution_options(yield_per=batch_size)
+    )
+    async for batch in result.partitions():
+        yield batch
+
+
+async def create_contact(body: ContactModel, db: AsyncSession, current_user: User):
     """
     Creates a new contact for a specific user.
 
+    The contact is written with a single ``INSERT ... RETURNING``, which also
+    brings back its generated columns, so it is not reloaded after the commit.
+
     :param body: The data for the contact to create.
     :type body: ContactModel
     :param current_user: The user to create the contact for.
     :type current_user: User
     :param db: The database session.
-    :type db: Session
+    :type db: AsyncSession
     :return: The newly created contact.
     :rtype: Contacts
     """
@@ -127,14 +350,66 @@ async def create_contact(body: ContactModel, db: Session, current_user: User):
         extra_data=body.extra_data,
     )
     db.add(new_contact)
-    db.commit()
-    db.refresh(new_contact)
+    await db.flush()
+    # A new contact has no search terms to replace yet.
+    terms = search_term_rows([new_contact])
+    if terms:
+        await db.execute(insert(ContactSearchTerm), terms)
+    await db.commit()
+    await _contacts_changed(current_user)
     return new_contact
 
 
+async def create_contacts_bulk(
+    bodies: List[ContactModel], db: AsyncSession, current_user: User
+) -> List[int]:
+    """
+    Creates many contacts for a specific user in one transaction.
+
+    The contacts and their search terms are written with one multi-row
+    INSERT each instead of a round-trip per contact.
+
+    :param bodies: The data for the contacts to create.
+    :type bodies: List[ContactModel]
+    :param db: The database session.
+    :type db: AsyncSession
+    :param current_user: The user to create the contacts for.
+    :type current_user: User
+    :return: The IDs of the new contacts.
+    :rtype: List[int]
+    """
+    rows = [
+        {
+            "name": body.name,
+            "last_name": body.last_name,
+            "email": body.email,
+            "number": body.number,
+            "birthday": body.birthday,
+            "birthday_month_day": month_day(body.birthday),
+            "user_id": current_user.id,
+            "extra_data": body.extra_data,
+        }
+        for body in bodies
+    ]
+    created = (
+        await db.execute(
+            insert(Contacts).returning(
+                Contacts.id, Contacts.user_id, Contacts.name, Contacts.last_name, Contacts.email
+            ),
+            rows,
+        )
+    ).all()
+    terms = search_term_rows(created)
+    if terms:
+        await db.execute(insert(ContactSearchTerm), terms)
+    await db.commit()
+    await _contacts_changed(current_user)
+    return [contact.id for contact in created]
+
+
 async def delete_contact(
     contact_id: int,
-    db: Session,
+    db: AsyncSession,
     current_user: User,
 ):
     """
@@ -145,25 +420,29 @@ async def delete_contact(
     :param user: The user to remove the contact for.
     :type user: User
     :param db: The database session.
-    :type db: Session
+    :type db: AsyncSession
     :raises HTTPException:  if contact does not exist.
     :return: The delete contact, or raise exception if it does not exist.
     :rtype: Dict[str, bool]
     """
-    contact = (
-        db.query(Contacts)
-        .filter(Contacts.id == contact_id, Contacts.user_id == current_user.id)
-        .first()
+    contact = await db.scalar(
+        select(Contacts).where(
+            Contacts.id == contact_id, Contacts.user_id == current_user.id
+        )
     )
     if not contact:
         raise HTTPException(status_code=404, detail="Contact not found")
-    db.delete(contact)
-    db.commit()
+    await db.execute(
+        delete(ContactSearchTerm).where(ContactSearchTerm.contact_id == contact.id)
+    )
+    await db.delete(contact)
+    await db.commit()
+    await _contacts_changed(current_user)
     return {"ok": True}
 
 
 async def update_contact(
-    contact_id: int, body: ContactModel, db: Session, current_user: User
+    contact_id: int, body: ContactModel, db: AsyncSession, current_user: User
 ):
     """
     Updates a single contact with the specified ID for a specific user.
@@ -175,15 +454,15 @@ async def update_contact(
     :param current_user: The user to update the contact for.
     :type current_user: User
     :param db: The database session.
-    :type db: Session
+    :type db: AsyncSession
     :raises HTTPException:  if contact does not exist.
     :return: The updated contact, or raise exception if it does not exist.
     :rtype: Contacts
     """
-    contacts_db = (
-        db.query(Contacts)
-        .filter(Contacts.id == contact_id, Contacts.user_id == current_user.id)
-        .first()
+    contacts_db = await db.scalar(
+        select(Contacts).where(
+            Contacts.id == contact_id, Contacts.user_id == current_user.id
+        )
     )
     if not contacts_db:
         raise HTTPException(status_code=404, detail="Contact not found")
@@ -193,6 +472,132 @@ async def update_contact(
     contacts_db.number = body.number
     contacts_db.birthday = body.birthday
     contacts_db.extra_data = body.extra_data
-    db.commit()
-    db.refresh(contacts_db)
+    await _reindex_contacts(db, [contacts_db])
+    await db.commit()
+    await _contacts_changed(current_user)
     return contacts_db
+
+
+def _column_values(changes: dict) -> dict:
+    """
+    Returns the column values for changed contact fields, keeping ``birthday_month_day`` in sync.
+    """
+    values = dict(changes)
+    if "birthday" in values:
+        values["birthday_month_day"] = month_day(values["birthday"])
+    return values
+
+
+async def patch_contact(
+    contact_id: int, changes: dict, db: AsyncSession, current_user: User
+) -> Contacts:
+    """
+    Updates only the given fields of a contact with a single ``UPDATE ... RETURNING``.
+
+    The returned row is the updated contact, so there is no SELECT before the
+    update and no reload after it. Search terms are rebuilt only when a
+    searchable field changes.
+
+    :param contact_id: The ID of the contact to update.
+    :type contact_id: int
+    :param changes: The new values by field name; may be empty.
+    :type changes: dict
+    :param db: The database session.
+    :type db: AsyncSession
+    :param current_user: The owner of the contact.
+    :type current_user: User
+    :raises HTTPException: if contact does not exist.
+    :return: The updated contact.
+    :rtype: Contacts
+    """
+    values = _column_values(changes)
+    owned = and_(Contacts.id == contact_id, Contacts.user_id == current_user.id)
+    if not values:
+        contact = await db.scalar(select(Contacts).where(owned))
+    else:
+        contact = await db.scalar(
+            update(Contacts)
+            .where(owned)
+            .values(values)
+            .returning(Contacts)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+    if contact is None:
+        raise HTTPException(status_code=404, detail="Contact not found")
+    if values:
+        if SEARCHABLE_FIELDS & values.keys():
+            await _reindex_contacts(db, [contact])
+        await db.commit()
+        await _contacts_changed(current_user)
+    return contact
+
+
+async def update_contacts_batch(
+    ids: Sequence[int], changes: dict, db: AsyncSession, current_user: User
+) -> List[int]:
+    """
+    Applies the same partial update to many contacts of a user with one set-based ``UPDATE``.
+
+    The search terms of the updated contacts are rebuilt, in the same
+    transaction, only when a searchable field changes.
+
+    :param ids: The IDs of the contacts to update; IDs of other users' contacts are ignored.
+    :type ids: Sequence[int]
+    :param changes: The new values by field name.
+    :type changes: dict
+    :param db: The database session.
+    :type db: AsyncSession
+    :param current_user: The owner of the contacts.
+    :type current_user: User
+    :return: The IDs of the updated contacts.
+    :rtype: List[int]
+    """
+    values = _column_values(changes)
+    updated = (
+        await db.execute(
+            update(Contacts)
+            .where(Contacts.user_id == current_user.id, Contacts.id.in_(set(ids)))
+            .values(values)
+            .returning(Contacts.id, Contacts.user_id, Contacts.name, Contacts.last_name, Contacts.email)
+            .execution_options(synchronize_session=False)
+        )
+    ).all()
+    if updated and SEARCHABLE_FIELDS & values.keys():
+        await _reindex_contacts(db, updated)
+    await db.commit()
+    await _contacts_changed(current_user)
+    return [contact.id for contact in updated]
+
+
+async def delete_contacts_batch(
+    ids: Sequence[int], db: AsyncSession, current_user: User
+) -> List[int]:
+    """
+    Deletes many contacts of a user, and their search terms, with one ``DELETE`` each.
+
+    :param ids: The IDs of the contacts to delete; IDs of other users' contacts are ignored.
+    :type ids: Sequence[int]
+    :param db: The database session.
+    :type db: AsyncSession
+    :param current_user: The owner of the contacts.
+    :type current_user: User
+    :return: The IDs of the deleted contacts.
+    :rtype: List[int]
+    """
+    ids = set(ids)
+    await db.execute(
+        delete(ContactSearchTerm).where(
+            ContactSearchTerm.user_id == current_user.id, ContactSearchTerm.contact_id.in_(ids)
+        )
+    )
+    deleted = (
+        await db.scalars(
+            delete(Contacts)
+            .where(Contacts.user_id == current_user.id, Contacts.id.in_(ids))
+            .returning(Contacts.id)
+            .execution_options(synchronize_session=False)
+        )
+    ).all()
+    await db.commit()
+    await _contacts_changed(current_user)
+    return list(deleted)
@@ -0,0 +1,150 @@
+import hashlib
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.web13hm.database.models import RefreshSession
+
+
+def token_hash(token: str) -> str:
+    """
+    Returns the hex SHA-256 digest under which a refresh token is stored.
+
+    :param token: The encoded refresh token.
+    :type token: str
+    :rtype: str
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+async def create_session(
+    session_id: str, user_id: int, token: str, expires_at: datetime, db: AsyncSession
+) -> RefreshSession:
+    """
+    Starts a new login session. Other sessions of the user are left alone.
+
+    :param session_id: The ``sid`` claim of the session's tokens.
+    :type session_id: str
+    :param user_id: The ID of the user logging in.
+    :type user_id: int
+    :param token: The refresh token of the session.
+    :type token: str
+    :param expires_at: When the refresh token expires.
+    :type expires_at: datetime
+    :param db: The database session.
+    :type db: AsyncSession
+    :return: The new session.
+    :rtype: RefreshSession
+    """
+    session = RefreshSession(
+        id=session_id, user_id=user_id, token_hash=token_hash(token), expires_at=expires_at
+    )
+    db.add(session)
+    await db.commit()
+    return session
+
+
+async def rotate_session(
+    session_id: str, old_token: str, new_token: str, expires_at: datetime, db: AsyncSession
+) -> bool:
+    """
+    Replaces the refresh token of a session in a single conditional ``UPDATE``.
+
+    The update only matches while ``old_token`` is the current, unexpired token
+    of the session, so two concurrent refreshes with the same token cannot
+    both succeed.
+
+    :param session_id: The ``sid`` claim of the presented token.
+    :type session_id: str
+    :param old_token: The presented refresh token.
+    :type old_token: str
+    :param new_token: The refresh token replacing it.
+    :type new_token: str
+    :param expires_at: When the new refresh token expires.
+    :type expires_at: datetime
+    :param db: The database session.
+    :type db: AsyncSession
+    :return: False if ``old_token`` is not the current token of a live session.
+    :rtype: bool
+    """
+    result = await db.execute(
+        update(RefreshSession)
+        .where(
+            RefreshSession.id == session_id,
+            RefreshSession.token_hash == token_hash(old_token),
+            RefreshSession.expires_at > datetime.utcnow(),
+        )
+        .values(token_hash=token_hash(new_token), expires_at=expires_at)
+    )
+    await db.commit()
+    return result.rowcount == 1
+
+
+async def revoke_session(session_id: str, db: AsyncSession) -> bool:
+    """
+    Ends a session, invalidating its refresh token.
+
+    :param session_id: The ``sid`` claim of the session's tokens.
+    :type session_id: str
+    :param db: The database session.
+    :type db: AsyncSession
+    :return: False if there was no such session.
+    :rtype: bool
+    """
+    result = await db.execute(delete(RefreshSession).where(RefreshSession.id == session_id))
+    await db.commit()
+    return result.rowcount == 1
+
+
+async def revoke_user_sessions(user_id: int, db: AsyncSession) -> List[str]:
+    """
+    Ends every session of a user.
+
+    :param user_id: The ID of the user.
+    :type user_id: int
+    :param db: The database session.
+    :type db: AsyncSession
+    :return: The IDs of the ended sessions.
+    :rtype: List[str]
+    """
+    result = await db.scalars(
+        delete(RefreshSession).where(RefreshSession.user_id == user_id).returning(RefreshSession.id)
+    )
+    session_ids = result.all()
+    await db.commit()
+    return session_ids
+
+
+async def delete_expired_sessions(
+    db: AsyncSession, batch_size: int = 1000, now: Optional[datetime] = None
+) -> int:
+    """
+    Deletes sessions whose refresh token has expired, ``batch_size`` rows per transaction.
+
+    Small batches keep each transaction, and the locks it holds, short.
+
+    :param db: The database session.
+    :type db: AsyncSession
+    :param batch_size: The maximum number of rows deleted per transaction.
+    :type batch_size: int
+    :param now: The cut-off time; defaults to the current time.
+    :type now: Optional[datetime]
+    :return: The number of deleted sessions.
+    :rtype: int
+    """
+    now = now or datetime.utcnow()
+    expired = (
+        select(RefreshSession.id)
+        .where(RefreshSession.expires_at <= now)
+        .limit(batch_size)
+        .scalar_subquery()
+    )
+    deleted = 0
+    while True:
+        result = await db.execute(delete(RefreshSession).where(RefreshSession.id.in_(expired)))
+        await db.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted
@@ -1,9 +1,14 @@
-from typing import Union
-from sqlalchemy.orm import Session
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from libgravatar import Gravatar
 from src.web13hm.database.models import User
+from src.web13hm.services.cache import recent_writers, user_cache
 from src.web13hm.shemas import UserModel
 
+logger = logging.getLogger(__name__)
+
 
 async def get_user_by_email(email, db):
     """
@@ -12,23 +17,23 @@ async def get_user_by_email(email, db):
     :param email: The EMAIL of the user to retrieve.
     :type email: str
     :param db: The database session.
-    :type db: Session
+    :type db: AsyncSession
     :return: The User with the specified EMAIL or None if it does not exist.
     :rtype: User | None
     """
-    user: User = db.query(User).filter(User.email == email).first()
+    user: User = await db.scalar(select(User).where(User.email == email))
 
     return user
 
 
-async def create_user(body: UserModel, db: Session) -> User:
+async def create_user(body: UserModel, db: AsyncSession) -> User:
     """
     Create a new user.
 
     :param body: The data for the user to create.
     :type user: UserModel
     :param db: The database session.
-    :type db: Session
+    :type db: AsyncSession
     :return: The new user.
     :rtype: User
     """
@@ -36,50 +41,38 @@ async def create_user(body: UserModel, db: Session) -> User:
     try:
         g = Gravatar(body.username)
         avatar = g.get_image()
-    except Exception as e:
-        print(e)
+    except Exception:
+        logger.warning("Failed to get the Gravatar of %s", body.username, exc_info=True)
     try:
         new_user = User(email=body.username, password=body.password, avatar=avatar)
-    except Exception as e:
-        print(e)
+    except Exception:
+        logger.exception("Failed to build the user %s", body.username)
+        raise
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
+    await recent_writers.add(new_user.email)
     return new_user
 
 
-async def update_token(user: User, token: Union[str, None], db: Session) -> None:
-    """
-    Update user token.
-
-    :param user: current user
-    :type user: User
-    :param token: The new token.
-    :type token: Union[str, None]
-    :param db: The database session.
-    :type db: Session
-    :rtype: None
-    """
-    user.refresh_token = token
-    db.commit()
-
-
-async def confirmed_email(email: str, db: Session) -> None:
+async def confirmed_email(email: str, db: AsyncSession) -> None:
     """
     Confirm the user's email.
 
     :param email: The email of the user to confirm.
     :type email: str
     :param db: The database session.
-    :type db: Session
+    :type db: AsyncSession
     :rtype: None
     """
     user = await get_user_by_email(email, db)
     user.confirmed = True
-    db.commit()
+    await db.commit()
+    user_cache.invalidate(email)
+    await recent_writers.add(email)
 
 
-async def update_avatar(email, url: str, db: Session) -> User:
+async def update_avatar(email, url: str, db: AsyncSession) -> User:
     """
     Update the user's avatar.
 
@@ -88,11 +81,13 @@ async def update_avatar(email, url: str, db: Session) -> User:
     :param url: The new avatar URL.
     :type url: str
     :param db: The database session.
-    :type db: Session
+    :type db: AsyncSession
     :return: The updated user instance.
     :rtype: User
     """
     user = await get_user_by_email(email, db)
     user.avatar = url
-    db.commit()
+    await db.commit()
+    user_cache.invalidate(email)
+    await recent_writers.add(email)
     return user
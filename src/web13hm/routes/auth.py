@@ -6,23 +6,53 @@ from fastapi import (
     Security,
     BackgroundTasks,
     Request,
+    Response,
 )
 from fastapi.security import (
     OAuth2PasswordRequestForm,
     HTTPAuthorizationCredentials,
     HTTPBearer,
 )
-from sqlalchemy.orm import Session
-from src.web13hm.database.db import get_db
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.web13hm.conf.config import settings
+from src.web13hm.core.sql_audit import query_budget
+from src.web13hm.database.db import get_db, replica_session
+from src.web13hm.database.models import User
 from src.web13hm.shemas import UserModel, TokenModel, RequestEmail
+from src.web13hm.repository import sessions as repository_sessions
 from src.web13hm.repository import users as repository_users
 from src.web13hm.services.auth import auth_service
+from src.web13hm.services.cache import revoked_sessions
 from src.web13hm.services.email import send_email
+from src.web13hm.services.jwks import signing_keys
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 security = HTTPBearer()
 
 
+async def issue_tokens(email: str, session_id: str):
+    """
+    Creates an access and a refresh token for a session.
+
+    :return: The tokens and the expiry of the refresh token.
+    """
+    expires_at = datetime.utcnow() + timedelta(seconds=settings.refresh_token_ttl)
+    claims = {"sub": email, "sid": session_id}
+    access_token = await auth_service.create_access_token(data=claims)
+    refresh_token = await auth_service.create_refresh_token(
+        data=claims, expires_delta=settings.refresh_token_ttl
+    )
+    return access_token, refresh_token, expires_at
+
+
+async def revoke_access(session_id: str) -> None:
+    # Access tokens of the session are rejected until the last one has expired.
+    await revoked_sessions.revoke(session_id, settings.access_token_ttl)
+
+
 @router.post(
     "/signup", status_code=status.HTTP_201_CREATED
 )
@@ -30,7 +60,7 @@ async def signup(
     body: UserModel,
     background_tasks: BackgroundTasks,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     exist_user = await repository_users.get_user_by_email(body.username, db)
     if exist_user:
@@ -38,7 +68,7 @@ async def signup(
             status_code=status.HTTP_409_CONFLICT, detail="Account already exists"
         )
     
-    body.password = auth_service.get_password_hash(body.password)
+    body.password = await auth_service.get_password_hash_async(body.password)
     new_user = await repository_users.create_user(body, db)
     background_tasks.add_task(
         send_email, new_user.email, request.base_url
@@ -47,10 +77,12 @@ async def signup(
 
 
 @router.post("/login", response_model=TokenModel)
+@query_budget(2)
 async def login(
-    body: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+    body: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)
 ):
-    user = await repository_users.get_user_by_email(body.username, db)
+    async with replica_session(body.username) as replica:
+        user = await repository_users.get_user_by_email(body.username, replica or db)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email"
@@ -59,14 +91,14 @@ async def login(
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Email not confirmed"
         )
-    if not auth_service.verify_password(body.password, user.password):
+    if not await auth_service.verify_password_async(body.password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid password"
         )
     # Generate JWT
-    access_token = await auth_service.create_access_token(data={"sub": user.email})
-    refresh_token = await auth_service.create_refresh_token(data={"sub": user.email})
-    await repository_users.update_token(user, refresh_token, db)
+    session_id = uuid.uuid4().hex
+    access_token, refresh_token, expires_at = await issue_tokens(user.email, session_id)
+    await repository_sessions.create_session(session_id, user.id, refresh_token, expires_at, db)
     return {
         "access_token": access_token,
         "refresh_token": refresh_token,
@@ -75,22 +107,22 @@ async def login(
 
 
 @router.get("/refresh_token", response_model=TokenModel)
+@query_budget(2)
 async def refresh_token(
     credentials: HTTPAuthorizationCredentials = Security(security),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     token = credentials.credentials
-    email = await auth_service.decode_refresh_token(token)
-    user = await repository_users.get_user_by_email(email, db)
-    if user.refresh_token != token:
-        await repository_users.update_token(user, None, db)
+    claims = await auth_service.decode_refresh_token(token)
+    session_id = claims["sid"]
+    access_token, refresh_token, expires_at = await issue_tokens(claims["sub"], session_id)
+    if not await repository_sessions.rotate_session(session_id, token, refresh_token, expires_at, db):
+        # A rotated-out token being presented again means it leaked: end the session.
+        if await repository_sessions.revoke_session(session_id, db):
+            await revoke_access(session_id)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
         )
-
-    access_token = await auth_service.create_access_token(data={"sub": email})
-    refresh_token = await auth_service.create_refresh_token(data={"sub": email})
-    await repository_users.update_token(user, refresh_token, db)
     return {
         "access_token": access_token,
         "refresh_token": refresh_token,
@@ -98,8 +130,36 @@ async def refresh_token(
     }
 
 
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(2)
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Security(security),
+    db: AsyncSession = Depends(get_db),
+):
+    _, session_id = await auth_service.verify_access_token(credentials.credentials)
+    if session_id is not None:
+        await repository_sessions.revoke_session(session_id, db)
+        await revoke_access(session_id)
+
+
+@router.post("/logout_all", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(2)
+async def logout_all(
+    current_user: User = Depends(auth_service.get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    for session_id in await repository_sessions.revoke_user_sessions(current_user.id, db):
+        await revoke_access(session_id)
+
+
+@router.get("/jwks.json")
+async def jwks(response: Response):
+    response.headers["Cache-Control"] = "public, max-age=3600"
+    return signing_keys.jwks()
+
+
 @router.get("/confirmed_email/{token}")
-async def confirmed_email(token: str, db: Session = Depends(get_db)):
+async def confirmed_email(token: str, db: AsyncSession = Depends(get_db)):
     email = await auth_service.get_email_from_token(token)
     user = await repository_users.get_user_by_email(email, db)
     if user is None:
@@ -117,7 +177,7 @@ async def request_email(
     body: RequestEmail,
     background_tasks: BackgroundTasks,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     user = await repository_users.get_user_by_email(body.email, db)
 
@@ -1,3 +1,5 @@
+import logging
+
 from fastapi import (
     APIRouter,
     Path,
@@ -12,118 +14,280 @@ from fastapi.security import (
     HTTPBearer,
 )
 from fastapi.requests import Request
-from sqlalchemy import text
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from datetime import date
+
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from src.web13hm.shemas import (
+    BatchDeleteModel,
+    BatchResultModel,
+    BatchUpdateModel,
+    ContactPatchModel,
     ResponseContactModel,
     ContactModel,
 )
-from src.web13hm.database.db import get_db
+from src.web13hm.database.db import engine, get_db, replica_session
 from src.web13hm.repository import contacts as contacts_repository
 from src.web13hm.services.auth import auth_service
+from src.web13hm.services import exporter, importer
+from src.web13hm.services.response_cache import cached_json
+from src.web13hm.services.serialization import ContactRowsResponse, contact_columns
+from src.web13hm.conf.config import settings
+from src.web13hm.database.models import Contacts
 from src.web13hm.core.config import limiter
+from src.web13hm.core.sql_audit import query_budget
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix='/contacts', tags=["contacts"])
 
 security = HTTPBearer()
 
 
+async def get_read_db(
+    db: AsyncSession = Depends(get_db), current_user=Depends(auth_service.get_current_user)
+):
+    """
+    Returns a session on a read replica, or the request's primary session when reads must not go to a replica.
+    """
+    async with replica_session(current_user.email) as replica:
+        yield replica or db
+
+
 @router.get("/healthchecker")
-def healthchecker(db: Session = Depends(get_db)):
+async def healthchecker():
     try:
-        # Make request
-        result = db.execute(text("SELECT 1")).fetchone()
+        # A pooled connection is enough; no session is needed to run SELECT 1.
+        async with engine.connect() as conn:
+            result = (await conn.exec_driver_sql("SELECT 1")).fetchone()
         if result is None:
             raise HTTPException(
                 status_code=500, detail="Database is not configured correctly"
             )
         return {"message": "Welcome to FastAPI!"}
-    except Exception as e:
-        print(e)
+    except Exception:
+        logger.exception("Database healthcheck failed")
         raise HTTPException(status_code=500, detail="Error connecting to the database")
 
 
-@router.get("/contacts")
-@limiter.limit("3/minute")
+@router.get("/contacts", response_model=List[ResponseContactModel], response_class=ContactRowsResponse)
+@query_budget(2)
+@limiter.limit("60/minute")
 async def read_all_contacts(
     request: Request,
     credentials: HTTPAuthorizationCredentials = Security(security),
     skip: int = 0,
     limit: int = Query(default=10, le=100, ge=10),
-    db: Session = Depends(get_db),
+    cursor: str | None = Query(default=None, description="The X-Next-Cursor value of the previous page"),
+    db: AsyncSession = Depends(get_read_db),
     current_user=Depends(auth_service.get_current_user),
 ):
-    contacts = await contacts_repository.get_Contacts(skip=skip, limit=limit, db=db, user=current_user)
-    return contacts
+    async def build():
+        contacts = await contacts_repository.get_Contacts(skip=skip, limit=limit, db=db, user=current_user, cursor=cursor, columns=contact_columns())
+        next_cursor = contacts_repository.contacts_next_cursor(contacts, limit)
+        return contacts, {"X-Next-Cursor": next_cursor} if next_cursor else {}
 
+    return await cached_json(request, current_user.id, build, ContactRowsResponse)
 
-@router.get("/contacts/{data}", response_model=None)
-@limiter.limit("5/minute")
+
+@router.get("/contacts/{data}", response_model=List[ResponseContactModel], response_class=ContactRowsResponse)
+@query_budget(2)
+@limiter.limit("60/minute")
 async def read_contacts(
     request: Request,
     credentials: HTTPAuthorizationCredentials = Security(security),
     data: str = Path(description="The ID, NAME, LAST NAME, or EMAIL of the contact"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user=Depends(auth_service.get_current_user),
 ):
-    contacts = await contacts_repository.get_Contacts_by(Contacts_data=data, user=current_user, db=db)
+    async def build():
+        return await contacts_repository.get_Contacts_by(Contacts_data=data, user=current_user, db=db, columns=contact_columns()), {}
 
-    return contacts
+    return await cached_json(request, current_user.id, build, ContactRowsResponse)
 
 
-@router.get("/birthday")
-@limiter.limit("2/minute")
+@router.get("/search", response_model=List[ResponseContactModel])
+@query_budget(2)
+@limiter.limit("30/minute")
+async def search_contacts(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Security(security),
+    q: str = Query(min_length=1, max_length=200, description="Prefixes of the name, last name or email"),
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=10, le=100, ge=1),
+    db: AsyncSession = Depends(get_read_db),
+    current_user=Depends(auth_service.get_current_user),
+):
+    return await contacts_repository.search_contacts(query=q, skip=skip, limit=limit, user=current_user, db=db)
+
+
+@router.get("/birthday", response_model=List[ResponseContactModel], response_class=ContactRowsResponse)
+@query_budget(2)
+@limiter.limit("60/minute")
 async def birthday_by_7_day(
     request: Request,
     credentials: HTTPAuthorizationCredentials = Security(security),
     skip: int = 0,
     limit: int = Query(default=10, le=100, ge=10),
-    db: Session = Depends(get_db),
+    cursor: str | None = Query(default=None, description="The X-Next-Cursor value of the previous page"),
+    days: int = Query(default=7, ge=0, le=365, description="How many days ahead to look"),
+    db: AsyncSession = Depends(get_read_db),
     current_user=Depends(auth_service.get_current_user),
-) -> List[ResponseContactModel]:
-    contacts = await contacts_repository.birthday_by_7_day(skip=skip, limit=limit, db=db, current_user=current_user)
+):
+    today = date.today()
 
-    return contacts
+    async def build():
+        # The trailing month-day column feeds the cursor and is not serialized.
+        columns = contact_columns() + [Contacts.birthday_month_day]
+        contacts = await contacts_repository.birthday_by_7_day(skip=skip, limit=limit, db=db, current_user=current_user, cursor=cursor, days=days, today=today, columns=columns)
+        next_cursor = contacts_repository.birthday_next_cursor(contacts, limit)
+        return contacts, {"X-Next-Cursor": next_cursor} if next_cursor else {}
+
+    # The window moves with the date, and so does the cached page.
+    return await cached_json(request, current_user.id, build, ContactRowsResponse, key=today)
 
 
 @router.post("/Create", status_code=status.HTTP_201_CREATED)
+@query_budget(3)
 @limiter.limit("5/minute")
 async def create_contact(
     request: Request,
     contact: ContactModel,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     credentials: HTTPAuthorizationCredentials = Security(security),
     current_user=Depends(auth_service.get_current_user),
 ):
-    new_contact = await contacts_repository.create_contact(contact=contact, db=db, current_user=current_user)
+    new_contact = await contacts_repository.create_contact(body=contact, db=db, current_user=current_user)
 
     return new_contact
 
 
+@router.post("/import")
+@limiter.limit("5/minute")
+async def import_contacts(
+    request: Request,
+    format: str = Query(
+        default="csv",
+        pattern="^(csv|ndjson)$",
+        description="csv (with a header row) or ndjson (one JSON object per line)",
+    ),
+    db: AsyncSession = Depends(get_db),
+    credentials: HTTPAuthorizationCredentials = Security(security),
+    current_user=Depends(auth_service.get_current_user),
+):
+    lines = importer.iter_lines(request.stream())
+    if format == "ndjson":
+        records = importer.iter_ndjson_records(lines)
+    else:
+        records = importer.iter_csv_records(lines)
+    return await importer.import_contacts(records, db=db, current_user=current_user)
+
+
+@router.get("/export", response_class=StreamingResponse)
+@limiter.limit("5/minute")
+async def export_contacts(
+    request: Request,
+    format: str = Query(default="csv", pattern="^(csv|ndjson)$"),
+    db: AsyncSession = Depends(get_db),
+    credentials: HTTPAuthorizationCredentials = Security(security),
+    current_user=Depends(auth_service.get_current_user),
+):
+    columns = [getattr(Contacts, column) for column in exporter.EXPORT_COLUMNS]
+    batches = contacts_repository.stream_contacts(
+        columns, user=current_user, db=db, batch_size=settings.export_batch_size
+    )
+    if format == "ndjson":
+        body = exporter.ndjson_chunks(batches)
+    else:
+        body = exporter.csv_chunks(batches)
+    headers = {
+        "Content-Disposition": f'attachment; filename="contacts.{format}"',
+        "Vary": "Accept-Encoding",
+    }
+    if exporter.accepts_gzip(request.headers.get("accept-encoding", "")):
+        body = exporter.gzip_chunks(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=exporter.MEDIA_TYPES[format], headers=headers)
+
+
 @router.put("/Update/{contact_id}", response_model=ResponseContactModel)
+@query_budget(5)
 @limiter.limit("3/minute")
 async def update_contact(
     request: Request,
     contact_id: int,
     contact: ContactModel,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     credentials: HTTPAuthorizationCredentials = Security(security),
     current_user=Depends(auth_service.get_current_user),
 ):
-    contacts_db = await contacts_repository.update_contact(contact_id=contact_id, contact=contact, db=db, current_user=current_user)
+    contacts_db = await contacts_repository.update_contact(contact_id=contact_id, body=contact, db=db, current_user=current_user)
     return contacts_db
 
 
+@router.patch("/Update/{contact_id}", response_model=ResponseContactModel)
+@query_budget(4)
+@limiter.limit("30/minute")
+async def patch_contact(
+    request: Request,
+    contact_id: int,
+    changes: ContactPatchModel,
+    db: AsyncSession = Depends(get_db),
+    credentials: HTTPAuthorizationCredentials = Security(security),
+    current_user=Depends(auth_service.get_current_user),
+):
+    return await contacts_repository.patch_contact(
+        contact_id=contact_id, changes=changes.model_dump(exclude_unset=True), db=db, current_user=current_user
+    )
+
+
 @router.delete(
     "/delete/{contact_id}",
 )
+@query_budget(4)
 @limiter.limit("2/minute")
 async def delete_contact(
     request: Request,
     contact_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user=Depends(auth_service.get_current_user),
 ):
     return await contacts_repository.delete_contact(contact_id=contact_id, db=db, current_user=current_user)
+
+
+def batch_result(ids: List[int], changed: List[int], status: str) -> dict:
+    changed = set(changed)
+    results = [
+        {"id": contact_id, "status": status if contact_id in changed else "not_found"}
+        for contact_id in dict.fromkeys(ids)
+    ]
+    return {"count": len(changed), "results": results}
+
+
+@router.patch("/batch", response_model=BatchResultModel)
+@query_budget(4)
+@limiter.limit("10/minute")
+async def update_contacts_batch(
+    request: Request,
+    body: BatchUpdateModel,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(auth_service.get_current_user),
+):
+    changes = body.changes.model_dump(exclude_unset=True)
+    updated = await contacts_repository.update_contacts_batch(body.ids, changes, db=db, current_user=current_user)
+    return batch_result(body.ids, updated, "updated")
+
+
+@router.delete("/batch", response_model=BatchResultModel)
+@query_budget(4)
+@limiter.limit("10/minute")
+async def delete_contacts_batch(
+    request: Request,
+    body: BatchDeleteModel,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(auth_service.get_current_user),
+):
+    deleted = await contacts_repository.delete_contacts_batch(body.ids, db=db, current_user=current_user)
+    return batch_result(body.ids, deleted, "deleted")
@@ -1,12 +1,24 @@
-from fastapi import APIRouter, Depends, UploadFile, File
-from sqlalchemy.orm import Session
-import cloudinary
-import cloudinary.uploader
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    File,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.web13hm.database.db import get_db
 from src.web13hm.database.models import User
-from src.web13hm.repository import users as repository_users
+from src.web13hm.services import avatars
 from src.web13hm.services.auth import auth_service
+from src.web13hm.services.response_cache import etag_matches
 from src.web13hm.conf.config import settings
 from src.web13hm.shemas import UserDb
 
@@ -18,24 +30,47 @@ async def read_users_me(current_user: User = Depends(auth_service.get_current_us
     return current_user
 
 
-@router.patch("/avatar", response_model=UserDb)
+@router.patch(
+    "/avatar",
+    response_model=UserDb,
+    responses={status.HTTP_202_ACCEPTED: {"description": "The avatar is processed in the background"}},
+)
 async def update_avatar_user(
+    response: Response,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(),
+    background: bool = Query(
+        default=False, description="Return 202 at once and update the avatar when the upload is done"
+    ),
     current_user: User = Depends(auth_service.get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    cloudinary.config(
-        cloud_name=settings.cloudinary_name,
-        api_key=settings.cloudinary_api_key,
-        api_secret=settings.cloudinary_api_secret,
-        secure=True,
-    )
-
-    r = cloudinary.uploader.upload(
-        file.file, public_id=f"NotesApp/{current_user.email}", overwrite=True
-    )
-    src_url = cloudinary.CloudinaryImage(f"NotesApp/{current_user.email}").build_url(
-        width=250, height=250, crop="fill", version=r.get("version")
-    )
-    user = await repository_users.update_avatar(current_user.email, src_url, db)
-    return user
+    data = await avatars.read_upload(file, settings.avatar_max_bytes)
+    if background:
+        avatars.check_image(data)
+        background_tasks.add_task(avatars.process_avatar_in_background, current_user.email, data)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return current_user
+    try:
+        return await avatars.process_avatar(current_user.email, data, db)
+    except ValueError as err:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(err))
+
+
+@router.get("/avatar/{digest}/{size}", response_class=FileResponse)
+async def read_avatar(
+    request: Request,
+    digest: str = Path(pattern="^[0-9a-f]{64}$"),
+    size: int = Path(),
+):
+    storage = avatars.avatar_storage
+    if not isinstance(storage, avatars.LocalStorage) or size not in storage.sizes:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    etag = f'"{digest}-{size}"'
+    headers = {"ETag": etag, "Cache-Control": avatars.IMMUTABLE_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    path = storage.path(digest, size)
+    if not path.is_file():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    return FileResponse(path, media_type="image/jpeg", headers=headers)
@@ -1,5 +1,8 @@
+import hashlib
+import time
+import uuid
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 
 from fastapi import HTTPException, Depends, Security
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
@@ -7,10 +10,15 @@ from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from starlette import status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.web13hm.conf.config import settings
+from src.web13hm.core.metrics import timed
 from src.web13hm.database.models import User
 from src.web13hm.database.db import get_db
-from src.web13hm.conf.config import settings
+from src.web13hm.services.cache import revoked_sessions, token_cache, user_cache
+from src.web13hm.services.jwks import signing_keys
+from src.web13hm.services.workers import password_hasher
 
 security = HTTPBearer()
 
@@ -46,7 +54,42 @@ class Auth:
         """
         return self.pwd_context.hash(password)
 
+    @timed("verify_password")
+    async def verify_password_async(self, plain_password, hashed_password):
+        """
+        Same as :meth:`verify_password`, but runs bcrypt on the password hashing pool.
+
+        :param plain_password: The plain text password.
+        :type plain_password: str
+        :param hashed_password: The hashed password.
+        :type hashed_password: str
+        :return: True if the passwords match, False otherwise.
+        :rtype: bool
+        """
+        return await password_hasher.run(_verify_password, plain_password, hashed_password)
+
+    @timed("hash_password")
+    async def get_password_hash_async(self, password: str):
+        """
+        Same as :meth:`get_password_hash`, but runs bcrypt on the password hashing pool.
+
+        :param password: The plain text password.
+        :type password: str
+        :return: The hashed password.
+        :rtype: str
+        """
+        return await password_hasher.run(_hash_password, password)
+
+    def _encode(self, claims: dict) -> str:
+        return jwt.encode(
+            claims, signing_keys.signing_key, algorithm=signing_keys.algorithm, headers=signing_keys.headers
+        )
+
+    def _decode(self, token: str) -> dict:
+        return jwt.decode(token, signing_keys.verification_key, algorithms=[signing_keys.algorithm])
+
     # define a function to generate a new access token
+    @timed("create_access_token")
     async def create_access_token(self, data: dict, expires_delta: Optional[float] = None):
         """
         Generates a JWT access token with a specified expiration time (in seconds).
@@ -62,16 +105,20 @@ class Auth:
         if expires_delta:
             expire = datetime.utcnow() + timedelta(seconds=expires_delta)
         else:
-            expire = datetime.utcnow() + timedelta(minutes=15)
+            expire = datetime.utcnow() + timedelta(seconds=settings.access_token_ttl)
         to_encode.update({"iat": datetime.utcnow(), "exp": expire, "scope": "access_token"})
-        encoded_access_token = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
+        encoded_access_token = self._encode(to_encode)
         return encoded_access_token
 
     # define a function to generate a new refresh token
+    @timed("create_refresh_token")
     async def create_refresh_token(self, data: dict, expires_delta: Optional[float] = None):
         """
         Generates a JWT refresh token with a specified expiration time (in seconds).
 
+        Every token gets a unique ``jti`` claim, so tokens issued for the same
+        session within the same second still differ.
+
         :param data: The data to include in the token.
         :type data: dict
         :param expires_delta: The duration (in seconds) for which the token is valid.
@@ -83,50 +130,117 @@ class Auth:
         if expires_delta:
             expire = datetime.utcnow() + timedelta(seconds=expires_delta)
         else:
-            expire = datetime.utcnow() + timedelta(days=7)
+            expire = datetime.utcnow() + timedelta(seconds=settings.refresh_token_ttl)
         to_encode.update(
-            {"iat": datetime.utcnow(), "exp": expire, "scope": "refresh_token"}
+            {"iat": datetime.utcnow(), "exp": expire, "scope": "refresh_token", "jti": uuid.uuid4().hex}
         )
-        encoded_refresh_token = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
+        encoded_refresh_token = self._encode(to_encode)
         return encoded_refresh_token
 
+    @staticmethod
+    def credentials_exception() -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    @timed("verify_access_token")
+    async def verify_access_token(self, token: str) -> Tuple[str, Optional[str]]:
+        """
+        Verifies an access token and returns its ``sub`` (the user's email) and ``sid`` claims.
+
+        Verified tokens are kept in :data:`token_cache` under their digest until
+        they expire, so a client reusing its token skips signature verification.
+        Tokens of sessions in :data:`revoked_sessions` are rejected, cached or not.
+
+        :param token: The encoded access token.
+        :type token: str
+        :return: The email of the token's user and the ID of its session, if any.
+        :rtype: Tuple[str, Optional[str]]
+        :raises HTTPException: If the token is invalid, expired, revoked or not an access token.
+        """
+        digest = hashlib.sha256(token.encode()).digest()
+        claims = token_cache.get(digest)
+        if claims is None:
+            try:
+                payload = self._decode(token)
+            except JWTError:
+                raise self.credentials_exception()
+            if payload.get("scope") != "access_token" or payload.get("sub") is None:
+                raise self.credentials_exception()
+            claims = payload["sub"], payload.get("sid")
+            if "exp" in payload:
+                remaining = payload["exp"] - time.time()
+                if remaining > 0:
+                    token_cache.set(digest, claims, ttl=min(remaining, token_cache.ttl))
+        if claims[1] is not None and await revoked_sessions.is_revoked(claims[1]):
+            raise self.credentials_exception()
+        return claims
+
+    async def decode_access_token(self, token: str) -> str:
+        """
+        Verifies an access token like :meth:`verify_access_token` and returns its ``sub`` claim (the user's email).
+
+        :param token: The encoded access token.
+        :type token: str
+        :return: The email of the token's user.
+        :rtype: str
+        :raises HTTPException: If the token is invalid, expired, revoked or not an access token.
+        """
+        email, _ = await self.verify_access_token(token)
+        return email
+
+    @timed("decode_refresh_token")
+    async def decode_refresh_token(self, token: str) -> dict:
+        """
+        Verifies a refresh token and returns its claims.
+
+        Whether the token is still the current one of its session is up to the
+        session store to decide.
+
+        :param token: The encoded refresh token.
+        :type token: str
+        :return: The claims of the token, including ``sub`` and ``sid``.
+        :rtype: dict
+        :raises HTTPException: If the token is invalid, expired or not a refresh token.
+        """
+        try:
+            payload = self._decode(token)
+        except JWTError:
+            raise self.credentials_exception()
+        if payload.get("scope") != "refresh_token" or payload.get("sub") is None or payload.get("sid") is None:
+            raise self.credentials_exception()
+        return payload
+
+    @timed("get_current_user")
     async def get_current_user(
         self,
         credentials: HTTPAuthorizationCredentials = Security(security),
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
     ):
         """
         Returns the current user associated with the provided JWT token.
 
+        Users are served from :data:`user_cache` when possible, so most requests
+        skip the database lookup.
+
         :param token: The JWT token for which to retrieve the user.
         :type token: str
         :param db: The database session to use.
-        :type db: sqlalchemy.orm.Session
+        :type db: sqlalchemy.ext.asyncio.AsyncSession
         :return: The user associated with the provided token.
         :rtype: dict
         :raises HTTPException: If the token is invalid, the scope is incorrect, or the user cannot be found.
         """
-        token = credentials.credentials
-
-        credentials_exception = HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        email = await self.decode_access_token(credentials.credentials)
 
-        try:
-            payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-            if payload.get("scope") != "access_token":
-                raise credentials_exception
-            email = payload.get("sub")
-            if email is None:
-                raise credentials_exception
-        except JWTError:
-            raise credentials_exception
-
-        user: User = db.query(User).filter(User.email == email).first()
+        user: User = user_cache.get(email)
         if user is None:
-            raise credentials_exception
+            user = await db.scalar(select(User).where(User.email == email))
+            if user is None:
+                raise self.credentials_exception()
+            user_cache.set(email, user)
         return user
 
     async def create_email_token(self, data: dict):
@@ -141,7 +255,7 @@ class Auth:
         to_encode = data.copy()
         expire = datetime.utcnow() + timedelta(days=7)
         to_encode.update({"iat": datetime.utcnow(), "exp": expire, "scope": "email_token"})
-        token = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
+        token = self._encode(to_encode)
         return token
 
     async def get_email_from_token(self, refresh_token: str):
@@ -155,7 +269,7 @@ class Auth:
         :raises HTTPException: If the token is invalid.
         """
         try:
-            payload = jwt.decode(refresh_token, settings.secret_key, algorithms=[settings.algorithm])
+            payload = self._decode(refresh_token)
             if payload["scope"] == "email_token":
                 email = payload["sub"]
                 return email
@@ -169,4 +283,13 @@ class Auth:
             )
 
 
+# Module-level so they can be pickled when the hashing pool is a process pool.
+def _verify_password(plain_password, hashed_password):
+    return Auth.pwd_context.verify(plain_password, hashed_password)
+
+
+def _hash_password(password):
+    return Auth.pwd_context.hash(password)
+
+
 auth_service = Auth()
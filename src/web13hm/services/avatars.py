@@ -0,0 +1,272 @@
+import abc
+import hashlib
+import io
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+import cloudinary
+import cloudinary.uploader
+from fastapi import HTTPException, UploadFile, status
+from PIL import Image, ImageOps, UnidentifiedImageError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.web13hm.conf.config import settings
+from src.web13hm.database.db import SessionLocal
+from src.web13hm.repository import users as repository_users
+from src.web13hm.services.workers import BoundedExecutor
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def make_thumbnails(data: bytes, sizes: Sequence[int]) -> Dict[int, bytes]:
+    """
+    Crops an image to a centered square and scales it to each of ``sizes``, like Cloudinary's ``crop="fill"``.
+
+    The image is decoded once; each thumbnail is scaled down from the next
+    larger one.
+
+    :param data: The uploaded image.
+    :type data: bytes
+    :param sizes: The sides of the squares, in pixels.
+    :type sizes: Sequence[int]
+    :return: The JPEG-encoded thumbnails by size.
+    :rtype: Dict[int, bytes]
+    :raises ValueError: If ``data`` is not an image.
+    """
+    largest = max(sizes)
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.draft("RGB", (largest, largest))
+            image = ImageOps.exif_transpose(image)
+            square = ImageOps.fit(image.convert("RGB"), (largest, largest), Image.Resampling.LANCZOS)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as error:
+        raise ValueError("Not a valid image") from error
+    thumbnails = {}
+    for size in sorted(set(sizes), reverse=True):
+        if square.size != (size, size):
+            square = square.resize((size, size), Image.Resampling.LANCZOS)
+        output = io.BytesIO()
+        square.save(output, format="JPEG", quality=85, optimize=True)
+        thumbnails[size] = output.getvalue()
+    return thumbnails
+
+
+class AvatarStorage(abc.ABC):
+    """
+    Where avatar thumbnails are kept, addressed by the SHA-256 digest of the uploaded image.
+    """
+
+    def configure(self) -> None:
+        """
+        Prepares the backend once at startup.
+        """
+
+    async def find(self, digest: str) -> Optional[str]:
+        """
+        Returns the URL of already stored thumbnails of ``digest``, if any.
+
+        :param digest: The hex SHA-256 digest of the uploaded image.
+        :type digest: str
+        :rtype: Optional[str]
+        """
+        return None
+
+    @abc.abstractmethod
+    async def save(self, digest: str, thumbnails: Dict[int, bytes]) -> str:
+        """
+        Stores the thumbnails of an image and returns the URL of the avatar.
+
+        :param digest: The hex SHA-256 digest of the uploaded image.
+        :type digest: str
+        :param thumbnails: The JPEG-encoded thumbnails by size.
+        :type thumbnails: Dict[int, bytes]
+        :rtype: str
+        """
+
+
+class CloudinaryStorage(AvatarStorage):
+    """
+    Uploads the ``avatar_size`` thumbnail to Cloudinary, running the blocking SDK calls on a thread pool.
+    """
+
+    def __init__(self, folder: str, executor: BoundedExecutor):
+        """
+        :param folder: The Cloudinary folder images are stored in.
+        :type folder: str
+        :param executor: The pool the uploads run on.
+        :type executor: BoundedExecutor
+        """
+        self.folder = folder
+        self.executor = executor
+        self.configured = False
+
+    def configure(self) -> None:
+        if self.configured:
+            return
+        cloudinary.config(
+            cloud_name=settings.cloudinary_name,
+            api_key=settings.cloudinary_api_key,
+            api_secret=settings.cloudinary_api_secret,
+            secure=True,
+        )
+        self.configured = True
+
+    def _upload(self, public_id: str, data: bytes) -> str:
+        result = cloudinary.uploader.upload(data, public_id=public_id, overwrite=True)
+        return cloudinary.CloudinaryImage(public_id).build_url(version=result.get("version"))
+
+    async def save(self, digest: str, thumbnails: Dict[int, bytes]) -> str:
+        self.configure()
+        return await self.executor.run(
+            self._upload, f"{self.folder}/{digest}", thumbnails[settings.avatar_size]
+        )
+
+
+class LocalStorage(AvatarStorage):
+    """
+    Keeps thumbnails in a local directory, served by ``GET /api/users/avatar/{digest}/{size}``.
+
+    Each image gets a ``<root>/<digest[:2]>/<digest>/`` directory holding one
+    ``<size>.jpg`` per size, so uploading the same image again costs nothing.
+    """
+
+    def __init__(self, root: str, sizes: Sequence[int], executor: BoundedExecutor):
+        """
+        :param root: The directory thumbnails are written to.
+        :type root: str
+        :param sizes: The thumbnail sizes kept for each image.
+        :type sizes: Sequence[int]
+        :param executor: The pool the file operations run on.
+        :type executor: BoundedExecutor
+        """
+        self.root = Path(root)
+        self.sizes = tuple(sizes)
+        self.executor = executor
+
+    def configure(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, digest: str, size: int) -> Path:
+        return self.root / digest[:2] / digest / f"{size}.jpg"
+
+    def url(self, digest: str) -> str:
+        return f"/api/users/avatar/{digest}/{settings.avatar_size}"
+
+    def _complete(self, digest: str) -> bool:
+        return all(self.path(digest, size).is_file() for size in self.sizes)
+
+    def _write(self, digest: str, thumbnails: Dict[int, bytes]) -> None:
+        for size, data in thumbnails.items():
+            path = self.path(digest, size)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{size}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+
+    async def find(self, digest: str) -> Optional[str]:
+        if await self.executor.run(self._complete, digest):
+            return self.url(digest)
+        return None
+
+    async def save(self, digest: str, thumbnails: Dict[int, bytes]) -> str:
+        await self.executor.run(self._write, digest, thumbnails)
+        return self.url(digest)
+
+
+async def read_upload(file: UploadFile, max_bytes: int) -> bytes:
+    """
+    Reads an uploaded file in chunks, refusing it as soon as it exceeds ``max_bytes``.
+
+    :param file: The uploaded file.
+    :type file: UploadFile
+    :param max_bytes: The largest accepted size.
+    :type max_bytes: int
+    :rtype: bytes
+    :raises HTTPException: 413 if the file is too large.
+    """
+    buffer = bytearray()
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        buffer += chunk
+        if len(buffer) > max_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+                detail="Avatar is too large",
+            )
+    return bytes(buffer)
+
+
+async def process_avatar(email: str, data: bytes, db: AsyncSession):
+    """
+    Makes the thumbnails of an uploaded avatar on the image pool, stores them and saves the avatar URL on the user.
+
+    Images that are already stored are not processed again.
+
+    :param email: The email of the user.
+    :type email: str
+    :param data: The uploaded image.
+    :type data: bytes
+    :param db: The database session.
+    :type db: AsyncSession
+    :return: The updated user.
+    :rtype: User
+    :raises ValueError: If ``data`` is not an image.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    url = await avatar_storage.find(digest)
+    if url is None:
+        thumbnails = await image_workers.run(make_thumbnails, data, settings.avatar_sizes)
+        url = await avatar_storage.save(digest, thumbnails)
+    return await repository_users.update_avatar(email, url, db)
+
+
+def check_image(data: bytes) -> None:
+    """
+    Checks that ``data`` starts like a supported image, without decoding it.
+
+    :param data: The uploaded image.
+    :type data: bytes
+    :raises HTTPException: 400 if ``data`` is not an image.
+    """
+    try:
+        Image.open(io.BytesIO(data)).close()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Not a valid image")
+
+
+async def process_avatar_in_background(email: str, data: bytes) -> None:
+    """
+    Runs :func:`process_avatar` with its own database session, logging failures.
+
+    :param email: The email of the user.
+    :type email: str
+    :param data: The uploaded image.
+    :type data: bytes
+    """
+    try:
+        async with SessionLocal() as db:
+            await process_avatar(email, data, db)
+    except Exception:
+        logger.exception("Failed to update the avatar of %s", email)
+
+
+def storage_from_settings() -> AvatarStorage:
+    if settings.avatar_storage == "local":
+        return LocalStorage(settings.avatar_local_dir, settings.avatar_sizes, upload_workers)
+    if settings.avatar_storage == "cloudinary":
+        return CloudinaryStorage("NotesApp", upload_workers)
+    raise ValueError(f"Unknown avatar storage: {settings.avatar_storage}")
+
+
+image_workers = BoundedExecutor(
+    "avatar-images",
+    max_workers=settings.avatar_workers,
+    kind=settings.avatar_executor,
+)
+upload_workers = BoundedExecutor("avatar-uploads", max_workers=settings.avatar_upload_workers)
+avatar_storage = storage_from_settings()
@@ -0,0 +1,257 @@
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from limits.aio.storage import Storage
+from limits.storage import storage_from_string
+
+from src.web13hm.conf.config import settings
+from src.web13hm.core import limiter_storage  # noqa: F401  registers the async+sqlite:// scheme
+
+
+class TTLCache:
+    """
+    A bounded least-recently-used cache whose entries expire after a time-to-live.
+
+    The cache is meant to be used from a single event loop; none of its
+    operations await, so no locking is needed.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        """
+        :param maxsize: The maximum number of entries kept; the least recently used entry is evicted first.
+        :type maxsize: int
+        :param ttl: The default time-to-live of an entry, in seconds.
+        :type ttl: float
+        :param timer: The clock used to expire entries.
+        :type timer: Callable[[], float]
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns the cached value for ``key`` and marks it as recently used.
+
+        :param key: The cache key.
+        :type key: Hashable
+        :param default: The value returned when the key is missing or expired.
+        :type default: Any
+        :return: The cached value or ``default``.
+        :rtype: Any
+        """
+        entry = self._data.get(key)
+        if entry is None or entry[0] <= self.timer():
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Stores ``value`` under ``key``, evicting the least recently used entry if the cache is full.
+
+        :param key: The cache key.
+        :type key: Hashable
+        :param value: The value to cache.
+        :type value: Any
+        :param ttl: The time-to-live of this entry in seconds; defaults to the cache ttl.
+        :type ttl: Optional[float]
+        :rtype: None
+        """
+        expires_at = self.timer() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Removes ``key`` from the cache if it is present.
+
+        :param key: The cache key.
+        :type key: Hashable
+        :rtype: None
+        """
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Removes all entries and resets the hit/miss counters.
+        """
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        Returns the current size and hit/miss counters of the cache.
+
+        :rtype: dict
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RevocationList:
+    """
+    A set of revoked keys, each remembered only until the tokens it could appear in have expired.
+
+    The keys live in a ``limits.aio`` storage, which expires them on its own.
+    With the SQLite or Redis storage of the rate limiter a key revoked by one
+    worker is revoked in all of them; a lookup is a single key read that does
+    not block the event loop, cheap enough to run on every request.
+    """
+
+    def __init__(self, storage: Storage, prefix: str = "revoked"):
+        """
+        :param storage: Where revoked keys are kept.
+        :type storage: Storage
+        :param prefix: Prepended to every key, keeping them apart from the rate limit counters.
+        :type prefix: str
+        """
+        self.storage = storage
+        self.prefix = prefix
+
+    async def revoke(self, key: str, ttl: float) -> None:
+        """
+        Marks ``key`` as revoked for ``ttl`` seconds; revoking it again does not extend that.
+
+        :param key: The revoked key, e.g. a session ID.
+        :type key: str
+        :param ttl: How long the key stays revoked, in seconds.
+        :type ttl: float
+        :rtype: None
+        """
+        await self.storage.incr(f"{self.prefix}/{key}", math.ceil(ttl))
+
+    async def is_revoked(self, key: str) -> bool:
+        """
+        Tells whether ``key`` is currently revoked.
+
+        :param key: The key to check.
+        :type key: str
+        :rtype: bool
+        """
+        return await self.storage.get(f"{self.prefix}/{key}") > 0
+
+    async def clear(self) -> None:
+        """
+        Forgets all revoked keys, along with anything else kept in the storage.
+        """
+        await self.storage.reset()
+
+
+# Authenticated users keyed by the ``sub`` claim (email) of their access token.
+user_cache = TTLCache(maxsize=settings.user_cache_maxsize, ttl=settings.user_cache_ttl)
+
+# Verified access tokens keyed by their SHA-256 digest, each kept until the token expires at the latest.
+token_cache = TTLCache(maxsize=settings.token_cache_maxsize, ttl=settings.token_cache_ttl)
+
+class RecentWriters:
+    """
+    The writers who changed data within the last ``window`` seconds.
+
+    Like :class:`RevocationList`, the writers live in a ``limits.aio`` storage
+    shared by the workers. Time is cut into slots of ``window`` seconds; a
+    write is recorded in its slot and in the next one, so a single key read
+    tells whether the writer wrote within the last ``window`` to ``2 * window``
+    seconds, and a later write extends that.
+    """
+
+    def __init__(
+        self,
+        storage: Storage,
+        window: float,
+        prefix: str = "recent-writer",
+        timer: Callable[[], float] = time.time,
+    ):
+        """
+        :param storage: Where writers are kept.
+        :type storage: Storage
+        :param window: How long a writer is remembered at least, in seconds.
+        :type window: float
+        :param prefix: Prepended to every key, keeping them apart from the rate limit counters.
+        :type prefix: str
+        :param timer: The wall clock, shared by all workers, that slots are cut from.
+        :type timer: Callable[[], float]
+        """
+        self.storage = storage
+        self.window = window
+        self.prefix = prefix
+        self.timer = timer
+
+    def _key(self, writer: str, slot: int) -> str:
+        return f"{self.prefix}/{slot}/{writer}"
+
+    async def add(self, writer: str) -> None:
+        """
+        Records a write by ``writer``.
+
+        :param writer: The writer, i.e. the user's email.
+        :type writer: str
+        :rtype: None
+        """
+        slot = int(self.timer() // self.window)
+        expiry = math.ceil(2 * self.window)
+        await self.storage.incr(self._key(writer, slot), expiry)
+        await self.storage.incr(self._key(writer, slot + 1), expiry)
+
+    async def contains(self, writer: str) -> bool:
+        """
+        Tells whether ``writer`` wrote recently.
+
+        :param writer: The writer, i.e. the user's email.
+        :type writer: str
+        :rtype: bool
+        """
+        return await self.storage.get(self._key(writer, int(self.timer() // self.window))) > 0
+
+    async def clear(self) -> None:
+        """
+        Forgets all writers, along with anything else kept in the storage.
+        """
+        await self.storage.reset()
+
+
+def shared_storage_from_uri(uri: str) -> Storage:
+    """
+    Returns the ``limits.aio`` storage behind a rate limit storage URI, e.g. ``async+redis://`` for ``redis://``.
+
+    :param uri: The storage URI used by the rate limiter.
+    :type uri: str
+    :rtype: Storage
+    """
+    return storage_from_string(f"async+{uri}", wrap_exceptions=True, implementation="redispy")
+
+
+# State every worker must agree on, kept in the rate limit storage; with SQLite or Redis it is shared.
+shared_storage = shared_storage_from_uri(settings.rate_limit_storage_uri)
+
+# IDs of ended login sessions, kept until their last access token has expired.
+revoked_sessions = RevocationList(shared_storage)
+
+# Emails of users who changed data recently; their reads stay on the primary until the replicas catch up.
+recent_writers = RecentWriters(shared_storage, window=settings.read_your_writes_window)
@@ -1,52 +1,59 @@
+from email.mime.text import MIMEText
+from email.utils import formataddr
 from pathlib import Path
 
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
-from fastapi_mail.errors import ConnectionErrors
+from jinja2 import Environment, FileSystemLoader, select_autoescape
 from pydantic import EmailStr
 
 from src.web13hm.services.auth import auth_service
+from src.web13hm.services.mailer import mailer
+from src.web13hm.services.rendering import SegmentedTemplate
 from src.web13hm.conf.config import settings
 
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.mail_username,
-    MAIL_PASSWORD=settings.mail_password,
-    MAIL_FROM=settings.mail_from,
-    MAIL_PORT=settings.mail_port,
-    MAIL_SERVER=settings.mail_server,
-    MAIL_FROM_NAME="MyApp (test)",
-    MAIL_STARTTLS=True,
-    MAIL_SSL_TLS=False,
-    USE_CREDENTIALS=True,
-    VALIDATE_CERTS=True,
-    TEMPLATE_FOLDER=Path(__file__).parent / "templates",
+TEMPLATE_FOLDER = Path(__file__).parent / "templates"
+MAIL_FROM_NAME = "MyApp (test)"
+
+templates = Environment(
+    loader=FileSystemLoader(TEMPLATE_FOLDER), autoescape=select_autoescape(["html"])
+)
+confirmation_template = SegmentedTemplate(
+    templates.get_template("email_template.html"), fields=("host", "email", "token")
 )
 
 
+def confirmation_message(email: str, host: str, token: str) -> MIMEText:
+    """
+    Builds the confirmation email for ``email``.
+
+    :param email: The recipient's email address.
+    :type email: str
+    :param host: The base host URL to include in the confirmation link.
+    :type host: str
+    :param token: The email verification token.
+    :type token: str
+    :rtype: MIMEText
+    """
+    message = MIMEText(
+        confirmation_template.render(host=host, email=email, token=token), "html", "utf-8"
+    )
+    message["Subject"] = "Confirm your email "
+    message["From"] = formataddr((MAIL_FROM_NAME, settings.mail_from))
+    message["To"] = email
+    return message
+
+
 async def send_email(email: EmailStr, host: str):
     """
-    Send a confirmation email with a verification token.
+    Queue a confirmation email with a verification token for delivery.
+
+    The message is sent in the background by :data:`mailer`; delivery errors
+    are retried and logged there.
 
     :param email: The recipient's email address.
     :type email: EmailStr
     :param host: The base host URL to include in the confirmation link.
     :type host: str
-    :raises ConnectionErrors: If the email service connection fails.
     :rtype: None
     """
-    try:
-        token_verification = await auth_service.create_email_token({"sub": email})
-        message = MessageSchema(
-            subject="Confirm your email ",
-            recipients=[email],
-            template_body={
-                "host": host,
-                "email": email,
-                "token": token_verification,
-            },
-            subtype=MessageType.html,
-        )
-
-        fm = FastMail(conf)
-        await fm.send_message(message, template_name="email_template.html")
-    except ConnectionErrors as err:
-        print(err)
+    token_verification = await auth_service.create_email_token({"sub": email})
+    await mailer.enqueue(confirmation_message(email, str(host), token_verification))
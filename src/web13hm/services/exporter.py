@@ -0,0 +1,81 @@
+import csv
+import io
+import json
+import zlib
+from typing import AsyncIterator, Iterable, Sequence
+
+EXPORT_COLUMNS = ("id", "name", "last_name", "email", "number", "birthday", "extra_data")
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+async def csv_chunks(batches: AsyncIterator[Sequence]) -> AsyncIterator[bytes]:
+    """
+    Renders batches of contact rows as CSV, one chunk per batch, header first.
+
+    :param batches: Batches of rows with the columns in ``EXPORT_COLUMNS``.
+    :type batches: AsyncIterator[Sequence]
+    :rtype: AsyncIterator[bytes]
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EXPORT_COLUMNS)
+    async for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def ndjson_chunks(batches: AsyncIterator[Sequence]) -> AsyncIterator[bytes]:
+    """
+    Renders batches of contact rows as newline-delimited JSON, one chunk per batch.
+
+    :param batches: Batches of rows with the columns in ``EXPORT_COLUMNS``.
+    :type batches: AsyncIterator[Sequence]
+    :rtype: AsyncIterator[bytes]
+    """
+    async for batch in batches:
+        yield "".join(_ndjson_line(row) for row in batch).encode()
+
+
+def _ndjson_line(row: Iterable) -> str:
+    return json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=str) + "\n"
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """
+    Compresses a byte stream into gzip format on the fly.
+
+    :param chunks: The uncompressed stream.
+    :type chunks: AsyncIterator[bytes]
+    :param level: The zlib compression level.
+    :type level: int
+    :rtype: AsyncIterator[bytes]
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Tells whether an ``Accept-Encoding`` header allows a gzip response.
+
+    :param accept_encoding: The header value.
+    :type accept_encoding: str
+    :rtype: bool
+    """
+    for coding in accept_encoding.lower().split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
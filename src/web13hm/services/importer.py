@@ -0,0 +1,222 @@
+import codecs
+import csv
+import json
+from typing import AsyncIterator, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.web13hm.conf.config import settings
+from src.web13hm.database.models import Contacts, User
+from src.web13hm.repository import contacts as repository_contacts
+from src.web13hm.shemas import ContactModel
+
+CSV_COLUMNS = set(ContactModel.model_fields)
+REQUIRED_CSV_COLUMNS = {
+    name for name, field in ContactModel.model_fields.items() if field.is_required()
+}
+# ContactModel does not limit lengths; a value longer than its column would fail the whole chunk's INSERT.
+COLUMN_LENGTHS = {
+    name: Contacts.__table__.c[name].type.length
+    for name in ContactModel.model_fields
+    if getattr(Contacts.__table__.c[name].type, "length", None)
+}
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Decodes a stream of UTF-8 byte chunks into lines without buffering the whole body.
+
+    :param chunks: The request body, e.g. ``request.stream()``.
+    :type chunks: AsyncIterator[bytes]
+    :return: The lines, without line endings.
+    :rtype: AsyncIterator[str]
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+def parse_csv_record(record: str) -> Optional[List[str]]:
+    """
+    Parses one CSV record, which may span several lines joined with ``\n``.
+
+    :return: The fields, or ``None`` if a quoted field is still open and the record continues on the next line.
+    :rtype: Optional[List[str]]
+    """
+    try:
+        return next(csv.reader([record], strict=True), [])
+    except csv.Error as err:
+        if str(err).startswith("unexpected end of data"):
+            return None
+    # Malformed but complete, e.g. text after a closing quote: parse it leniently, as csv does by default.
+    return next(csv.reader([record]), [])
+
+
+async def iter_csv_records(
+    lines: AsyncIterator[str], max_record_lines: int = settings.import_max_record_lines
+) -> AsyncIterator[Tuple[int, object]]:
+    """
+    Parses CSV lines with a header row into ``(row number, record)`` pairs.
+
+    Quoting follows the rules of the ``csv`` module: a quoted field may span
+    several lines, while a quote inside an unquoted value is kept as is. A
+    record still open after ``max_record_lines`` lines, or at the end of the
+    body, is yielded as a ``ValueError`` so it shows up in the per-row report;
+    parsing resumes with the next line.
+
+    :param lines: The lines of the body, see :func:`iter_lines`.
+    :type lines: AsyncIterator[str]
+    :param max_record_lines: The maximum number of lines one record may span.
+    :type max_record_lines: int
+    :raises HTTPException: If the header is missing or lacks required columns.
+    """
+    header = None
+    pending: List[str] = []
+    row = 0
+    async for line in lines:
+        pending.append(line)
+        fields = parse_csv_record("\n".join(pending))
+        if fields is None:
+            if len(pending) < max_record_lines:
+                continue
+            pending = []
+            if header is not None:
+                row += 1
+                yield row, ValueError(f"Unterminated quoted field spanning more than {max_record_lines} lines")
+            continue
+        pending = []
+        if not any(field.strip() for field in fields):
+            continue
+        if header is None:
+            header = [field.strip() for field in fields]
+            missing = REQUIRED_CSV_COLUMNS - set(header)
+            if missing:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"CSV header is missing columns: {', '.join(sorted(missing))}",
+                )
+            continue
+        row += 1
+        yield row, {
+            column: value or None
+            for column, value in zip(header, fields)
+            if column in CSV_COLUMNS
+        }
+    if pending and header is not None:
+        yield row + 1, ValueError("Unterminated quoted field at the end of the file")
+    if header is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="CSV header is missing"
+        )
+
+
+async def iter_ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, object]]:
+    """
+    Parses newline-delimited JSON into ``(row number, record)`` pairs.
+
+    Lines that are not valid JSON are yielded as the decoding error so they
+    show up in the per-row report.
+    """
+    row = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            yield row, json.loads(line)
+        except ValueError as err:
+            yield row, err
+
+
+def validate_records(records: List[Tuple[int, object]]) -> Tuple[List[ContactModel], List[dict]]:
+    """
+    Validates a chunk of parsed records with :class:`ContactModel` and the column lengths of ``contacts``.
+
+    :return: The valid contacts and the errors of the invalid rows.
+    :rtype: Tuple[List[ContactModel], List[dict]]
+    """
+    contacts, errors = [], []
+    for row, record in records:
+        if isinstance(record, ValueError):
+            message = f"Invalid JSON: {record}" if isinstance(record, json.JSONDecodeError) else str(record)
+            errors.append({"row": row, "errors": [{"field": None, "message": message}]})
+            continue
+        try:
+            contact = ContactModel.model_validate(record)
+        except ValidationError as err:
+            errors.append(
+                {
+                    "row": row,
+                    "errors": [
+                        {"field": ".".join(map(str, e["loc"])) or None, "message": e["msg"]}
+                        for e in err.errors()
+                    ],
+                }
+            )
+            continue
+        too_long = [
+            {"field": field, "message": f"String should have at most {length} characters"}
+            for field, length in COLUMN_LENGTHS.items()
+            if len(str(getattr(contact, field) or "")) > length
+        ]
+        if too_long:
+            errors.append({"row": row, "errors": too_long})
+        else:
+            contacts.append(contact)
+    return contacts, errors
+
+
+async def import_contacts(
+    records: AsyncIterator[Tuple[int, object]],
+    db: AsyncSession,
+    current_user: User,
+    chunk_size: int = settings.import_chunk_size,
+    max_errors: int = settings.import_max_errors,
+) -> dict:
+    """
+    Validates and inserts streamed records in chunks, one transaction per chunk.
+
+    A failing row does not affect the other rows of its chunk. At most
+    ``max_errors`` row errors are reported; ``failed`` counts all of them.
+
+    :param records: ``(row number, record)`` pairs, see :func:`iter_csv_records` and :func:`iter_ndjson_records`.
+    :type records: AsyncIterator[Tuple[int, object]]
+    :param db: The database session.
+    :type db: AsyncSession
+    :param current_user: The user who owns the imported contacts.
+    :type current_user: User
+    :param chunk_size: The number of rows validated and inserted per transaction.
+    :type chunk_size: int
+    :param max_errors: The maximum number of row errors included in the report.
+    :type max_errors: int
+    :return: The number of imported and failed rows and the row errors.
+    :rtype: dict
+    """
+    report = {"imported": 0, "failed": 0, "errors": []}
+
+    async def flush(chunk):
+        contacts, errors = validate_records(chunk)
+        if contacts:
+            await repository_contacts.create_contacts_bulk(contacts, db, current_user)
+        report["imported"] += len(contacts)
+        report["failed"] += len(errors)
+        report["errors"].extend(errors[: max_errors - len(report["errors"])])
+
+    chunk = []
+    async for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            await flush(chunk)
+            chunk = []
+    if chunk:
+        await flush(chunk)
+    return report
@@ -0,0 +1,105 @@
+from pathlib import Path
+from typing import Optional
+
+from cryptography.hazmat.primitives import serialization
+from jose import jwk
+
+from src.web13hm.conf.config import settings
+
+ASYMMETRIC_ALGORITHMS = ("RS256", "RS384", "RS512", "ES256", "ES384", "ES512")
+
+
+def read_pem(value: str) -> str:
+    """
+    Returns a PEM key given either inline or as the path of a file holding it.
+
+    :param value: The PEM text or a file path.
+    :type value: str
+    :rtype: str
+    """
+    if value.lstrip().startswith("-----BEGIN"):
+        return value
+    return Path(value).read_text()
+
+
+class SigningKeys:
+    """
+    The keys JWTs are signed and verified with.
+
+    HMAC algorithms use the shared secret for both. Asymmetric algorithms sign
+    with the private key and verify with the public key, which is published
+    as a JWKS so other services can verify tokens without calling this one.
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        secret: str,
+        private_key: Optional[str] = None,
+        public_key: Optional[str] = None,
+        key_id: Optional[str] = None,
+    ):
+        """
+        :param algorithm: The JWS algorithm, e.g. ``HS256``, ``RS256`` or ``ES256``.
+        :type algorithm: str
+        :param secret: The shared secret of HMAC algorithms.
+        :type secret: str
+        :param private_key: The PEM private key of asymmetric algorithms, inline or as a file path.
+        :type private_key: Optional[str]
+        :param public_key: The PEM public key; derived from the private key when omitted.
+        :type public_key: Optional[str]
+        :param key_id: The ``kid`` put in token headers and in the JWKS.
+        :type key_id: Optional[str]
+        :raises ValueError: If an asymmetric algorithm has no private key, or the algorithm is not supported.
+        """
+        self.algorithm = algorithm
+        self.key_id = key_id
+        if algorithm.startswith("HS"):
+            self.signing_key = self.verification_key = secret
+            self.public_key = None
+            return
+        if algorithm not in ASYMMETRIC_ALGORITHMS:
+            raise ValueError(f"Unsupported JWT algorithm: {algorithm}")
+        if not private_key:
+            raise ValueError(f"{algorithm} needs a private key")
+        self.signing_key = read_pem(private_key)
+        if public_key:
+            self.public_key = read_pem(public_key)
+        else:
+            loaded = serialization.load_pem_private_key(self.signing_key.encode(), password=None)
+            self.public_key = loaded.public_key().public_bytes(
+                serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+            ).decode()
+        self.verification_key = self.public_key
+
+    @property
+    def headers(self) -> Optional[dict]:
+        """
+        The extra JWT headers of issued tokens.
+        """
+        if self.public_key is None or self.key_id is None:
+            return None
+        return {"kid": self.key_id}
+
+    def jwks(self) -> dict:
+        """
+        Returns the JSON Web Key Set of the public verification key; empty for HMAC algorithms.
+
+        :rtype: dict
+        """
+        if self.public_key is None:
+            return {"keys": []}
+        key = jwk.construct(self.public_key, self.algorithm).to_dict()
+        key["use"] = "sig"
+        if self.key_id is not None:
+            key["kid"] = self.key_id
+        return {"keys": [key]}
+
+
+signing_keys = SigningKeys(
+    settings.algorithm,
+    settings.secret_key,
+    private_key=settings.jwt_private_key,
+    public_key=settings.jwt_public_key,
+    key_id=settings.jwt_key_id,
+)
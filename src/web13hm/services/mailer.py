@@ -0,0 +1,269 @@
+import asyncio
+import logging
+import time
+from email.message import Message
+from typing import List, Optional
+
+import aiosmtplib
+
+from src.web13hm.conf.config import settings
+from src.web13hm.core.metrics import EMAIL_SECONDS, EMAILS_FAILED, EMAILS_RETRIED, EMAILS_SENT
+
+logger = logging.getLogger(__name__)
+
+TRANSIENT_ERRORS = (
+    aiosmtplib.SMTPServerDisconnected,
+    aiosmtplib.SMTPConnectError,
+    aiosmtplib.SMTPTimeoutError,
+    asyncio.TimeoutError,
+    OSError,
+)
+
+
+def is_transient(error: Exception) -> bool:
+    """
+    Tells whether a failed delivery is worth retrying.
+
+    Connection problems and 4xx replies are transient; anything else, such as
+    a 5xx reply or a refused recipient, is permanent.
+
+    :param error: The error raised while sending.
+    :type error: Exception
+    :rtype: bool
+    """
+    if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        return all(400 <= refused.code < 500 for refused in error.recipients)
+    if isinstance(error, aiosmtplib.SMTPResponseException):
+        return 400 <= error.code < 500
+    return isinstance(error, TRANSIENT_ERRORS)
+
+
+class Mailer:
+    """
+    Delivers emails in the background over a pool of persistent SMTP connections.
+
+    Messages go into a bounded asyncio queue, so a burst of signups costs the
+    request only an enqueue and applies backpressure once the queue is full.
+    Each of ``connections`` workers owns one long-lived connection, takes up
+    to ``batch_size`` queued messages at a time and sends them over it,
+    reconnecting and retrying with exponential backoff on transient errors.
+    Workers are started lazily by the first :meth:`enqueue`.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        sender: str,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        start_tls: Optional[bool] = None,
+        use_tls: bool = False,
+        validate_certs: bool = True,
+        connections: int = 2,
+        queue_size: int = 1000,
+        batch_size: int = 50,
+        max_retries: int = 3,
+        retry_backoff: float = 1.0,
+        timeout: float = 30,
+    ):
+        """
+        :param hostname: The SMTP server host.
+        :type hostname: str
+        :param port: The SMTP server port.
+        :type port: int
+        :param sender: The default ``From`` address.
+        :type sender: str
+        :param username: The login; no authentication when ``None``.
+        :type username: Optional[str]
+        :param password: The password.
+        :type password: Optional[str]
+        :param start_tls: Whether to upgrade with STARTTLS; ``None`` upgrades when the server offers it.
+        :type start_tls: Optional[bool]
+        :param use_tls: Whether to connect over implicit TLS.
+        :type use_tls: bool
+        :param validate_certs: Whether to validate the server certificate.
+        :type validate_certs: bool
+        :param connections: The number of workers, each with its own connection.
+        :type connections: int
+        :param queue_size: The maximum number of messages waiting for delivery.
+        :type queue_size: int
+        :param batch_size: The maximum number of messages a worker sends per batch.
+        :type batch_size: int
+        :param max_retries: How many times a transient failure is retried.
+        :type max_retries: int
+        :param retry_backoff: The delay before the first retry, doubled on each further one, in seconds.
+        :type retry_backoff: float
+        :param timeout: The SMTP command timeout, in seconds.
+        :type timeout: float
+        """
+        self.hostname = hostname
+        self.port = port
+        self.sender = sender
+        self.username = username
+        self.password = password
+        self.start_tls = start_tls
+        self.use_tls = use_tls
+        self.validate_certs = validate_certs
+        self.connections = connections
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.timeout = timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self.enqueued = 0
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.connects = 0
+        self.batches = 0
+        self.send_time = 0.0
+
+    def _start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [
+            asyncio.create_task(self._work(), name=f"mailer-{i}") for i in range(self.connections)
+        ]
+
+    async def enqueue(self, message: Message) -> None:
+        """
+        Queues a message for delivery, waiting while the queue is full.
+
+        :param message: The message; ``From`` defaults to the configured sender.
+        :type message: Message
+        """
+        if self._queue is None:
+            self._start()
+        if message["From"] is None:
+            message["From"] = self.sender
+        await self._queue.put(message)
+        self.enqueued += 1
+
+    async def join(self) -> None:
+        """
+        Waits until every queued message has been delivered or given up on.
+        """
+        if self._queue is not None:
+            await self._queue.join()
+
+    def _connection(self) -> aiosmtplib.SMTP:
+        return aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            start_tls=self.start_tls,
+            use_tls=self.use_tls,
+            validate_certs=self.validate_certs,
+            timeout=self.timeout,
+        )
+
+    async def _take_batch(self) -> List[Message]:
+        batch = [await self._queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _work(self) -> None:
+        smtp = self._connection()
+        try:
+            while True:
+                batch = await self._take_batch()
+                self.batches += 1
+                for message in batch:
+                    try:
+                        await self._deliver(smtp, message)
+                    finally:
+                        self._queue.task_done()
+        finally:
+            if smtp.is_connected:
+                try:
+                    await smtp.quit()
+                except aiosmtplib.SMTPException:
+                    smtp.close()
+
+    async def _deliver(self, smtp: aiosmtplib.SMTP, message: Message) -> None:
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                if not smtp.is_connected:
+                    await smtp.connect()
+                    self.connects += 1
+                await smtp.send_message(message)
+            except Exception as error:
+                if isinstance(error, (aiosmtplib.SMTPServerDisconnected, OSError)):
+                    smtp.close()
+                if not is_transient(error) or attempt == self.max_retries:
+                    self.failed += 1
+                    EMAILS_FAILED.inc()
+                    logger.error("Failed to deliver email to %s: %s", message["To"], error)
+                    return
+                self.retried += 1
+                EMAILS_RETRIED.inc()
+                await asyncio.sleep(self.retry_backoff * 2**attempt)
+            else:
+                elapsed = time.perf_counter() - started
+                self.sent += 1
+                self.send_time += elapsed
+                EMAILS_SENT.inc()
+                EMAIL_SECONDS.observe(elapsed)
+                return
+
+    def stats(self) -> dict:
+        """
+        Returns delivery metrics of the mailer.
+
+        :rtype: dict
+        """
+        return {
+            "connections": self.connections,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "connects": self.connects,
+            "batches": self.batches,
+            "avg_send_ms": self.send_time / self.sent * 1000 if self.sent else 0.0,
+        }
+
+    async def stop(self, timeout: Optional[float] = 10) -> None:
+        """
+        Waits up to ``timeout`` seconds for queued messages, then stops the workers and closes their connections.
+
+        :param timeout: How long to wait for the queue to drain, in seconds.
+        :type timeout: Optional[float]
+        """
+        if self._queue is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Dropping %d undelivered emails", self._queue.qsize())
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+
+mailer = Mailer(
+    hostname=settings.mail_server,
+    port=settings.mail_port,
+    sender=settings.mail_from,
+    username=settings.mail_username or None,
+    password=settings.mail_password or None,
+    start_tls=settings.mail_starttls,
+    use_tls=settings.mail_ssl_tls,
+    validate_certs=settings.mail_validate_certs,
+    connections=settings.mail_connections,
+    queue_size=settings.mail_queue_size,
+    batch_size=settings.mail_batch_size,
+    max_retries=settings.mail_max_retries,
+    retry_backoff=settings.mail_retry_backoff,
+)
@@ -0,0 +1,51 @@
+import base64
+import binascii
+import json
+from typing import Any, List
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Encodes the sort key of the last row of a page into an opaque cursor.
+
+    :param values: The JSON-serializable sort key values, e.g. ``(id,)``.
+    :type values: Any
+    :return: A URL-safe cursor string.
+    :rtype: str
+    """
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, size: int) -> List[int]:
+    """
+    Decodes a cursor produced by :func:`encode_cursor`.
+
+    Every sort key is made of integers, so any other value is rejected before
+    it can reach a query.
+
+    :param cursor: The cursor received from the client.
+    :type cursor: str
+    :param size: The number of values the sort key must have.
+    :type size: int
+    :raises HTTPException: If the cursor is malformed or holds anything but integers.
+    :return: The sort key values.
+    :rtype: List[int]
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        values = None
+    if (
+        not isinstance(values, list)
+        or len(values) != size
+        # bool is a subclass of int, but never a valid key.
+        or not all(type(value) is int for value in values)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+    return values
@@ -0,0 +1,67 @@
+import re
+import uuid
+from typing import List, Optional, Sequence
+
+from jinja2 import Template
+from markupsafe import escape
+
+
+class SegmentedTemplate:
+    """
+    Renders a Jinja template by splicing values between its cached static parts.
+
+    The template is rendered once with a unique marker for each field, and
+    the output is split on those markers. Rendering then only escapes the
+    values and joins them with the static segments, skipping Jinja entirely.
+    Templates that transform a field (filters, conditionals, loops over it)
+    cannot be split; they fall back to a regular render.
+    """
+
+    def __init__(self, template: Template, fields: Sequence[str], autoescape: bool = True):
+        """
+        :param template: The compiled template.
+        :type template: Template
+        :param fields: The names of the variables substituted per render.
+        :type fields: Sequence[str]
+        :param autoescape: Whether values are HTML-escaped, as the template environment would.
+        :type autoescape: bool
+        """
+        self.template = template
+        self.fields = tuple(fields)
+        self.autoescape = autoescape
+        self.segments: Optional[List[str]] = None
+        self.order: List[str] = []
+        self._split()
+
+    def _split(self) -> None:
+        nonce = uuid.uuid4().hex
+        markers = {field: f"\x00{nonce}:{field}\x00" for field in self.fields}
+        rendered = self.template.render(**markers)
+        pattern = re.compile("\x00" + nonce + r":(\w+)\x00")
+        parts = pattern.split(rendered)
+        segments, order = parts[0::2], parts[1::2]
+        if set(order) != set(self.fields):
+            return
+        self.segments = segments
+        self.order = order
+
+    def render(self, **values: str) -> str:
+        """
+        Renders the template with ``values`` for its fields.
+
+        :return: The rendered text.
+        :rtype: str
+        """
+        if self.segments is None:
+            return self.template.render(**values)
+        convert = (lambda value: str(escape(value))) if self.autoescape else str
+        values = {name: convert(value) for name, value in values.items()}
+        parts = [self.segments[0]]
+        for field, segment in zip(self.order, self.segments[1:]):
+            parts.append(values[field])
+            parts.append(segment)
+        return "".join(parts)
+
+    @property
+    def is_split(self) -> bool:
+        return self.segments is not None
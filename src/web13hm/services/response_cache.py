@@ -0,0 +1,144 @@
+import hashlib
+from typing import Awaitable, Callable, Dict, Hashable, NamedTuple, Optional, Tuple, Type
+
+from fastapi import Request, Response, status
+from limits.aio.storage import Storage
+
+from src.web13hm.conf.config import settings
+from src.web13hm.services.cache import TTLCache, shared_storage
+
+# Clients may keep responses but must revalidate them with ``If-None-Match``.
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+# A version counter that expired and started over could reach a version some
+# worker still has cached, so counters are kept for as long as users are.
+VERSION_TTL = 10 * 365 * 24 * 3600
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+    headers: Dict[str, str]
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Tells whether an ``If-None-Match`` header matches ``etag``, using the weak comparison of RFC 9110.
+
+    :param if_none_match: The header value, if the request has one.
+    :type if_none_match: Optional[str]
+    :param etag: The current entity tag, quoted.
+    :type etag: str
+    :rtype: bool
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class ResponseCache:
+    """
+    Serialized read responses per user, invalidated by a per-user version counter.
+
+    Every write to a user's contacts calls :meth:`bump`, so entries stored
+    under an older version are never served again; they age out of the
+    underlying :class:`TTLCache`. Entries are local to the process, but the
+    versions live in a ``limits.aio`` storage: with the SQLite or Redis storage
+    of the rate limiter a write in one worker invalidates the entries of all
+    of them, and looking a version up does not block the event loop.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, versions: Storage, prefix: str = "response-version"):
+        """
+        :param maxsize: The maximum number of cached responses.
+        :type maxsize: int
+        :param ttl: How long a response is kept, in seconds.
+        :type ttl: float
+        :param versions: Where the per-user versions are kept.
+        :type versions: Storage
+        :param prefix: Prepended to every version key, keeping them apart from other keys in the storage.
+        :type prefix: str
+        """
+        self.entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.versions = versions
+        self.prefix = prefix
+
+    async def version(self, user_id: int) -> int:
+        """
+        Returns the current version of a user's data.
+
+        :param user_id: The ID of the user.
+        :type user_id: int
+        :rtype: int
+        """
+        return await self.versions.get(f"{self.prefix}/{user_id}")
+
+    async def bump(self, user_id: int) -> None:
+        """
+        Invalidates every cached response of a user.
+
+        :param user_id: The ID of the user whose data changed.
+        :type user_id: int
+        """
+        await self.versions.incr(f"{self.prefix}/{user_id}", VERSION_TTL)
+
+    def get(self, user_id: int, version: int, key: Hashable) -> Optional[CachedResponse]:
+        return self.entries.get((user_id, version, key))
+
+    def set(
+        self, user_id: int, version: int, key: Hashable, body: bytes, headers: Dict[str, str]
+    ) -> CachedResponse:
+        etag = '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+        entry = CachedResponse(body, etag, headers)
+        self.entries.set((user_id, version, key), entry)
+        return entry
+
+    def clear(self) -> None:
+        """
+        Drops all cached responses; the versions are kept.
+        """
+        self.entries.clear()
+
+
+async def cached_json(
+    request: Request,
+    user_id: int,
+    build: Callable[[], Awaitable[Tuple[object, Dict[str, str]]]],
+    response_class: Type[Response],
+    key: Hashable = None,
+) -> Response:
+    """
+    Serves a JSON read endpoint from :data:`response_cache`, answering ``304 Not Modified`` to a matching ``If-None-Match``.
+
+    The response is cached under the request path and query string, plus ``key``.
+
+    :param request: The request.
+    :type request: Request
+    :param user_id: The ID of the user whose data the response shows.
+    :type user_id: int
+    :param build: Queries the content on a cache miss; returns it with the headers to send along.
+    :type build: Callable[[], Awaitable[Tuple[object, Dict[str, str]]]]
+    :param response_class: Renders the content on a cache miss; it must send ``bytes`` content unchanged.
+    :type response_class: Type[Response]
+    :param key: Anything else the response depends on, such as the current date.
+    :type key: Hashable
+    :rtype: Response
+    """
+    cache_key = (request.url.path, request.url.query, key)
+    # Read before querying: a write racing with the query bumps past this version.
+    version = await response_cache.version(user_id)
+    entry = response_cache.get(user_id, version, cache_key)
+    if entry is None:
+        content, headers = await build()
+        body = response_class(content).body
+        entry = response_cache.set(user_id, version, cache_key, body, headers)
+    headers = {**entry.headers, "ETag": entry.etag, "Cache-Control": REVALIDATE_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return response_class(entry.body, headers=headers)
+
+
+response_cache = ResponseCache(
+    maxsize=settings.response_cache_maxsize, ttl=settings.response_cache_ttl, versions=shared_storage
+)
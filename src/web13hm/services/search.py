@@ -0,0 +1,81 @@
+import re
+import sys
+from typing import Iterable, List, Optional, Set
+
+# Longer terms are truncated; a prefix longer than this cannot be told apart anyway.
+TERM_LENGTH = 64
+MAX_QUERY_TOKENS = 5
+# The contact fields indexed by search_term_rows.
+SEARCHABLE_FIELDS = frozenset({"name", "last_name", "email"})
+
+_SEPARATORS = re.compile(r"[^\w]+")
+
+
+def search_terms(*values: Optional[str]) -> Set[str]:
+    """
+    Returns the terms under which a contact is indexed for prefix search.
+
+    Each value is indexed as a whole and split into words, so
+    ``"jo@x.com"`` is found by ``"jo@x"`` as well as by ``"x"``.
+
+    :param values: The searchable fields, e.g. name, last name and email.
+    :type values: Optional[str]
+    :return: The lower-cased terms.
+    :rtype: Set[str]
+    """
+    terms = set()
+    for value in values:
+        if not value:
+            continue
+        value = value.lower().strip()
+        terms.add(value[:TERM_LENGTH])
+        terms.update(word[:TERM_LENGTH] for word in _SEPARATORS.split(value) if word)
+    terms.discard("")
+    return terms
+
+
+def query_tokens(query: str) -> List[str]:
+    """
+    Splits a search query into the prefixes that must all match.
+
+    :param query: The text typed by the user.
+    :type query: str
+    :return: Up to ``MAX_QUERY_TOKENS`` distinct lower-cased prefixes.
+    :rtype: List[str]
+    """
+    tokens = dict.fromkeys(token[:TERM_LENGTH] for token in query.lower().split())
+    return list(tokens)[:MAX_QUERY_TOKENS]
+
+
+def prefix_upper_bound(prefix: str) -> Optional[str]:
+    """
+    Returns the smallest string greater than every string starting with ``prefix``.
+
+    ``prefix <= term < prefix_upper_bound(prefix)`` is an index-friendly way
+    to write ``term LIKE 'prefix%'``. Trailing maximal code points
+    (U+10FFFF) cannot be incremented, so they are dropped first.
+
+    :param prefix: A non-empty prefix.
+    :type prefix: str
+    :return: The bound, or ``None`` if the prefix is only maximal code points and every greater string matches.
+    :rtype: Optional[str]
+    """
+    prefix = prefix.rstrip(chr(sys.maxunicode))
+    if not prefix:
+        return None
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def search_term_rows(contacts: Iterable) -> List[dict]:
+    """
+    Builds the ``contact_search_terms`` rows of the given contacts.
+
+    :param contacts: Objects with ``id``, ``user_id``, ``name``, ``last_name`` and ``email``.
+    :type contacts: Iterable
+    :rtype: List[dict]
+    """
+    return [
+        {"contact_id": contact.id, "user_id": contact.user_id, "term": term}
+        for contact in contacts
+        for term in search_terms(contact.name, contact.last_name, contact.email)
+    ]
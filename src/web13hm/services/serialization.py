@@ -0,0 +1,48 @@
+from typing import Iterable, List, Sequence
+
+import orjson
+from fastapi.responses import JSONResponse
+
+from src.web13hm.database.models import Contacts
+from src.web13hm.shemas import ResponseContactModel
+
+# The fields of a contact in API responses, in column order.
+CONTACT_FIELDS = tuple(ResponseContactModel.model_fields)
+
+
+def contact_columns() -> List:
+    """
+    Returns the columns selected for :data:`CONTACT_FIELDS`.
+
+    :rtype: List
+    """
+    return [getattr(Contacts, field) for field in CONTACT_FIELDS]
+
+
+def dump_rows(rows: Iterable[Sequence], fields: Sequence[str] = CONTACT_FIELDS) -> bytes:
+    """
+    Serializes rows to a JSON array of objects keyed by ``fields``.
+
+    Columns past ``fields`` are left out, so rows may carry extra columns
+    needed for e.g. pagination cursors.
+
+    :param rows: The selected rows, with their first columns matching ``fields``.
+    :type rows: Iterable[Sequence]
+    :param fields: The names of the serialized columns.
+    :type fields: Sequence[str]
+    :rtype: bytes
+    """
+    return orjson.dumps([dict(zip(fields, row)) for row in rows])
+
+
+class ContactRowsResponse(JSONResponse):
+    """
+    A JSON response rendered by orjson straight from contact rows (see :func:`dump_rows`), skipping model validation and ``jsonable_encoder``.
+
+    Already serialized ``bytes`` are sent as they are.
+    """
+
+    def render(self, content) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dump_rows(content)
@@ -0,0 +1,28 @@
+import asyncio
+import logging
+
+from src.web13hm.database.db import SessionLocal
+from src.web13hm.repository import sessions as repository_sessions
+
+logger = logging.getLogger(__name__)
+
+
+async def cleanup_sessions(interval: float, batch_size: int) -> None:
+    """
+    Every ``interval`` seconds, deletes expired login sessions, until cancelled.
+
+    :param interval: The pause between two cleanups, in seconds.
+    :type interval: float
+    :param batch_size: The maximum number of sessions deleted per transaction.
+    :type batch_size: int
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with SessionLocal() as db:
+                deleted = await repository_sessions.delete_expired_sessions(db, batch_size)
+        except Exception:
+            logger.exception("Failed to delete expired sessions")
+        else:
+            if deleted:
+                logger.info("Deleted %d expired sessions", deleted)
@@ -0,0 +1,145 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from src.web13hm.conf.config import settings
+
+
+class BoundedExecutor:
+    """
+    Runs blocking callables on a thread or process pool without blocking the event loop.
+
+    At most ``max_concurrency`` calls are submitted to the pool at a time; the
+    rest wait in an asyncio queue so a burst cannot pile up unbounded work in
+    the pool. The pool itself is created lazily on first use.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int,
+        max_concurrency: Optional[int] = None,
+        kind: str = "thread",
+    ):
+        """
+        :param name: The name used for worker threads and in metrics.
+        :type name: str
+        :param max_workers: The number of pool workers.
+        :type max_workers: int
+        :param max_concurrency: The maximum number of calls submitted to the pool at once; defaults to ``max_workers``.
+        :type max_concurrency: Optional[int]
+        :param kind: ``"thread"`` or ``"process"``.
+        :type kind: str
+        """
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency or max_workers
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.queued = 0
+        self.running = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.run_time = 0.0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=self.name
+                )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Runs ``func(*args, **kwargs)`` on the pool and returns its result.
+
+        For a process pool ``func`` and its arguments must be picklable.
+
+        :param func: The blocking callable.
+        :type func: Callable
+        :return: The value returned by ``func``.
+        :rtype: Any
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        loop = asyncio.get_running_loop()
+        self.submitted += 1
+        self.queued += 1
+        enqueued_at = time.perf_counter()
+        acquired = False
+        try:
+            async with self._semaphore:
+                acquired = True
+                started_at = time.perf_counter()
+                waited = started_at - enqueued_at
+                self.queued -= 1
+                self.wait_time += waited
+                self.max_wait_time = max(self.max_wait_time, waited)
+                self.running += 1
+                try:
+                    result = await loop.run_in_executor(
+                        self.executor, partial(func, *args, **kwargs)
+                    )
+                except Exception:
+                    self.failed += 1
+                    raise
+                finally:
+                    self.running -= 1
+                    self.run_time += time.perf_counter() - started_at
+        finally:
+            if not acquired:
+                # Cancelled while waiting for a slot.
+                self.queued -= 1
+        self.completed += 1
+        return result
+
+    def stats(self) -> dict:
+        """
+        Returns queueing and timing metrics of the pool.
+
+        :rtype: dict
+        """
+        finished = self.completed + self.failed
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_concurrency": self.max_concurrency,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "queued": self.queued,
+            "running": self.running,
+            "avg_wait_ms": self.wait_time / finished * 1000 if finished else 0.0,
+            "max_wait_ms": self.max_wait_time * 1000,
+            "avg_run_ms": self.run_time / finished * 1000 if finished else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        """
+        Shuts the pool down; it is recreated on the next call to :meth:`run`.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._semaphore = None
+
+
+password_hasher = BoundedExecutor(
+    "password-hasher",
+    max_workers=settings.password_hash_workers,
+    max_concurrency=settings.password_hash_concurrency,
+    kind=settings.password_hash_executor,
+)
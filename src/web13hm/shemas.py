@@ -1,4 +1,6 @@
-from pydantic import BaseModel, EmailStr, ConfigDict
+from typing import List, Literal
+
+from pydantic import BaseModel, EmailStr, ConfigDict, Field, field_validator, model_validator
 from datetime import date, datetime
 
 
@@ -45,3 +47,51 @@ class TokenModel(BaseModel):
 
 class RequestEmail(BaseModel):
     email: EmailStr
+
+
+# The most contacts a single batch request may change.
+BATCH_MAX_IDS = 1000
+
+
+class ContactPatchModel(BaseModel):
+    """
+    A partial contact update: only the fields that are sent are changed.
+    """
+    name: str | None = None
+    last_name: str | None = None
+    email: EmailStr | None = None
+    number: str | None = None
+    birthday: date | None = None
+    extra_data: str | None = None
+
+    @field_validator("name", "last_name", "email", "number", "birthday")
+    @classmethod
+    def _not_null(cls, value):
+        if value is None:
+            raise ValueError("Field may be omitted but not null")
+        return value
+
+
+class BatchUpdateModel(BaseModel):
+    ids: List[int] = Field(min_length=1, max_length=BATCH_MAX_IDS)
+    changes: ContactPatchModel
+
+    @model_validator(mode="after")
+    def _has_changes(self):
+        if not self.changes.model_fields_set:
+            raise ValueError("No changes given")
+        return self
+
+
+class BatchDeleteModel(BaseModel):
+    ids: List[int] = Field(min_length=1, max_length=BATCH_MAX_IDS)
+
+
+class BatchItemResult(BaseModel):
+    id: int
+    status: Literal["updated", "deleted", "not_found"]
+
+
+class BatchResultModel(BaseModel):
+    count: int
+    results: List[BatchItemResult]
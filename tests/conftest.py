@@ -1,18 +1,43 @@
+import asyncio
+import os
+
+# Fail any test whose requests exceed their route's query budget.
+os.environ.setdefault("SQL_AUDIT_ENABLED", "true")
+os.environ.setdefault("SQL_AUDIT_STRICT", "true")
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 from main import app
-from src.web13hm.database.models import Base
-from src.web13hm.database.db import get_db
+from src.web13hm.core.config import limiter
+from src.web13hm.core.metrics import instrument_engine
+from src.web13hm.core.sql_audit import sql_auditor
+from src.web13hm.database.models import Base, User
+from src.web13hm.database.db import get_db, async_database_url
 from src.web13hm.conf.config import Settings
+from src.web13hm.services.auth import auth_service
+from src.web13hm.services.response_cache import response_cache
 settings = Settings()
 
 engine = create_engine(settings.sqlalchemy_database_url)
 
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# The application runs on the TestClient's own event loop, so its connections
+# must not be pooled across loops.
+async_engine = create_async_engine(
+    async_database_url(settings.sqlalchemy_database_url), poolclass=NullPool
+)
+AsyncTestingSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+instrument_engine(async_engine.sync_engine)
+sql_auditor.instrument(async_engine.sync_engine)
+
 
 @pytest.fixture(scope="session", autouse=True)
 def prepare_database():
@@ -32,15 +57,16 @@ def session():
 
 
 @pytest.fixture()
-def client(session):
+def client():
 
-    def override_get_db():
-        try:
-            yield session
-        finally:
-            pass 
+    async def override_get_db():
+        async with AsyncTestingSessionLocal() as db:
+            yield db
 
     app.dependency_overrides[get_db] = override_get_db
+    limiter.reset()
+    # Tests change contacts behind the repository's back.
+    response_cache.clear()
 
     with TestClient(app) as c:
         yield c
@@ -54,3 +80,21 @@ def user():
         "username": "deadpool@example.com",
         "password": "123456789",
     }
+
+
+@pytest.fixture()
+def token(session):
+    """
+    Returns an access token of a confirmed user that owns no data from other tests.
+    """
+    email = "contacts@example.com"
+    if session.query(User).filter(User.email == email).first() is None:
+        session.add(
+            User(
+                email=email,
+                password=auth_service.get_password_hash("123456789"),
+                confirmed=True,
+            )
+        )
+        session.commit()
+    return asyncio.run(auth_service.create_access_token(data={"sub": email}))
@@ -0,0 +1,28 @@
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def alembic_config(url):
+    config = Config(str(BASE_DIR / "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", url)
+    return config
+
+
+def test_migrations_match_models(tmp_path):
+    config = alembic_config(f"sqlite:///{tmp_path / 'migrations.db'}")
+
+    command.upgrade(config, "head")
+
+    # Raises if the migrated schema differs from the models.
+    command.check(config)
+
+
+def test_migrations_downgrade(tmp_path):
+    config = alembic_config(f"sqlite:///{tmp_path / 'migrations.db'}")
+
+    command.upgrade(config, "head")
+    command.downgrade(config, "base")
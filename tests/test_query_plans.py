@@ -0,0 +1,148 @@
+"""
+Asserts that every repository query is served by an index.
+
+The plans are taken with SQLite's ``EXPLAIN QUERY PLAN``; on other databases
+these tests are skipped.
+"""
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from src.web13hm.database.models import User
+from src.web13hm.repository import contacts as repository_contacts
+from src.web13hm.repository import sessions as repository_sessions
+from src.web13hm.repository import users as repository_users
+from src.web13hm.services.pagination import encode_cursor
+from tests.conftest import AsyncTestingSessionLocal, async_engine
+
+pytestmark = pytest.mark.skipif(
+    async_engine.dialect.name != "sqlite", reason="query plans are SQLite specific"
+)
+
+
+async def query_plans(call, kinds=("SELECT",)):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(kinds):
+            statements.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with AsyncTestingSessionLocal() as db:
+            await call(db)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+
+    plans = []
+    async with async_engine.connect() as conn:
+        for statement, parameters in statements:
+            rows = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plans.append((statement, [row[-1] for row in rows]))
+    assert plans, "no query was executed"
+    return plans
+
+
+def assert_uses_index(plans):
+    for statement, plan in plans:
+        for step in plan:
+            # Scanning a materialized subquery (anon_N) is not a table scan.
+            if step.startswith(("SCAN", "SEARCH")) and not step.split()[1].startswith("anon_"):
+                assert "USING" in step, f"full table scan: {step}\n{statement}"
+
+
+USER = User(id=1, email="plan@example.com")
+
+
+@pytest.mark.parametrize(
+    "call",
+    [
+        lambda db: repository_contacts.get_Contacts(skip=0, limit=10, user=USER, db=db),
+        lambda db: repository_contacts.get_Contacts(
+            skip=0, limit=10, user=USER, db=db, cursor=encode_cursor(10)
+        ),
+        lambda db: repository_contacts.birthday_by_7_day(
+            skip=0, limit=10, db=db, current_user=USER, today=date(2025, 6, 1)
+        ),
+        lambda db: repository_contacts.birthday_by_7_day(
+            skip=5, limit=10, db=db, current_user=USER, today=date(2025, 12, 29)
+        ),
+        lambda db: repository_contacts.birthday_by_7_day(
+            skip=0,
+            limit=10,
+            db=db,
+            current_user=USER,
+            cursor=encode_cursor(1230, 10),
+            today=date(2025, 12, 29),
+        ),
+        lambda db: repository_users.get_user_by_email(USER.email, db),
+        lambda db: repository_contacts.search_contacts(
+            query="jo sm", skip=0, limit=10, user=USER, db=db
+        ),
+    ],
+    ids=[
+        "get_Contacts",
+        "get_Contacts_cursor",
+        "birthday",
+        "birthday_wrapping",
+        "birthday_cursor",
+        "get_user_by_email",
+        "search_contacts",
+    ],
+)
+async def test_repository_queries_use_indexes(call):
+    assert_uses_index(await query_plans(call))
+
+
+async def not_found(call):
+    # The tables are empty, so lookups end in a 404 -- after their query ran.
+    with pytest.raises(HTTPException):
+        await call
+
+
+@pytest.mark.parametrize("data", ["John", "john@example.com", "12"])
+async def test_get_contacts_by_uses_indexes(data):
+    plans = await query_plans(
+        lambda db: not_found(
+            repository_contacts.get_Contacts_by(Contacts_data=data, user=USER, db=db)
+        )
+    )
+    assert_uses_index(plans)
+
+
+async def test_delete_contact_lookup_uses_index():
+    plans = await query_plans(
+        lambda db: not_found(
+            repository_contacts.delete_contact(contact_id=1, db=db, current_user=USER)
+        )
+    )
+    assert_uses_index(plans)
+
+
+async def test_update_contact_lookup_uses_index():
+    plans = await query_plans(
+        lambda db: not_found(
+            repository_contacts.update_contact(
+                contact_id=1, body=None, db=db, current_user=USER
+            )
+        )
+    )
+    assert_uses_index(plans)
+
+
+@pytest.mark.parametrize(
+    "call",
+    [
+        lambda db: repository_sessions.rotate_session("sid", "old", "new", date(2030, 1, 1), db),
+        lambda db: repository_sessions.revoke_session("sid", db),
+        lambda db: repository_sessions.revoke_user_sessions(USER.id, db),
+        lambda db: repository_sessions.delete_expired_sessions(db, batch_size=10),
+        lambda db: repository_contacts.update_contacts_batch([1, 2], {"name": "x"}, db, USER),
+        lambda db: repository_contacts.delete_contacts_batch([1, 2], db, USER),
+    ],
+    ids=["rotate", "revoke", "revoke_user", "delete_expired", "update_batch", "delete_batch"],
+)
+async def test_write_statements_use_indexes(call):
+    assert_uses_index(await query_plans(call, kinds=("UPDATE", "DELETE")))
@@ -0,0 +1,96 @@
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import fakeredis
+import redis
+from limits import errors, parse, storage, strategies
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+
+from src.web13hm.core.config import limiter
+from src.web13hm.core.limiter_storage import SQLiteStorage
+
+
+class TestSQLiteStorage(unittest.TestCase):
+    def setUp(self):
+        self.item = parse("3/minute")
+
+    def test_scheme_registered(self):
+        self.assertIsInstance(storage.storage_from_string("sqlite://"), SQLiteStorage)
+
+    def test_sliding_window_shared_between_workers(self):
+        path = os.path.join(tempfile.mkdtemp(), "limits.db")
+        workers = [
+            strategies.SlidingWindowCounterRateLimiter(storage.storage_from_string(f"sqlite:///{path}"))
+            for _ in range(2)
+        ]
+        hits = [workers[i % 2].hit(self.item, "client") for i in range(5)]
+        self.assertEqual(hits, [True, True, True, False, False])
+        self.assertEqual(workers[1].get_window_stats(self.item, "client").remaining, 0)
+        self.assertTrue(workers[0].hit(self.item, "other"))
+
+    def test_previous_window_is_weighted(self):
+        limiter = strategies.SlidingWindowCounterRateLimiter(SQLiteStorage("sqlite://"))
+        with patch("src.web13hm.core.limiter_storage.time.time", return_value=60.0):
+            self.assertEqual([limiter.hit(self.item, "k") for _ in range(4)], [True] * 3 + [False])
+        # Halfway through the next window half of the previous count still applies.
+        with patch("src.web13hm.core.limiter_storage.time.time", return_value=150.0):
+            self.assertEqual([limiter.hit(self.item, "k") for _ in range(3)], [True, True, False])
+        # Two windows later nothing is carried over.
+        with patch("src.web13hm.core.limiter_storage.time.time", return_value=240.0):
+            self.assertEqual(limiter.get_window_stats(self.item, "k").remaining, 3)
+
+    def test_one_row_per_key_and_purge(self):
+        store = SQLiteStorage("sqlite://", purge_interval=1)
+        limiter = strategies.SlidingWindowCounterRateLimiter(store)
+        for now in (60.0, 130.0, 200.0):
+            with patch("src.web13hm.core.limiter_storage.time.time", return_value=now):
+                limiter.hit(self.item, "k")
+        rows = store._connection.execute("SELECT count(*) FROM rate_limit_windows").fetchone()[0]
+        self.assertEqual(rows, 1)
+        with patch("src.web13hm.core.limiter_storage.time.time", return_value=1000.0):
+            limiter.hit(self.item, "other")
+        keys = [row[0] for row in store._connection.execute("SELECT key FROM rate_limit_windows")]
+        self.assertEqual(len(keys), 1)
+        self.assertIn("other", keys[0])
+
+    def test_fixed_window_counters(self):
+        store = SQLiteStorage("sqlite://")
+        self.assertEqual(store.incr("k", 60), 1)
+        self.assertEqual(store.incr("k", 60, amount=2), 3)
+        self.assertEqual(store.get("k"), 3)
+        store.clear("k")
+        self.assertEqual(store.get("k"), 0)
+        self.assertTrue(store.check())
+
+    def test_locked_database_fails_fast(self):
+        path = os.path.join(tempfile.mkdtemp(), "limits.db")
+        store = SQLiteStorage(f"sqlite:///{path}", wrap_exceptions=True)
+        holder = sqlite3.connect(path, isolation_level=None)
+        holder.execute("BEGIN IMMEDIATE")
+        self.addCleanup(holder.close)
+        started = time.perf_counter()
+        with self.assertRaises(errors.StorageError):
+            store.acquire_sliding_window_entry("k", 3, 60)
+        self.assertLess(time.perf_counter() - started, 1)
+
+    def test_app_limiter_fails_open(self):
+        self.assertTrue(limiter._swallow_errors)
+        self.assertTrue(limiter._storage.wrap_exceptions)
+
+
+class TestRedisStorage(unittest.TestCase):
+    def test_limiter_with_fake_redis(self):
+        pool = redis.ConnectionPool(connection_class=fakeredis.FakeRedisConnection, server=fakeredis.FakeServer())
+        limiter = Limiter(
+            key_func=get_remote_address,
+            strategy="sliding-window-counter",
+            storage_uri="redis://localhost:6379",
+            storage_options={"connection_pool": pool},
+        )
+        item = parse("2/minute")
+        self.assertEqual([limiter.limiter.hit(item, "client") for _ in range(3)], [True, True, False])
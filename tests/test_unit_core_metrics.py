@@ -0,0 +1,102 @@
+import asyncio
+import unittest
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from src.web13hm.core.metrics import UNMATCHED_ROUTE, instrument_engine, registry, timed
+
+
+def sample(name, **labels):
+    return registry.get_sample_value(name, labels) or 0
+
+
+class TestTimed(unittest.TestCase):
+    def test_records_failures(self):
+        @timed("test_failure")
+        async def fail():
+            raise ValueError
+
+        with self.assertRaises(ValueError):
+            asyncio.run(fail())
+        self.assertEqual(sample("auth_operation_duration_seconds_count", operation="test_failure"), 1)
+
+
+def test_metrics_endpoint(client):
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "http_request_duration_seconds" in response.text
+    assert "/metrics" not in client.get("/openapi.json").text
+
+
+def test_cache_statistics(client, token):
+    headers = {"Authorization": f"Bearer {token}"}
+    before = sample("cache_hits_total", cache="token")
+    for _ in range(2):
+        assert client.get("/api/contacts/contacts", headers=headers).status_code == 200
+    assert sample("cache_hits_total", cache="token") > before
+    assert sample("cache_misses_total", cache="response") >= 1
+    assert 'cache_entries{cache="user"}' in client.get("/metrics").text
+
+
+def test_executor_statistics(client, token):
+    before = sample("executor_tasks_completed_total", executor="password-hasher")
+    login = {"username": "contacts@example.com", "password": "123456789"}
+    assert client.post("/api/auth/login", data=login).status_code == 200
+    assert sample("executor_tasks_completed_total", executor="password-hasher") > before
+    text = client.get("/metrics").text
+    for name in ("executor_tasks_queued", "executor_wait_seconds_total", "executor_max_wait_seconds"):
+        assert f'{name}{{executor="avatar-uploads"}}' in text
+
+
+def test_requests_labelled_by_route_template(client, token):
+    route = "/api/contacts/contacts/{data}"
+    before = sample("http_requests_total", method="GET", route=route, status="404")
+
+    headers = {"Authorization": f"Bearer {token}"}
+    for data in ("ann", "bob@example.com"):
+        assert client.get(f"/api/contacts/contacts/{data}", headers=headers).status_code == 404
+
+    assert sample("http_requests_total", method="GET", route=route, status="404") == before + 2
+    assert sample("http_request_duration_seconds_count", method="GET", route=route) >= 2
+
+
+def test_unmatched_paths_share_one_label(client):
+    before = sample("http_requests_total", method="GET", route=UNMATCHED_ROUTE, status="404")
+
+    client.get("/no/such/path")
+    client.get("/no/such/other/path")
+
+    assert sample("http_requests_total", method="GET", route=UNMATCHED_ROUTE, status="404") == before + 2
+
+
+def test_counts_queries_per_request(client, token):
+    route = "/api/contacts/contacts"
+    count = sample("http_request_db_queries_count", route=route)
+    queries = sample("http_request_db_queries_sum", route=route)
+    auth_calls = sample("auth_operation_duration_seconds_count", operation="get_current_user")
+
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get(route, headers=headers).status_code == 200
+
+    assert sample("http_request_db_queries_count", route=route) == count + 1
+    assert sample("http_request_db_queries_sum", route=route) > queries
+    assert sample("db_query_duration_seconds_count", operation="SELECT") > 0
+    assert sample("auth_operation_duration_seconds_count", operation="get_current_user") == auth_calls + 1
+
+
+def test_failed_statements_leave_no_state_on_the_connection():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    selects = sample("db_query_duration_seconds_count", operation="SELECT")
+    with engine.connect() as conn:
+        for _ in range(3):
+            try:
+                conn.execute(text("SELECT * FROM missing"))
+            except OperationalError:
+                pass
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+        assert "query_started" not in conn.info
+    engine.dispose()
+    assert sample("db_query_duration_seconds_count", operation="SELECT") == selects + 1
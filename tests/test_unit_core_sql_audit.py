@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import unittest
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from main import app
+from src.web13hm.core.sql_audit import (
+    QueryBudgetExceeded,
+    RequestAudit,
+    SQLAuditMiddleware,
+    SQLAuditor,
+    StatementRecord,
+    sql_auditor,
+)
+from src.web13hm.services.cache import user_cache
+
+
+def endpoint(path, method="GET"):
+    return next(route.endpoint for route in app.routes if route.path == path and method in route.methods)
+
+
+def test_read_all_contacts_within_budget(client, token):
+    user_cache.clear()
+
+    response = client.get("/api/contacts/contacts", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert sql_auditor.last_audit.route == "GET /api/contacts/contacts"
+    assert len(sql_auditor.last_audit) <= sql_auditor.last_audit.budget == 2
+
+
+def test_exceeding_budget_fails_in_strict_mode(client, token, monkeypatch):
+    assert sql_auditor.strict
+    monkeypatch.setattr(endpoint("/api/contacts/contacts"), "query_budget", 0)
+
+    with pytest.raises(QueryBudgetExceeded, match="over its budget of 0"):
+        client.get("/api/contacts/contacts", headers={"Authorization": f"Bearer {token}"})
+
+
+class TestSQLAuditor(unittest.TestCase):
+    def test_reports_repeated_statements(self):
+        audit = RequestAudit()
+        audit.route = "GET /owners"
+        audit.statements = [StatementRecord("SELECT * FROM contacts", 0.001, None)] + [
+            StatementRecord("SELECT * FROM users WHERE id = ?", 0.001, None) for _ in range(5)
+        ]
+
+        self.assertEqual(audit.repeated(5), [("SELECT * FROM users WHERE id = ?", 5)])
+        with self.assertLogs("src.web13hm.core.sql_audit", logging.WARNING) as logs:
+            SQLAuditor(repeated_threshold=5).report(audit)
+        self.assertIn("Possible N+1 in GET /owners: executed 5 times", logs.output[0])
+
+    def test_budget_logged_when_not_strict(self):
+        audit = RequestAudit()
+        audit.budget = 0
+        audit.statements = [StatementRecord("SELECT 1", 0.001, None)]
+
+        with self.assertLogs("src.web13hm.core.sql_audit", logging.WARNING) as logs:
+            SQLAuditor(strict=False).report(audit)
+        self.assertIn("over its budget of 0", logs.output[0])
+
+    def test_explains_slow_statements(self):
+        engine = create_async_engine("sqlite+aiosqlite://")
+        auditor = SQLAuditor(slow_threshold=0, explain=True)
+        auditor.instrument(engine.sync_engine)
+
+        async def query(scope, receive, send):
+            async with engine.connect() as conn:
+                await conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY)"))
+                rows = (await conn.execute(text("SELECT id FROM t WHERE id = :id"), {"id": 1})).all()
+                self.assertEqual(rows, [])
+
+        async def run():
+            try:
+                await SQLAuditMiddleware(query, auditor)({"type": "http", "method": "GET"}, None, None)
+            finally:
+                await engine.dispose()
+
+        with self.assertLogs("src.web13hm.core.sql_audit", logging.WARNING) as logs:
+            asyncio.run(run())
+        create, select = auditor.last_audit.statements
+        self.assertIsNone(create.plan)
+        self.assertTrue(any("USING INTEGER PRIMARY KEY" in step for step in select.plan))
+        self.assertTrue(any("Slow statement in GET <unmatched>" in line for line in logs.output))
+
+    def test_failed_statements_leave_no_state_on_the_connection(self):
+        engine = create_async_engine("sqlite+aiosqlite://")
+        auditor = SQLAuditor()
+        auditor.instrument(engine.sync_engine)
+
+        async def query(scope, receive, send):
+            async with engine.connect() as conn:
+                for _ in range(3):
+                    with self.assertRaises(OperationalError):
+                        await conn.execute(text("SELECT * FROM missing"))
+                await conn.execute(text("SELECT 1"))
+                self.assertNotIn("audit_started", conn.sync_connection.info)
+
+        async def run():
+            try:
+                await SQLAuditMiddleware(query, auditor)({"type": "http", "method": "GET"}, None, None)
+            finally:
+                await engine.dispose()
+
+        asyncio.run(run())
+        self.assertEqual([record.statement for record in auditor.last_audit.statements], ["SELECT 1"])
+
@@ -0,0 +1,92 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.web13hm.conf.config import settings
+from src.web13hm.database.db import engine_options
+from src.web13hm.database.pool import MonitoredQueuePool, PoolMonitor
+
+
+class TestEngineOptions(unittest.TestCase):
+    def test_pool_settings(self):
+        options = engine_options("sqlite+aiosqlite:////tmp/app.db")
+        self.assertIs(options["poolclass"], MonitoredQueuePool)
+        self.assertEqual(options["pool_timeout"], settings.db_pool_timeout)
+        self.assertEqual(options["pool_recycle"], settings.db_pool_recycle)
+        self.assertEqual(options["pool_pre_ping"], settings.db_pool_pre_ping)
+
+    def test_in_memory_sqlite_keeps_static_pool(self):
+        self.assertEqual(engine_options("sqlite+aiosqlite://"), {})
+
+
+class TestPoolMonitor(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        path = os.path.join(tempfile.mkdtemp(), "pool.db")
+        self.engine = create_async_engine(
+            f"sqlite+aiosqlite:///{path}",
+            poolclass=MonitoredQueuePool,
+            pool_size=1,
+            max_overflow=1,
+            pool_timeout=0.2,
+        )
+        self.monitor = PoolMonitor()
+        self.monitor.instrument(self.engine.sync_engine)
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+    async def hold(self, seconds):
+        async with self.engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            await asyncio.sleep(seconds)
+
+    async def test_counts_checkouts_overflow_and_ages(self):
+        async with self.engine.connect() as first, self.engine.connect() as second:
+            await first.execute(text("SELECT 1"))
+            await second.execute(text("SELECT 1"))
+            stats = self.monitor.stats(self.engine.sync_engine)
+            self.assertEqual(stats["checked_out"], 2)
+            self.assertEqual(stats["overflow"], 1)
+            self.assertEqual(stats["connections"], 2)
+
+        stats = self.monitor.stats(self.engine.sync_engine)
+        self.assertEqual(stats["checked_out"], 0)
+        self.assertEqual(stats["checkouts"], 2)
+        self.assertEqual(stats["timeouts"], 0)
+        self.assertGreaterEqual(stats["oldest_connection_s"], 0)
+
+    async def test_records_waits_and_timeouts(self):
+        await asyncio.gather(self.hold(0.1), self.hold(0.1), self.hold(0))
+        stats = self.monitor.stats(self.engine.sync_engine)
+        self.assertEqual(stats["checkouts"], 3)
+        self.assertGreaterEqual(stats["max_wait_ms"], 50)
+
+        with self.assertRaises(exc.TimeoutError):
+            await asyncio.gather(self.hold(0.5), self.hold(0.5), self.hold(0))
+        self.assertEqual(self.monitor.timeouts, 1)
+
+    async def test_survives_dispose(self):
+        await self.hold(0)
+        await self.engine.dispose()
+        self.assertEqual(self.monitor.stats(self.engine.sync_engine)["connections"], 0)
+
+        await self.hold(0)
+        self.assertIs(self.engine.pool.monitor, self.monitor)
+        stats = self.monitor.stats(self.engine.sync_engine)
+        self.assertEqual(stats["checkouts"], 2)
+        self.assertEqual(stats["connections"], 1)
+
+
+def test_healthchecker_and_pool_stats(client):
+    assert client.get("/api/contacts/healthchecker").status_code == 200
+
+    assert client.get("/api/contacts/healthchecker/pool").status_code == 404
+    stats = client.get("/metrics/pool").json()
+    assert stats["pool"] == "MonitoredQueuePool"
+    assert stats["checkouts"] >= 1
+    assert stats["checked_out"] == 0
+    assert stats["pre_ping"] == settings.db_pool_pre_ping
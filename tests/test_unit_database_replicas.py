@@ -0,0 +1,120 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from src.web13hm.database import db
+from src.web13hm.database.models import Base, Contacts, User
+from src.web13hm.database.replicas import ReplicaSet
+from src.web13hm.services.cache import recent_writers
+
+
+def replica_engine(path):
+    return create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+
+
+class TestReplicaSet(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.a, self.b = replica_engine("/tmp/a.db"), replica_engine("/tmp/b.db")
+        self.replicas = ReplicaSet([self.a, self.b], retry_interval=30, timer=lambda: self.now)
+
+    def test_round_robin(self):
+        self.assertEqual([self.replicas.choose() for _ in range(4)], [self.a, self.b, self.a, self.b])
+
+    def test_skips_failed_replica_until_retry(self):
+        self.replicas.mark_down(self.a)
+        self.assertEqual([self.replicas.choose() for _ in range(3)], [self.b] * 3)
+
+        self.replicas.mark_down(self.b)
+        self.assertIsNone(self.replicas.choose())
+
+        self.now = 30
+        self.assertEqual({self.replicas.choose() for _ in range(2)}, {self.a, self.b})
+        self.assertEqual(
+            [(s["healthy"], s["failures"]) for s in self.replicas.stats()], [(True, 1), (True, 1)]
+        )
+
+    def test_empty(self):
+        self.assertFalse(ReplicaSet([]))
+        self.assertIsNone(ReplicaSet([]).choose())
+
+
+class TestReplicaSession(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.down = replica_engine("/nonexistent/replica.db")
+        self.up = replica_engine(os.path.join(tempfile.mkdtemp(), "replica.db"))
+        self.replicas = ReplicaSet([self.down, self.up])
+        patcher = patch.object(db, "replica_set", self.replicas)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        await recent_writers.clear()
+
+    async def asyncTearDown(self):
+        await recent_writers.clear()
+        await self.replicas.dispose()
+
+    async def test_falls_over_to_healthy_replica(self):
+        async with db.replica_session("reader@example.com") as session:
+            self.assertIs(session.bind, self.up)
+        self.assertFalse(self.replicas.is_healthy(self.down))
+
+    async def test_recent_writer_reads_primary(self):
+        await recent_writers.add("writer@example.com")
+        async with db.replica_session("writer@example.com") as session:
+            self.assertIsNone(session)
+
+    async def test_no_healthy_replica_reads_primary(self):
+        self.replicas.mark_down(self.up)
+        async with db.replica_session("reader@example.com") as session:
+            self.assertIsNone(session)
+
+
+def test_reads_from_replica_until_user_writes(client, session, token, monkeypatch):
+    owner = session.query(User).filter(User.email == "contacts@example.com").first()
+    path = os.path.join(tempfile.mkdtemp(), "replica.db")
+    sync_replica = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(sync_replica)
+    with Session(sync_replica) as replica:
+        replica.add(User(id=owner.id, email=owner.email, password=owner.password, confirmed=True))
+        replica.add(
+            Contacts(
+                name="Replica",
+                last_name="Only",
+                email="replica@example.com",
+                number="1",
+                birthday=date(1990, 1, 1),
+                user_id=owner.id,
+            )
+        )
+        replica.commit()
+    sync_replica.dispose()
+    monkeypatch.setattr(db.replica_set, "engines", [replica_engine(path)])
+    asyncio.run(recent_writers.clear())
+    headers = {"Authorization": f"Bearer {token}"}
+
+    names = [contact["name"] for contact in client.get("/api/contacts/contacts", headers=headers).json()]
+    assert names == ["Replica"]
+    assert client.get("/api/contacts/contacts/Replica", headers=headers).status_code == 200
+
+    body = {
+        "name": "Primary",
+        "last_name": "Write",
+        "email": "primary@example.com",
+        "number": "2",
+        "birthday": "1990-01-02",
+    }
+    assert client.post("/api/contacts/Create", json=body, headers=headers).status_code == 201
+    names = [contact["name"] for contact in client.get("/api/contacts/contacts", headers=headers).json()]
+    assert "Primary" in names and "Replica" not in names
+
+    stats = client.get("/metrics/pool").json()["replicas"]
+    assert stats == [{"healthy": True, "reads": 2, "failures": 0}]
+    asyncio.run(recent_writers.clear())
@@ -1,7 +1,7 @@
 import unittest
 from unittest.mock import MagicMock
 from fastapi.exceptions import HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date
 from src.web13hm.database.models import User, Contacts
 from src.web13hm.shemas import ContactModel
@@ -12,28 +12,107 @@ from src.web13hm.repository.contacts import (
     delete_contact,
     update_contact,
     birthday_by_7_day,
+    birthday_next_cursor,
+    contacts_next_cursor,
 )
+from src.web13hm.services.pagination import encode_cursor
+from src.web13hm.services.response_cache import response_cache
 
 
 class TestContacts(unittest.IsolatedAsyncioTestCase):
     def setUp(self):
-        self.session = MagicMock(spec=Session)
+        self.session = MagicMock(spec=AsyncSession)
         self.user = User(id=1)
+        self.result = MagicMock()
+        self.session.scalars.return_value = self.result
 
     async def test_get_Contacts(self):
         contacts = [Contacts(), Contacts(), Contacts()]
-        self.session.query().filter().offset().limit().all.return_value = contacts
+        self.result.all.return_value = contacts
         result = await get_Contacts(skip=0, limit=10, user=self.user, db=self.session)
         self.assertEqual(result, contacts)
 
+    async def test_get_Contacts_selects_columns(self):
+        rows = [(1, "Ann")]
+        self.session.execute.return_value = MagicMock(all=MagicMock(return_value=rows))
+        result = await get_Contacts(
+            skip=0, limit=10, user=self.user, db=self.session, columns=[Contacts.id, Contacts.name]
+        )
+        self.assertEqual(result, rows)
+        self.session.scalars.assert_not_called()
+        query = self.session.execute.call_args.args[0]
+        self.assertEqual([c.name for c in query.selected_columns], ["id", "name"])
+
+    async def test_get_Contacts_with_cursor(self):
+        contacts = [Contacts(id=11), Contacts(id=12)]
+        self.result.all.return_value = contacts
+        result = await get_Contacts(
+            skip=0, limit=2, user=self.user, db=self.session, cursor=encode_cursor(10)
+        )
+        self.assertEqual(result, contacts)
+        query = self.session.scalars.call_args.args[0]
+        self.assertIn("contacts.id >", str(query))
+        self.assertEqual(contacts_next_cursor(result, 2), encode_cursor(12))
+        self.assertIsNone(contacts_next_cursor(result, 10))
+
+    async def test_birthday_by_7_day(self):
+        contacts = [Contacts(id=1, birthday=date(1990, 6, 2))]
+        self.result.all.return_value = contacts
+        result = await birthday_by_7_day(
+            skip=0, limit=10, db=self.session, current_user=self.user, today=date(2025, 6, 1)
+        )
+        self.assertEqual(result, contacts)
+        self.assertEqual(self.session.scalars.await_count, 1)
+        query = str(self.session.scalars.call_args.args[0])
+        self.assertIn("contacts.birthday_month_day BETWEEN", query)
+
+    async def test_birthday_by_7_day_wraps_around_new_year(self):
+        december = [Contacts(id=1, birthday=date(1990, 12, 30))]
+        january = [Contacts(id=2, birthday=date(1990, 1, 2))]
+        self.result.all.side_effect = [december, january]
+        result = await birthday_by_7_day(
+            skip=0, limit=10, db=self.session, current_user=self.user, today=date(2025, 12, 29)
+        )
+        self.assertEqual(result, december + january)
+        first, second = (str(call.args[0]) for call in self.session.scalars.call_args_list)
+        self.assertIn("contacts.birthday_month_day >=", first)
+        self.assertIn("contacts.birthday_month_day <=", second)
+
+    async def test_birthday_by_7_day_with_cursor(self):
+        contacts = [Contacts(id=3, birthday=date(2000, 1, 2))]
+        self.result.all.return_value = contacts
+        result = await birthday_by_7_day(
+            skip=0,
+            limit=1,
+            db=self.session,
+            current_user=self.user,
+            cursor=encode_cursor(101, 2),
+            today=date(2025, 12, 29),
+        )
+        self.assertEqual(result, contacts)
+        # The cursor points into January, so the December part is not queried again.
+        self.assertEqual(self.session.scalars.await_count, 1)
+        self.assertEqual(birthday_next_cursor(result, 1), encode_cursor(102, 3))
+
+    async def test_birthday_by_7_day_invalid_cursor(self):
+        with self.assertRaises(HTTPException) as context:
+            await birthday_by_7_day(
+                skip=0,
+                limit=10,
+                db=self.session,
+                current_user=self.user,
+                cursor=encode_cursor("not-a-day", 2),
+            )
+        self.assertEqual(context.exception.status_code, 400)
+
     async def test_get_contact_by_found(self):
         contacts = Contacts()
-        self.session.query().filter().all.return_value = contacts
+        self.result.all.return_value = contacts
         result = await get_Contacts_by(Contacts_data='1', user=self.user, db=self.session)
         self.assertEqual(result, contacts)
 
     async def test_get_contacts_by_not_found(self):
-        self.session.query().filter().all.return_value = []
+        self.result.all.return_value = []
         with self.assertRaises(HTTPException) as context:
             await get_Contacts_by(
                 Contacts_data='999',
@@ -58,15 +137,20 @@ class TestContacts(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(result.birthday, body.birthday)
         self.assertEqual(result.extra_data, body.extra_data)
         self.assertTrue(hasattr(result, "id"))
+        self.session.commit.assert_awaited_once()
+        self.session.refresh.assert_not_awaited()
 
     async def test_delete_contact_found(self):
         contact = Contacts()
-        self.session.query().filter().first.return_value = contact
+        self.session.scalar.return_value = contact
+        version = await response_cache.version(self.user.id)
         result = await delete_contact(contact_id=1, current_user=self.user, db=self.session)
         self.assertEqual(result, {'ok': True})
+        self.session.delete.assert_awaited_once_with(contact)
+        self.assertEqual(await response_cache.version(self.user.id), version + 1)
 
     async def test_delete_contact_not_found(self):
-        self.session.query().filter().first.return_value = None
+        self.session.scalar.return_value = None
         with self.assertRaises(HTTPException) as context:
             await delete_contact(
                 contact_id=67,
@@ -85,7 +169,9 @@ class TestContacts(unittest.IsolatedAsyncioTestCase):
             birthday=date.today(),
             extra_data="test_extra_data",
         )
-        contact = ContactModel(
+        contact = Contacts(
+            id=1,
+            user_id=1,
             name="test_name",
             last_name="test_last_name",
             email="test3mail@gmail.com",
@@ -93,15 +179,15 @@ class TestContacts(unittest.IsolatedAsyncioTestCase):
             birthday=date.today(),
             extra_data="test_extra_data",
         )
-        self.session.query().filter().first.return_value = contact
-        self.session.commit.return_value = None
+        self.session.scalar.return_value = contact
         result = await update_contact(
             contact_id=1, body=body, current_user=self.user, db=self.session
         )
         self.assertEqual(result, contact)
+        self.assertEqual(result.name, "test_name2")
 
     async def test_update_contact_not_found(self):
-        self.session.query().filter().first.return_value = None
+        self.session.scalar.return_value = None
         body = ContactModel(
             name="test_name2",
             last_name="test_last_name",
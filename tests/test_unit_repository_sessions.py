@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from src.web13hm.database.models import RefreshSession, User
+from src.web13hm.repository import sessions as repository_sessions
+from tests.conftest import AsyncTestingSessionLocal
+
+
+@pytest.fixture()
+def user_id(session):
+    email = "sessions@example.com"
+    user = session.query(User).filter(User.email == email).first()
+    if user is None:
+        user = User(email=email, password="x", confirmed=True)
+        session.add(user)
+        session.commit()
+    session.query(RefreshSession).delete()
+    session.commit()
+    return user.id
+
+
+def in_days(days):
+    return datetime.utcnow() + timedelta(days=days)
+
+
+async def count_sessions(db):
+    return await db.scalar(select(func.count()).select_from(RefreshSession))
+
+
+async def test_rotate_session_accepts_only_current_token(user_id):
+    async with AsyncTestingSessionLocal() as db:
+        await repository_sessions.create_session("s1", user_id, "first", in_days(1), db)
+
+        assert await repository_sessions.rotate_session("s1", "first", "second", in_days(1), db)
+        assert not await repository_sessions.rotate_session("s1", "first", "third", in_days(1), db)
+        assert await repository_sessions.rotate_session("s1", "second", "third", in_days(1), db)
+
+
+async def test_rotate_session_rejects_expired_session(user_id):
+    async with AsyncTestingSessionLocal() as db:
+        await repository_sessions.create_session("s1", user_id, "first", in_days(-1), db)
+
+        assert not await repository_sessions.rotate_session("s1", "first", "second", in_days(1), db)
+
+
+async def test_revoke_sessions(user_id):
+    async with AsyncTestingSessionLocal() as db:
+        for session_id in ("s1", "s2", "s3"):
+            await repository_sessions.create_session(session_id, user_id, session_id, in_days(1), db)
+
+        assert await repository_sessions.revoke_session("s1", db)
+        assert not await repository_sessions.revoke_session("s1", db)
+        assert sorted(await repository_sessions.revoke_user_sessions(user_id, db)) == ["s2", "s3"]
+        assert await count_sessions(db) == 0
+
+
+async def test_delete_expired_sessions_in_batches(user_id):
+    async with AsyncTestingSessionLocal() as db:
+        for i in range(7):
+            await repository_sessions.create_session(f"old{i}", user_id, f"old{i}", in_days(-1), db)
+        await repository_sessions.create_session("live", user_id, "live", in_days(1), db)
+
+        commits = []
+        original_commit = db.commit
+
+        async def commit():
+            commits.append(True)
+            await original_commit()
+
+        db.commit = commit
+        assert await repository_sessions.delete_expired_sessions(db, batch_size=3) == 7
+
+        assert len(commits) == 3
+        assert await db.scalar(select(RefreshSession.id)) == "live"
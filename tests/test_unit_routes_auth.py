@@ -58,3 +58,88 @@ def test_login_wrong_email(client, user):
     )
     assert response.status_code == 401
     assert response.json()["detail"] == "Invalid email"
+
+
+def test_jwks_is_empty_for_hmac(client):
+    response = client.get("/api/auth/jwks.json")
+    assert response.status_code == 200
+    assert response.json() == {"keys": []}
+    assert "max-age" in response.headers["cache-control"]
+
+
+def login(client, user):
+    response = client.post(
+        "/api/auth/login",
+        data={"username": user["username"], "password": user["password"]},
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def refresh(client, refresh_token):
+    return client.get(
+        "/api/auth/refresh_token", headers={"Authorization": f"Bearer {refresh_token}"}
+    )
+
+
+def test_refresh_rotates_token_without_touching_users(client, session, user):
+    tokens = login(client, user)
+    password = session.query(User.password).filter(User.email == user["username"]).scalar()
+
+    response = refresh(client, tokens["refresh_token"])
+
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+    assert refresh(client, rotated["refresh_token"]).status_code == 200
+    session.expire_all()
+    assert session.query(User.password).filter(User.email == user["username"]).scalar() == password
+
+
+def test_sessions_are_independent(client, user):
+    phone = login(client, user)
+    laptop = login(client, user)
+
+    assert refresh(client, phone["refresh_token"]).status_code == 200
+    assert refresh(client, laptop["refresh_token"]).status_code == 200
+
+
+def test_reused_refresh_token_revokes_session(client, user):
+    tokens = login(client, user)
+    rotated = refresh(client, tokens["refresh_token"]).json()
+
+    response = refresh(client, tokens["refresh_token"])
+
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Invalid refresh token"
+    assert refresh(client, rotated["refresh_token"]).status_code == 401
+    me = client.get("/api/users/me/", headers={"Authorization": f"Bearer {rotated['access_token']}"})
+    assert me.status_code == 401
+
+
+def test_logout_revokes_only_current_session(client, user):
+    current = login(client, user)
+    other = login(client, user)
+    headers = {"Authorization": f"Bearer {current['access_token']}"}
+
+    assert client.post("/api/auth/logout", headers=headers).status_code == 204
+
+    assert client.get("/api/users/me/", headers=headers).status_code == 401
+    assert refresh(client, current["refresh_token"]).status_code == 401
+    assert refresh(client, other["refresh_token"]).status_code == 200
+
+
+def test_logout_all_revokes_every_session(client, user):
+    sessions = [login(client, user) for _ in range(2)]
+    headers = {"Authorization": f"Bearer {sessions[0]['access_token']}"}
+
+    assert client.post("/api/auth/logout_all", headers=headers).status_code == 204
+
+    for tokens in sessions:
+        assert refresh(client, tokens["refresh_token"]).status_code == 401
+    assert client.get("/api/users/me/", headers=headers).status_code == 401
+
+
+def test_access_token_is_not_a_refresh_token(client, user):
+    tokens = login(client, user)
+    assert refresh(client, tokens["access_token"]).status_code == 401
@@ -0,0 +1,363 @@
+import json
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from sqlalchemy import event
+
+from src.web13hm.database.models import ContactSearchTerm, Contacts, User
+from src.web13hm.services.pagination import encode_cursor
+from tests.conftest import async_engine
+
+
+def add_contacts(session, count):
+    owner = session.query(User).filter(User.email == "contacts@example.com").first()
+    session.query(ContactSearchTerm).filter(ContactSearchTerm.user_id == owner.id).delete()
+    session.query(Contacts).filter(Contacts.user_id == owner.id).delete()
+    for i in range(count):
+        session.add(
+            Contacts(
+                name=f"name{i}",
+                last_name=f"last{i}",
+                email=f"contact{i}@example.com",
+                number=f"{i}",
+                birthday=date(1990, 1, 1 + i),
+                user_id=owner.id,
+            )
+        )
+    session.commit()
+    return owner
+
+
+def test_read_all_contacts_with_cursor(client, session, token):
+    add_contacts(session, 12)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.get("/api/contacts/contacts", params={"limit": 10}, headers=headers)
+    assert response.status_code == 200
+    first_page = response.json()
+    assert len(first_page) == 10
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get(
+        "/api/contacts/contacts", params={"limit": 10, "cursor": cursor}, headers=headers
+    )
+    assert response.status_code == 200
+    second_page = response.json()
+    assert [c["name"] for c in second_page] == ["name10", "name11"]
+    assert list(second_page[0]) == ["id", "name", "last_name", "email", "number", "birthday", "extra_data"]
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_read_all_contacts_invalid_cursor(client, token):
+    for cursor in ("not-a-cursor", encode_cursor(None), encode_cursor([1]), encode_cursor("abc"), encode_cursor(True)):
+        response = client.get(
+            "/api/contacts/contacts",
+            params={"cursor": cursor},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        assert response.status_code == 400, cursor
+        assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_birthday_ignores_year_and_window(client, session, token):
+    owner = add_contacts(session, 0)
+    today = date.today()
+    for name, delta in (("soon", 2), ("later", 20), ("passed", -2)):
+        birthday = (today + timedelta(days=delta)).replace(year=1988)
+        session.add(
+            Contacts(
+                name=name,
+                last_name="x",
+                email=f"{name}@example.com",
+                number="1",
+                birthday=birthday,
+                user_id=owner.id,
+            )
+        )
+    session.commit()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.get("/api/contacts/birthday", headers=headers)
+    assert response.status_code == 200
+    assert [c["name"] for c in response.json()] == ["soon"]
+
+    response = client.get("/api/contacts/birthday", params={"days": 30}, headers=headers)
+    assert response.status_code == 200
+    assert [c["name"] for c in response.json()] == ["soon", "later"]
+
+
+def test_search_follows_create_update_and_delete(client, session, token):
+    add_contacts(session, 0)
+    headers = {"Authorization": f"Bearer {token}"}
+    created = {}
+    for name, last_name, email in (
+        ("John", "Smith", "js@example.com"),
+        ("Mary", "Jones", "mary@example.com"),
+        ("Bob", "Brown", "jo@x.com"),
+    ):
+        response = client.post(
+            "/api/contacts/Create",
+            json={
+                "name": name,
+                "last_name": last_name,
+                "email": email,
+                "number": "1",
+                "birthday": "1990-01-01",
+            },
+            headers=headers,
+        )
+        assert response.status_code == 201, response.text
+        created[name] = response.json()["id"]
+
+    def search(q):
+        response = client.get("/api/contacts/search", params={"q": q}, headers=headers)
+        assert response.status_code == 200, response.text
+        return [c["name"] for c in response.json()]
+
+    assert sorted(search("jo")) == ["Bob", "John", "Mary"]
+    assert search("jones") == ["Mary"]
+    assert search("john sm") == ["John"]
+    assert search("jo@x") == ["Bob"]
+
+    response = client.put(
+        f"/api/contacts/Update/{created['John']}",
+        json={
+            "name": "Jack",
+            "last_name": "Smith",
+            "email": "js@example.com",
+            "number": "1",
+            "birthday": "1990-01-01",
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    assert search("john") == []
+    assert search("jack") == ["Jack"]
+
+    response = client.delete(f"/api/contacts/delete/{created['Mary']}", headers=headers)
+    assert response.status_code == 200, response.text
+    assert search("jones") == []
+    assert search(chr(0x10FFFF)) == []
+
+
+def test_import_csv_and_ndjson(client, session, token):
+    add_contacts(session, 0)
+    headers = {"Authorization": f"Bearer {token}"}
+    csv_body = (
+        "name,last_name,email,number,birthday\n"
+        "Ann,Lee,ann@example.com,1,1990-01-01\n"
+        "Bad,Row,not-an-email,2,1990-01-01\n"
+    )
+    response = client.post("/api/contacts/import", content=csv_body, headers=headers)
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert report["imported"] == 1
+    assert report["failed"] == 1
+    assert report["errors"][0]["row"] == 2
+
+    ndjson_body = '{"name": "Ben", "last_name": "Ng", "email": "ben@example.com", "number": "3", "birthday": "1992-03-04"}\n'
+    response = client.post(
+        "/api/contacts/import", params={"format": "ndjson"}, content=ndjson_body, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["imported"] == 1
+
+    response = client.get("/api/contacts/search", params={"q": "ben"}, headers=headers)
+    assert [c["name"] for c in response.json()] == ["Ben"]
+    owner = session.query(User).filter(User.email == "contacts@example.com").first()
+    ann = session.query(Contacts).filter(Contacts.user_id == owner.id, Contacts.name == "Ann").one()
+    assert ann.birthday_month_day == 101
+
+
+def test_import_csv_with_stray_quote(client, session, token):
+    add_contacts(session, 0)
+    headers = {"Authorization": f"Bearer {token}"}
+    csv_body = "name,last_name,email,number,birthday\n" 'Tall,5" guy,a@example.com,1,1990-01-01\n' + "".join(
+        f"Row{i},Valid,row{i}@example.com,{i},1990-01-01\n" for i in range(5)
+    )
+    response = client.post("/api/contacts/import", content=csv_body, headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json() == {"imported": 6, "failed": 0, "errors": []}
+
+
+def test_export_csv_ndjson_and_gzip(client, session, token):
+    add_contacts(session, 3)
+    headers = {"Authorization": f"Bearer {token}"}
+    response = client.get("/api/contacts/export", headers={**headers, "Accept-Encoding": "identity"})
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "content-encoding" not in response.headers
+    lines = response.text.splitlines()
+    assert lines[0] == "id,name,last_name,email,number,birthday,extra_data"
+    assert len(lines) == 4
+
+    response = client.get(
+        "/api/contacts/export",
+        params={"format": "ndjson"},
+        headers={**headers, "Accept-Encoding": "gzip"},
+    )
+    assert response.status_code == 200, response.text
+    assert response.headers["content-encoding"] == "gzip"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == sorted(row["id"] for row in rows)
+    assert len(rows) == 3
+
+
+def test_reads_are_cached_until_contacts_change(client, session, token):
+    add_contacts(session, 2)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for url in ("/api/contacts/contacts", "/api/contacts/contacts/name1", "/api/contacts/birthday?days=365"):
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        assert response.headers["cache-control"] == "private, no-cache"
+
+        revalidated = client.get(url, headers={**headers, "If-None-Match": etag})
+        assert revalidated.status_code == 304
+        assert revalidated.headers["etag"] == etag
+        assert revalidated.content == b""
+
+    response = client.get("/api/contacts/contacts", headers=headers)
+    etag = response.headers["etag"]
+    response = client.post(
+        "/api/contacts/Create",
+        json={
+            "name": "New",
+            "last_name": "Contact",
+            "email": "new@example.com",
+            "number": "1",
+            "birthday": "1990-01-01",
+        },
+        headers=headers,
+    )
+    assert response.status_code == 201
+
+    response = client.get("/api/contacts/contacts", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert [c["name"] for c in response.json()] == ["name0", "name1", "New"]
+
+
+def test_batch_update_and_delete(client, session, token):
+    owner = add_contacts(session, 3)
+    stranger = session.query(User).filter(User.email == "stranger@example.com").first()
+    if stranger is None:
+        stranger = User(email="stranger@example.com", password="x", confirmed=True)
+        session.add(stranger)
+        session.commit()
+    foreign = Contacts(name="foreign", last_name="x", email="f@example.com", number="1", user_id=stranger.id)
+    session.add(foreign)
+    session.commit()
+    ids = [c.id for c in session.query(Contacts).filter(Contacts.user_id == owner.id).order_by(Contacts.id)]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.patch(
+        "/api/contacts/batch",
+        json={"ids": ids[:2] + [foreign.id], "changes": {"name": "Renamed", "birthday": "1991-12-31"}},
+        headers=headers,
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json() == {
+        "count": 2,
+        "results": [
+            {"id": ids[0], "status": "updated"},
+            {"id": ids[1], "status": "updated"},
+            {"id": foreign.id, "status": "not_found"},
+        ],
+    }
+    session.expire_all()
+    renamed = session.query(Contacts).filter(Contacts.id.in_(ids[:2])).all()
+    assert {(c.name, c.last_name, c.birthday_month_day) for c in renamed} == {
+        ("Renamed", "last0", 1231),
+        ("Renamed", "last1", 1231),
+    }
+    assert session.get(Contacts, foreign.id).name == "foreign"
+    found = client.get("/api/contacts/search", params={"q": "renamed"}, headers=headers).json()
+    assert sorted(c["id"] for c in found) == ids[:2]
+
+    response = client.request(
+        "DELETE", "/api/contacts/batch", json={"ids": [ids[0], ids[2], foreign.id]}, headers=headers
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json()["count"] == 2
+    assert [r["status"] for r in response.json()["results"]] == ["deleted", "deleted", "not_found"]
+    session.expire_all()
+    assert [c.id for c in session.query(Contacts).filter(Contacts.user_id == owner.id)] == [ids[1]]
+    assert session.query(ContactSearchTerm).filter(ContactSearchTerm.contact_id == ids[0]).count() == 0
+    assert session.get(Contacts, foreign.id) is not None
+
+
+def test_batch_update_requires_changes(client, token):
+    response = client.patch(
+        "/api/contacts/batch",
+        json={"ids": [1], "changes": {}},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 422
+
+
+@contextmanager
+def contact_statements():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "contact" in statement:
+            statements.append(statement.split()[0].upper())
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+
+
+def test_create_and_patch_in_single_statements(client, session, token):
+    add_contacts(session, 0)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    with contact_statements() as statements:
+        response = client.post(
+            "/api/contacts/Create",
+            json={
+                "name": "Ann",
+                "last_name": "Lee",
+                "email": "ann@example.com",
+                "number": "1",
+                "birthday": "1990-01-01",
+            },
+            headers=headers,
+        )
+    assert response.status_code == 201, response.text
+    created = response.json()
+    assert created["created_at"] is not None
+    assert statements == ["INSERT", "INSERT"]
+
+    with contact_statements() as statements:
+        response = client.patch(f"/api/contacts/Update/{created['id']}", json={"number": "2"}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json() == {**{k: created[k] for k in response.json()}, "number": "2"}
+    assert statements == ["UPDATE"]
+
+    with contact_statements() as statements:
+        response = client.patch(
+            f"/api/contacts/Update/{created['id']}",
+            json={"name": "Anna", "birthday": "1990-12-31"},
+            headers=headers,
+        )
+    assert response.status_code == 200, response.text
+    assert statements == ["UPDATE", "DELETE", "INSERT"]
+    session.expire_all()
+    assert session.get(Contacts, created["id"]).birthday_month_day == 1231
+    found = client.get("/api/contacts/search", params={"q": "anna"}, headers=headers).json()
+    assert [c["id"] for c in found] == [created["id"]]
+
+
+def test_patch_contact_errors(client, session, token):
+    headers = {"Authorization": f"Bearer {token}"}
+    response = client.patch("/api/contacts/Update/999999", json={"number": "2"}, headers=headers)
+    assert response.status_code == 404
+    response = client.patch("/api/contacts/Update/999999", json={"name": None}, headers=headers)
+    assert response.status_code == 422
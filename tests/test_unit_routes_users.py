@@ -0,0 +1,107 @@
+import hashlib
+import io
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from src.web13hm.database.models import User
+from src.web13hm.services import avatars
+from tests.conftest import AsyncTestingSessionLocal
+
+
+def image_bytes(size=(640, 480), fmt="PNG", color="red"):
+    output = io.BytesIO()
+    Image.new("RGB", size, color).save(output, format=fmt)
+    return output.getvalue()
+
+
+@pytest.fixture()
+def local_storage(tmp_path):
+    storage = avatars.LocalStorage(str(tmp_path), [32, 250], avatars.upload_workers)
+    with patch.object(avatars, "avatar_storage", storage):
+        yield storage
+
+
+def test_update_avatar_local_storage(client, session, token, local_storage):
+    data = image_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    response = client.patch(
+        "/api/users/avatar",
+        files={"file": ("me.png", data, "image/png")},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["avatar"] == f"/api/users/avatar/{digest}/250"
+    for size in (32, 250):
+        with Image.open(local_storage.path(digest, size)) as avatar:
+            assert avatar.size == (size, size)
+
+
+def test_duplicate_avatar_is_not_processed_again(client, token, local_storage):
+    headers = {"Authorization": f"Bearer {token}"}
+    files = {"file": ("me.png", image_bytes(color="blue"), "image/png")}
+    workers = avatars.image_workers
+    with patch.object(workers, "run", side_effect=workers.run) as run:
+        urls = [client.patch("/api/users/avatar", files=files, headers=headers).json()["avatar"] for _ in range(2)]
+    assert urls[0] == urls[1]
+    run.assert_called_once()
+
+
+def test_read_avatar_is_immutable(client, token, local_storage):
+    data = image_bytes(color="green")
+    digest = hashlib.sha256(data).hexdigest()
+    client.patch(
+        "/api/users/avatar",
+        files={"file": ("me.png", data, "image/png")},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    response = client.get(f"/api/users/avatar/{digest}/32")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/jpeg"
+    assert response.headers["etag"] == f'"{digest}-32"'
+    assert "immutable" in response.headers["cache-control"]
+    assert Image.open(io.BytesIO(response.content)).size == (32, 32)
+
+    for if_none_match in (f'"{digest}-32"', f'"other", W/"{digest}-32"', "*"):
+        response = client.get(f"/api/users/avatar/{digest}/32", headers={"If-None-Match": if_none_match})
+        assert response.status_code == 304
+        assert response.content == b""
+    response = client.get(f"/api/users/avatar/{digest}/32", headers={"If-None-Match": f'"x{digest}-32"'})
+    assert response.status_code == 200
+
+    assert client.get(f"/api/users/avatar/{digest}/64").status_code == 404
+    assert client.get(f"/api/users/avatar/{'0' * 64}/32").status_code == 404
+    assert client.get("/api/users/avatar/not-a-digest/32").status_code == 422
+
+
+def test_update_avatar_in_background(client, session, token, local_storage):
+    data = image_bytes((300, 900), "JPEG")
+    with patch.object(avatars, "SessionLocal", AsyncTestingSessionLocal):
+        response = client.patch(
+            "/api/users/avatar",
+            params={"background": True},
+            files={"file": ("me.jpg", data, "image/jpeg")},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+    assert response.status_code == 202, response.text
+    user = session.query(User).filter(User.email == "contacts@example.com").one()
+    session.refresh(user)
+    assert user.avatar == f"/api/users/avatar/{hashlib.sha256(data).hexdigest()}/250"
+
+
+def test_update_avatar_rejects_invalid_images(client, token, local_storage):
+    headers = {"Authorization": f"Bearer {token}"}
+    for params in ({}, {"background": True}):
+        response = client.patch(
+            "/api/users/avatar",
+            params=params,
+            files={"file": ("me.png", b"not an image", "image/png")},
+            headers=headers,
+        )
+        assert response.status_code == 400
+    with patch.object(avatars.settings, "avatar_max_bytes", 10):
+        response = client.patch(
+            "/api/users/avatar", files={"file": ("me.png", image_bytes(), "image/png")}, headers=headers
+        )
+    assert response.status_code == 413
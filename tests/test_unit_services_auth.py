@@ -0,0 +1,58 @@
+import unittest
+from unittest.mock import patch
+
+from fastapi import HTTPException
+from jose import jwt
+
+from src.web13hm.services.auth import auth_service
+from src.web13hm.services.cache import revoked_sessions, token_cache
+
+
+class TestDecodeAccessToken(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        token_cache.clear()
+
+    async def test_repeated_tokens_skip_verification(self):
+        token = await auth_service.create_access_token({"sub": "a@example.com"})
+        with patch("src.web13hm.services.auth.jwt.decode", wraps=jwt.decode) as decode:
+            for _ in range(3):
+                self.assertEqual(await auth_service.decode_access_token(token), "a@example.com")
+        decode.assert_called_once()
+
+    async def test_cache_entry_is_bounded_by_expiry(self):
+        token = await auth_service.create_access_token({"sub": "a@example.com"}, expires_delta=30)
+        with patch.object(token_cache, "set", wraps=token_cache.set) as cache_set:
+            await auth_service.decode_access_token(token)
+        self.assertLessEqual(cache_set.call_args.kwargs["ttl"], 30)
+
+    async def test_rejected_tokens_are_not_cached(self):
+        expired = await auth_service.create_access_token({"sub": "a@example.com"}, expires_delta=-1)
+        refresh = await auth_service.create_refresh_token({"sub": "a@example.com"})
+        for token in (expired, refresh, "not-a-token"):
+            with self.subTest(token=token[:10]), self.assertRaises(HTTPException) as error:
+                await auth_service.decode_access_token(token)
+            self.assertEqual(error.exception.status_code, 401)
+        self.assertEqual(len(token_cache), 0)
+
+    async def test_revoked_sessions_are_rejected_from_cache(self):
+        token = await auth_service.create_access_token({"sub": "a@example.com", "sid": "s1"})
+        self.assertEqual(await auth_service.verify_access_token(token), ("a@example.com", "s1"))
+
+        await revoked_sessions.revoke("s1", ttl=60)
+        try:
+            with self.assertRaises(HTTPException) as error:
+                await auth_service.decode_access_token(token)
+        finally:
+            await revoked_sessions.clear()
+        self.assertEqual(error.exception.status_code, 401)
+
+    async def test_decode_refresh_token_requires_session(self):
+        token = await auth_service.create_refresh_token({"sub": "a@example.com", "sid": "s1"})
+        claims = await auth_service.decode_refresh_token(token)
+        self.assertEqual((claims["sub"], claims["sid"]), ("a@example.com", "s1"))
+
+        access = await auth_service.create_access_token({"sub": "a@example.com", "sid": "s1"})
+        sessionless = await auth_service.create_refresh_token({"sub": "a@example.com"})
+        for token in (access, sessionless):
+            with self.subTest(token=token[:10]), self.assertRaises(HTTPException):
+                await auth_service.decode_refresh_token(token)
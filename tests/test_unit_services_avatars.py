@@ -0,0 +1,60 @@
+import io
+import unittest
+from unittest.mock import patch
+
+import cloudinary
+from PIL import Image
+
+from fastapi import HTTPException
+
+from src.web13hm.services.avatars import CloudinaryStorage, check_image, make_thumbnails
+from src.web13hm.services.workers import BoundedExecutor
+
+
+def image_bytes(size, fmt="PNG", mode="RGB"):
+    output = io.BytesIO()
+    Image.new(mode, size).save(output, format=fmt)
+    return output.getvalue()
+
+
+class TestMakeThumbnails(unittest.TestCase):
+    def test_crops_to_square(self):
+        for size, fmt, mode in (((640, 480), "PNG", "RGBA"), ((300, 900), "JPEG", "RGB"), ((10, 10), "GIF", "P")):
+            with self.subTest(size=size, fmt=fmt):
+                thumbnails = make_thumbnails(image_bytes(size, fmt, mode), [32, 250, 64])
+                self.assertEqual(sorted(thumbnails), [32, 64, 250])
+                for side, data in thumbnails.items():
+                    avatar = Image.open(io.BytesIO(data))
+                    self.assertEqual((avatar.format, avatar.size), ("JPEG", (side, side)))
+
+    def test_rejects_non_images(self):
+        with self.assertRaises(ValueError):
+            make_thumbnails(b"not an image", [250])
+
+
+class TestCheckImage(unittest.TestCase):
+    def test_rejects_non_images_and_decompression_bombs(self):
+        # An image over twice MAX_IMAGE_PIXELS makes Image.open raise DecompressionBombError.
+        with patch.object(Image, "MAX_IMAGE_PIXELS", 100):
+            for data in (b"not an image", image_bytes((20, 20))):
+                with self.subTest(data=data[:8]), self.assertRaises(HTTPException) as error:
+                    check_image(data)
+                self.assertEqual(error.exception.status_code, 400)
+            check_image(image_bytes((10, 10)))
+
+
+class TestCloudinaryStorage(unittest.IsolatedAsyncioTestCase):
+    async def test_configures_once_and_uploads_on_pool(self):
+        executor = BoundedExecutor("test-uploads", max_workers=1)
+        self.addCleanup(executor.shutdown)
+        storage = CloudinaryStorage("NotesApp", executor)
+        with patch("src.web13hm.services.avatars.cloudinary.config", wraps=cloudinary.config) as config, patch(
+            "src.web13hm.services.avatars.cloudinary.uploader.upload", return_value={"version": 7}
+        ) as upload:
+            storage.configure()
+            first = await storage.save("aa11", {32: b"small", 250: b"jpeg"})
+            await storage.save("bb22", {32: b"small", 250: b"jpeg"})
+        self.assertEqual(len([call for call in config.call_args_list if call.kwargs]), 1)
+        upload.assert_called_with(b"jpeg", public_id="NotesApp/bb22", overwrite=True)
+        self.assertIn("/v7/NotesApp/aa11", first)
+        self.assertEqual(executor.stats()["completed"], 2)
@@ -0,0 +1,121 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from limits.aio import storage as aio_storage
+
+from src.web13hm.core.limiter_storage import AsyncSQLiteStorage
+from src.web13hm.services.cache import RecentWriters, RevocationList, TTLCache, shared_storage_from_uri
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = TTLCache(maxsize=2, ttl=10, timer=self.clock)
+
+    def test_get_counts_hits_and_misses(self):
+        self.cache.set("a", 1)
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_entries_expire(self):
+        self.cache.set("a", 1)
+        self.clock.now = 10
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_per_entry_ttl(self):
+        self.cache.set("a", 1, ttl=1)
+        self.clock.now = 2
+        self.assertIsNone(self.cache.get("a"))
+
+    def test_evicts_least_recently_used(self):
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+        self.cache.get("a")
+        self.cache.set("c", 3)
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("c"), 3)
+
+    def test_invalidate(self):
+        self.cache.set("a", 1)
+        self.cache.invalidate("a")
+        self.cache.invalidate("missing")
+        self.assertIsNone(self.cache.get("a"))
+
+
+
+class TestRevocationList(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        path = os.path.join(tempfile.mkdtemp(), "limits.db")
+        # Two workers, each with its own connection to the shared storage.
+        self.revoked, self.other_worker = (
+            RevocationList(AsyncSQLiteStorage(f"async+sqlite:///{path}")) for _ in range(2)
+        )
+        clock = patch("src.web13hm.core.limiter_storage.time.time", return_value=0.0)
+        self.now = clock.start()
+        self.addCleanup(clock.stop)
+
+    async def test_keys_are_revoked_until_ttl_in_every_worker(self):
+        await self.revoked.revoke("sid", ttl=10)
+        self.assertTrue(await self.revoked.is_revoked("sid"))
+        self.assertTrue(await self.other_worker.is_revoked("sid"))
+        self.assertFalse(await self.other_worker.is_revoked("other"))
+        self.now.return_value = 10
+        self.assertFalse(await self.other_worker.is_revoked("sid"))
+
+    async def test_revoking_again_never_shortens(self):
+        await self.revoked.revoke("sid", ttl=10)
+        await self.other_worker.revoke("sid", ttl=1)
+        self.now.return_value = 5
+        self.assertTrue(await self.revoked.is_revoked("sid"))
+
+    async def test_clear(self):
+        await self.revoked.revoke("sid", ttl=10)
+        await self.revoked.clear()
+        self.assertFalse(await self.other_worker.is_revoked("sid"))
+
+
+class TestRecentWriters(unittest.IsolatedAsyncioTestCase):
+    async def test_writers_are_remembered_for_the_window_in_every_worker(self):
+        path = os.path.join(tempfile.mkdtemp(), "limits.db")
+        clock = FakeClock()
+        clock.now = 100.0
+        writers, other_worker = (
+            RecentWriters(AsyncSQLiteStorage(f"async+sqlite:///{path}"), window=5, timer=clock) for _ in range(2)
+        )
+        await writers.add("a@example.com")
+        self.assertTrue(await other_worker.contains("a@example.com"))
+        self.assertFalse(await other_worker.contains("b@example.com"))
+        clock.now = 109.9
+        self.assertTrue(await other_worker.contains("a@example.com"))
+        await writers.add("a@example.com")
+        clock.now = 114.9
+        self.assertTrue(await other_worker.contains("a@example.com"))
+        clock.now = 115.0
+        self.assertFalse(await other_worker.contains("a@example.com"))
+
+
+class TestSharedStorage(unittest.TestCase):
+    def test_async_counterpart_of_limiter_uri(self):
+        self.assertIsInstance(shared_storage_from_uri("memory://"), aio_storage.MemoryStorage)
+        self.assertIsInstance(shared_storage_from_uri("sqlite://"), AsyncSQLiteStorage)
+        redis = shared_storage_from_uri("redis://localhost:6379/0")
+        self.assertIsInstance(redis, aio_storage.RedisStorage)
+        self.assertTrue(redis.wrap_exceptions)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import gzip
+import unittest
+from datetime import date
+
+from src.web13hm.services.exporter import accepts_gzip, csv_chunks, gzip_chunks, ndjson_chunks
+
+
+async def batches(*items):
+    for item in items:
+        yield item
+
+
+async def collect(iterator):
+    return b"".join([chunk async for chunk in iterator])
+
+
+ROW = (1, "Ann", "Lee", "ann@example.com", "1", date(1990, 1, 2), None)
+
+
+class TestExporter(unittest.IsolatedAsyncioTestCase):
+    async def test_csv_chunks(self):
+        body = await collect(csv_chunks(batches([ROW], [ROW])))
+        lines = body.decode().splitlines()
+        self.assertEqual(lines[0], "id,name,last_name,email,number,birthday,extra_data")
+        self.assertEqual(lines[1:], ["1,Ann,Lee,ann@example.com,1,1990-01-02,"] * 2)
+
+    async def test_csv_chunks_empty(self):
+        body = await collect(csv_chunks(batches()))
+        self.assertEqual(body, b"id,name,last_name,email,number,birthday,extra_data\n")
+
+    async def test_ndjson_chunks(self):
+        body = await collect(ndjson_chunks(batches([ROW])))
+        self.assertEqual(
+            body,
+            b'{"id": 1, "name": "Ann", "last_name": "Lee", "email": "ann@example.com", '
+            b'"number": "1", "birthday": "1990-01-02", "extra_data": null}\n',
+        )
+
+    async def test_gzip_chunks_round_trip(self):
+        body = await collect(gzip_chunks(batches(b"abc", b"", b"def")))
+        self.assertEqual(gzip.decompress(body), b"abcdef")
+
+    def test_accepts_gzip(self):
+        self.assertTrue(accepts_gzip("gzip, deflate, br"))
+        self.assertTrue(accepts_gzip("br;q=1.0, *;q=0.5"))
+        self.assertFalse(accepts_gzip("gzip;q=0"))
+        self.assertFalse(accepts_gzip("identity"))
+        self.assertFalse(accepts_gzip(""))
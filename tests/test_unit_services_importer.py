@@ -0,0 +1,101 @@
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from fastapi import HTTPException
+
+from src.web13hm.database.models import User
+from src.web13hm.services.importer import (
+    import_contacts,
+    iter_csv_records,
+    iter_lines,
+    iter_ndjson_records,
+    validate_records,
+)
+
+
+async def stream(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+
+class TestImporter(unittest.IsolatedAsyncioTestCase):
+    async def test_iter_lines_across_chunks(self):
+        lines = await collect(iter_lines(stream(b"a,b\r\nc", "ї".encode()[:1], "ї\n".encode()[1:], b"d")))
+        self.assertEqual(lines, ["a,b", "cї", "d"])
+
+    async def test_iter_csv_records(self):
+        body = (
+            b"name,last_name,email,number,birthday,ignored\n"
+            b'John,"Smith, Jr.",js@example.com,1,1990-01-01,x\n'
+            b"\n"
+            b'Mary,"Multi\nline",m@example.com,2,1991-02-02,\n'
+        )
+        records = await collect(iter_csv_records(iter_lines(stream(body))))
+        self.assertEqual(
+            records,
+            [
+                (1, {"name": "John", "last_name": "Smith, Jr.", "email": "js@example.com", "number": "1", "birthday": "1990-01-01"}),
+                (2, {"name": "Mary", "last_name": "Multi\nline", "email": "m@example.com", "number": "2", "birthday": "1991-02-02"}),
+            ],
+        )
+
+    async def test_iter_csv_records_stray_quote_in_unquoted_value(self):
+        body = b'name,last_name,email,number,birthday\nTall,5" guy,a@example.com,1,1990-01-01\nNext,Row,n@example.com,2,1990-01-01\n'
+        records = await collect(iter_csv_records(iter_lines(stream(body))))
+        self.assertEqual([(row, record["last_name"]) for row, record in records], [(1, '5" guy'), (2, "Row")])
+
+    async def test_iter_csv_records_caps_unterminated_records(self):
+        body = b'name,last_name,email,number,birthday\nOpen,"never closed\na\nb\nNext,Row,n@example.com,2,1990-01-01\nEnd,"open\n'
+        records = await collect(iter_csv_records(iter_lines(stream(body)), max_record_lines=3))
+        self.assertEqual([row for row, _ in records], [1, 2, 3])
+        self.assertIsInstance(records[0][1], ValueError)
+        self.assertEqual(records[1][1]["name"], "Next")
+        self.assertIsInstance(records[2][1], ValueError)
+
+    async def test_iter_csv_records_missing_columns(self):
+        with self.assertRaises(HTTPException) as context:
+            await collect(iter_csv_records(iter_lines(stream(b"name,email\nJohn,js@example.com\n"))))
+        self.assertEqual(context.exception.status_code, 400)
+
+    async def test_iter_ndjson_records(self):
+        records = await collect(iter_ndjson_records(iter_lines(stream(b'{"name": "John"}\n\nnot json\n'))))
+        self.assertEqual(records[0], (1, {"name": "John"}))
+        self.assertEqual(records[1][0], 2)
+        self.assertIsInstance(records[1][1], ValueError)
+
+    @patch("src.web13hm.services.importer.repository_contacts.create_contacts_bulk", new_callable=AsyncMock)
+    async def test_import_contacts_in_chunks(self, create_contacts_bulk):
+        valid = {"name": "n", "last_name": "l", "email": "e@example.com", "number": "1", "birthday": "1990-01-01"}
+        records = stream(
+            (1, valid),
+            (2, {**valid, "email": "not-an-email"}),
+            (3, valid),
+            (4, ValueError("bad")),
+            (5, valid),
+        )
+        report = await import_contacts(
+            records, db=None, current_user=User(id=1), chunk_size=2, max_errors=1
+        )
+        self.assertEqual(report["imported"], 3)
+        self.assertEqual(report["failed"], 2)
+        self.assertEqual(report["errors"][0]["row"], 2)
+        self.assertEqual(report["errors"][0]["errors"][0]["field"], "email")
+        self.assertEqual(len(report["errors"]), 1)
+        self.assertEqual([len(call.args[0]) for call in create_contacts_bulk.await_args_list], [1, 1, 1])
+
+    def test_validate_records_checks_column_lengths(self):
+        valid = {"name": "n", "last_name": "l", "email": "e@example.com", "number": "1", "birthday": "1990-01-01"}
+        contacts, errors = validate_records(
+            [(1, {**valid, "name": "x" * 51, "extra_data": "y" * 151}), (2, {**valid, "name": "x" * 50})]
+        )
+        self.assertEqual([contact.name for contact in contacts], ["x" * 50])
+        self.assertEqual(errors[0]["row"], 1)
+        self.assertEqual([error["field"] for error in errors[0]["errors"]], ["name", "extra_data"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import socket
+import unittest
+from email.message import EmailMessage
+
+from aiosmtpd.controller import Controller
+
+from src.web13hm.services.email import confirmation_message
+from src.web13hm.services.mailer import Mailer
+
+
+class RecordingHandler:
+    def __init__(self, replies=()):
+        self.replies = list(replies)
+        self.sessions = set()
+        self.received = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.sessions.add(id(session))
+        if self.replies:
+            return self.replies.pop(0)
+        self.received.append(envelope)
+        return "250 OK"
+
+
+def message(to: str) -> EmailMessage:
+    msg = EmailMessage()
+    msg["To"] = to
+    msg["Subject"] = "Hello"
+    msg.set_content("Hi")
+    return msg
+
+
+class TestMailer(unittest.IsolatedAsyncioTestCase):
+    def start_server(self, handler):
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        controller = Controller(handler, hostname="127.0.0.1", port=port)
+        controller.start()
+        self.addCleanup(controller.stop)
+        return controller
+
+    def mailer(self, controller, **kwargs):
+        mailer = Mailer(
+            hostname=controller.hostname,
+            port=controller.port,
+            sender="app@example.com",
+            start_tls=False,
+            retry_backoff=0.01,
+            **kwargs,
+        )
+        self.addAsyncCleanup(mailer.stop)
+        return mailer
+
+    async def test_reuses_one_connection_per_worker(self):
+        handler = RecordingHandler()
+        mailer = self.mailer(self.start_server(handler), connections=1)
+        for i in range(10):
+            await mailer.enqueue(message(f"user{i}@example.com"))
+        await mailer.join()
+        self.assertEqual(len(handler.received), 10)
+        self.assertEqual(len(handler.sessions), 1)
+        self.assertEqual(handler.received[0].mail_from, "app@example.com")
+        stats = mailer.stats()
+        self.assertEqual((stats["sent"], stats["failed"], stats["connects"]), (10, 0, 1))
+
+    async def test_retries_transient_errors(self):
+        handler = RecordingHandler(replies=["451 Try again later"])
+        mailer = self.mailer(self.start_server(handler))
+        await mailer.enqueue(message("user@example.com"))
+        await mailer.join()
+        self.assertEqual(len(handler.received), 1)
+        self.assertEqual(mailer.stats()["retried"], 1)
+
+    async def test_gives_up_on_permanent_errors(self):
+        handler = RecordingHandler(replies=["550 No such user"])
+        mailer = self.mailer(self.start_server(handler))
+        await mailer.enqueue(message("user@example.com"))
+        await mailer.enqueue(message("other@example.com"))
+        await mailer.join()
+        self.assertEqual([e.rcpt_tos for e in handler.received], [["other@example.com"]])
+        stats = mailer.stats()
+        self.assertEqual((stats["sent"], stats["failed"], stats["retried"]), (1, 1, 0))
+
+    async def test_gives_up_when_server_unreachable(self):
+        mailer = Mailer(hostname="127.0.0.1", port=1, sender="app@example.com", max_retries=1, retry_backoff=0.01)
+        self.addAsyncCleanup(mailer.stop)
+        await mailer.enqueue(message("user@example.com"))
+        await mailer.join()
+        self.assertEqual(mailer.stats()["failed"], 1)
+        self.assertEqual(mailer.stats()["retried"], 1)
+
+    def test_confirmation_message(self):
+        msg = confirmation_message("user@example.com", "http://testserver/", "abc")
+        self.assertEqual(msg["To"], "user@example.com")
+        self.assertIn("http://testserver/api/auth/confirmed_email/abc", msg.get_payload(decode=True).decode())
@@ -0,0 +1,35 @@
+import unittest
+
+from jinja2 import Environment
+
+from src.web13hm.services.email import confirmation_template, templates
+from src.web13hm.services.rendering import SegmentedTemplate
+
+env = Environment(autoescape=True)
+
+
+class TestSegmentedTemplate(unittest.TestCase):
+    def test_matches_jinja_render(self):
+        template = env.from_string("<a href='{{host}}x/{{token}}'>{{email}}</a> {{email}}")
+        segmented = SegmentedTemplate(template, fields=("host", "email", "token"))
+        values = {"host": "http://h/", "email": "a@example.com", "token": "t.o.k"}
+        self.assertTrue(segmented.is_split)
+        self.assertEqual(segmented.render(**values), template.render(**values))
+
+    def test_escapes_values(self):
+        segmented = SegmentedTemplate(env.from_string("<p>{{email}}</p>"), fields=("email",))
+        self.assertEqual(segmented.render(email="<b>&"), "<p>&lt;b&gt;&amp;</p>")
+
+    def test_falls_back_when_field_is_filtered(self):
+        template = env.from_string("{{email|upper}} {{token}}")
+        segmented = SegmentedTemplate(template, fields=("email", "token"))
+        self.assertFalse(segmented.is_split)
+        self.assertEqual(segmented.render(email="a@b.c", token="t"), "A@B.C t")
+
+    def test_confirmation_template_is_split(self):
+        values = {"host": "http://testserver/", "email": "user@example.com", "token": "abc.def"}
+        self.assertTrue(confirmation_template.is_split)
+        self.assertEqual(
+            confirmation_template.render(**values),
+            templates.get_template("email_template.html").render(**values),
+        )
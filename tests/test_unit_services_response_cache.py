@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+
+from limits.aio.storage import MemoryStorage
+
+from src.web13hm.core.limiter_storage import AsyncSQLiteStorage
+from src.web13hm.services.response_cache import ResponseCache, etag_matches
+
+
+class TestEtagMatches(unittest.TestCase):
+    def test_matching(self):
+        self.assertTrue(etag_matches('"a"', '"a"'))
+        self.assertTrue(etag_matches('"b", W/"a"', '"a"'))
+        self.assertTrue(etag_matches("*", '"a"'))
+        self.assertFalse(etag_matches('"b"', '"a"'))
+        self.assertFalse(etag_matches(None, '"a"'))
+
+
+class TestResponseCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.cache = ResponseCache(maxsize=10, ttl=60, versions=MemoryStorage())
+
+    async def test_bump_hides_older_entries(self):
+        version = await self.cache.version(1)
+        entry = self.cache.set(1, version, "page", b"[]", {})
+        self.assertEqual(self.cache.get(1, version, "page"), entry)
+
+        await self.cache.bump(1)
+
+        self.assertIsNone(self.cache.get(1, await self.cache.version(1), "page"))
+        self.assertEqual(await self.cache.version(2), 0)
+
+    def test_etag_follows_body(self):
+        first = self.cache.set(1, 0, "a", b"[1]", {})
+        same = self.cache.set(1, 0, "b", b"[1]", {})
+        other = self.cache.set(1, 0, "c", b"[2]", {})
+        self.assertEqual(first.etag, same.etag)
+        self.assertNotEqual(first.etag, other.etag)
+
+    async def test_bump_reaches_every_worker(self):
+        path = os.path.join(tempfile.mkdtemp(), "limits.db")
+        worker_a, worker_b = (
+            ResponseCache(maxsize=10, ttl=60, versions=AsyncSQLiteStorage(f"async+sqlite:///{path}"))
+            for _ in range(2)
+        )
+        version = await worker_b.version(1)
+        worker_b.set(1, version, "page", b"[]", {})
+
+        await worker_a.bump(1)
+
+        self.assertEqual(await worker_b.version(1), version + 1)
+        self.assertIsNone(worker_b.get(1, await worker_b.version(1), "page"))
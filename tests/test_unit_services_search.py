@@ -0,0 +1,38 @@
+import unittest
+
+from src.web13hm.services.search import (
+    MAX_QUERY_TOKENS,
+    prefix_upper_bound,
+    query_tokens,
+    search_terms,
+)
+
+
+class TestSearchTerms(unittest.TestCase):
+    def test_search_terms(self):
+        terms = search_terms("Mary-Jane", "Jones", "Jo@X.com", None)
+        self.assertEqual(
+            terms,
+            {"mary-jane", "mary", "jane", "jones", "jo@x.com", "jo", "x", "com"},
+        )
+
+    def test_query_tokens(self):
+        self.assertEqual(query_tokens("  John  SM john "), ["john", "sm"])
+        self.assertEqual(query_tokens(""), [])
+        self.assertEqual(len(query_tokens(" ".join(map(str, range(10))))), MAX_QUERY_TOKENS)
+
+    def test_prefix_upper_bound(self):
+        self.assertEqual(prefix_upper_bound("jo"), "jp")
+        for term in ("jo", "john", "jo@x.com", "jozzzz"):
+            self.assertTrue("jo" <= term < prefix_upper_bound("jo"))
+        self.assertFalse("jp" < prefix_upper_bound("jo"))
+
+    def test_prefix_upper_bound_of_maximal_code_point(self):
+        top = chr(0x10FFFF)
+        self.assertEqual(prefix_upper_bound("j" + top), "k")
+        self.assertTrue("j" + top + "x" < prefix_upper_bound("j" + top))
+        self.assertIsNone(prefix_upper_bound(top * 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,24 @@
+import json
+import unittest
+from datetime import date
+
+from fastapi.encoders import jsonable_encoder
+
+from src.web13hm.services.serialization import CONTACT_FIELDS, ContactRowsResponse, dump_rows
+from src.web13hm.shemas import ResponseContactModel
+
+ROW = (1, "Ann", "Lee", "ann@example.com", "+380", date(1990, 1, 31), None)
+
+
+class TestDumpRows(unittest.TestCase):
+    def test_matches_model_serialization(self):
+        model = ResponseContactModel(**dict(zip(CONTACT_FIELDS, ROW)))
+        self.assertEqual(json.loads(dump_rows([ROW])), [jsonable_encoder(model)])
+
+    def test_extra_columns_are_left_out(self):
+        self.assertEqual(dump_rows([ROW + (131,)]), dump_rows([ROW]))
+
+    def test_response_renders_rows_and_passes_bytes(self):
+        self.assertEqual(ContactRowsResponse([ROW]).body, dump_rows([ROW]))
+        self.assertEqual(ContactRowsResponse(b"[]").body, b"[]")
+        self.assertEqual(ContactRowsResponse([]).headers["content-type"], "application/json")
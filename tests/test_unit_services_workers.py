@@ -0,0 +1,63 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from src.web13hm.services.workers import BoundedExecutor
+
+
+def square(x):
+    return x * x
+
+
+class TestBoundedExecutor(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.pool = BoundedExecutor("test", max_workers=4, max_concurrency=2)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    async def test_run_returns_result(self):
+        result = await self.pool.run(square, 3)
+        self.assertEqual(result, 9)
+        self.assertEqual(self.pool.stats()["completed"], 1)
+
+    async def test_concurrency_is_capped(self):
+        lock = threading.Lock()
+        active = []
+        peak = []
+
+        def work():
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.pop()
+
+        await asyncio.gather(*(self.pool.run(work) for _ in range(6)))
+        self.assertLessEqual(max(peak), 2)
+        stats = self.pool.stats()
+        self.assertEqual(stats["completed"], 6)
+        self.assertEqual(stats["queued"], 0)
+        self.assertGreater(stats["max_wait_ms"], 0)
+
+    async def test_failures_are_counted(self):
+        with self.assertRaises(ZeroDivisionError):
+            await self.pool.run(lambda: 1 / 0)
+        self.assertEqual(self.pool.stats()["failed"], 1)
+
+    async def test_process_pool(self):
+        pool = BoundedExecutor("test-process", max_workers=1, kind="process")
+        try:
+            self.assertEqual(await pool.run(square, 4), 16)
+        finally:
+            pool.shutdown()
+
+    def test_unknown_kind(self):
+        with self.assertRaises(ValueError):
+            BoundedExecutor("test", max_workers=1, kind="fiber")
+
+
+if __name__ == "__main__":
+    unittest.main()